@@ -1,13 +1,13 @@
 """Module for the SD Card Programming of a SHARP XE-A207 cash register
 """
+from . import instrumentation as _instrumentation
+
 class Department:
     """Department used in an SHARP XE-A207 cash register as displayed in the according PC-LINK program"""
     __code: int
     __text: str
     __price: float
-    __open: bool
-    __preset: bool
-    __sales_type: bool
+    __flags: int    # b'000S00PO' as stored in B[1]
     __halo: float
     __group_no: int
 
@@ -38,11 +38,9 @@ class Department:
         assert isinstance(code, int) and code < 100
         self.__code = code
         assert isinstance(sales_type, bool)
-        self.__sales_type = sales_type
         assert isinstance(open, bool)
-        self.__open = open
         assert isinstance(preset, bool)
-        self.__preset = preset
+        self.__flags = _DEPARTMENT_FLAGS[sales_type][preset][open]
         assert isinstance(taxable, Taxable)
         self.__taxable = taxable
         assert isinstance(halo, float) and 0. <= halo <= 999999.99
@@ -82,6 +80,10 @@ class Department:
         Returns:
             Department: a new Department object with the data from the given bytes
         """
+        return Department(*Department._decode(B))
+
+    def _decode(B: bytes) -> tuple:
+        """decodes the bytes of a single department into the arguments of `Department.__init__`"""
         assert len(B) == 28
         preset_open_sale_type = int(B[1])
         _code = int(B[0:1].hex())
@@ -94,7 +96,7 @@ class Department:
         _group_no   = int(B[7:8].hex())
         _price      = float(B[8:12].hex())/100.
         _text       = decode_text_part(B[12:28])
-        return Department(_code, _sales_type, _open, _preset, _taxable, _halo, _group_no, _price, _text)
+        return (_code, _sales_type, _open, _preset, _taxable, _halo, _group_no, _price, _text)
 
     def to_bytes(self) -> bytes:
         """Converts the department into bytes of the format:
@@ -123,58 +125,193 @@ class Department:
         """
         B = bytearray([0] * 28)
         B[0:1] = int2hex(self.__code, 1)
-        if self.__sales_type:
-            B[1] |= 0b10000
-        if self.__open:
-            B[1] |= 0b00001
-        if self.__preset:
-            B[1] |= 0b00010
+        B[1] = self.__flags
         B[2] = self.__taxable.to_byte()
-        B[3:7] = int2hex(int(self.__halo * 100.), 4)
+        B[3:7] = int2hex(round(self.__halo * 100.), 4)
         B[7:8] = int2hex(self.__group_no, 1)
-        B[8:12] = int2hex(int(self.__price * 100.), 4)
+        B[8:12] = int2hex(round(self.__price * 100.), 4)
         B[12:28] = encode_text_part(self.__text, 16)
         return bytes(B)
 
     def __repr__(self):
-        return f"Department(code=({self.__code}), sales_type=({self.__sales_type}), open=({self.__open}), preset=({self.__preset}), taxable=({self.__taxable}), halo=({self.__halo}), group_no=({self.__group_no}), price=({self.__price}), text=({self.__text}))"
+        return f"Department(code=({self.__code}), sales_type=({self.sales_type}), open=({self.open}), preset=({self.preset}), taxable=({self.__taxable}), halo=({self.__halo}), group_no=({self.__group_no}), price=({self.__price}), text=({self.__text}))"
         
     def __str__(self):
-        return f"{self.__code}\t{self.__sales_type}\t{self.__open}\t{self.__preset}\t{self.__taxable}\t{self.__halo}\t{self.__group_no}\t{self.__price}\t{self.__text}"
+        return f"{self.__code}\t{self.sales_type}\t{self.open}\t{self.preset}\t{self.__taxable}\t{self.__halo}\t{self.__group_no}\t{self.__price}\t{self.__text}"
     
     def __eq__(self, other):
         return (
             self.__code == other.__code and
-            self.__open == other.__open and
-            self.__preset == other.__preset and
-            self.__sales_type == other.__sales_type and
+            self.__flags == other.__flags and
+            self.__taxable is other.__taxable and
             self.__group_no == other.__group_no and
-            int(self.__price * 100.) == int(other.__price * 100.) and
-            int(self.__halo * 100.) == int(other.__halo * 100.) and
+            round(self.__price * 100.) == round(other.__price * 100.) and
+            round(self.__halo * 100.) == round(other.__halo * 100.) and
             self.__text == other.__text)
 
     def __ne__(self, other):
         return (
             self.__code != other.__code or
-            self.__open != other.__open or
-            self.__preset != other.__preset or
-            self.__sales_type != other.__sales_type or
+            self.__flags != other.__flags or
+            self.__taxable is not other.__taxable or
             self.__group_no != other.__group_no or
-            int(self.__price * 100.) != int(other.__price * 100.) or
-            int(self.__halo * 100.) != int(other.__halo * 100.) or
+            round(self.__price * 100.) != round(other.__price * 100.) or
+            round(self.__halo * 100.) != round(other.__halo * 100.) or
             self.__text != other.__text
         )
 
     def __hash__(self):
         return int(self.to_bytes().hex(), 16)
 
+    @property
+    def code(self) -> int:
+        return self.__code
+
+    @property
+    def sales_type(self) -> bool:
+        return self.__flags & 0b10000 != 0
+
+    @property
+    def open(self) -> bool:
+        return self.__flags & 0b00001 != 0
+
+    @property
+    def preset(self) -> bool:
+        return self.__flags & 0b00010 != 0
+
+    @property
+    def flags(self) -> int:
+        """sales type, preset and open price packed as in the DEPTDT record (b'000S00PO')"""
+        return self.__flags
+
+    @property
+    def taxable(self):
+        return self.__taxable
+
+    @property
+    def halo(self) -> float:
+        return self.__halo
+
+    @property
+    def group_no(self) -> int:
+        return self.__group_no
+
+    @property
+    def price(self) -> float:
+        return self.__price
+
+    @property
+    def text(self) -> str:
+        return self.__text
+
+class DepartmentTable:
+    """Departments of a cash register in 100 slots indexed directly by the department code (0-99)
+
+    Every slot also knows the byte offset of its record in DEPTDT.SDA. Tables read
+    with `from_bytes` keep the offsets of the file, `to_bytes` writes the
+    departments in ascending order of their codes and updates the offsets.
+    """
+    SIZE = 100
+    RECORD_SIZE = 28
+    __slots: list
+    __offsets: list
+
+    def __init__(self, departments: list[Department] = ()):
+        """initializes new DepartmentTable object
+
+        Args:
+            departments (list[Department]): departments with distinct codes
+        """
+        self.__slots = [None] * DepartmentTable.SIZE
+        self.__offsets = [None] * DepartmentTable.SIZE
+        for dept in departments:
+            assert isinstance(dept, Department)
+            assert self.__slots[dept.code] is None, f"duplicate department code {dept.code}"
+            self.__slots[dept.code] = dept
+        self.__update_offsets()
+
+    def from_bytes(B: bytes):
+        """creates a new table from the content of DEPTDT.SDA"""
+        assert len(B) % DepartmentTable.RECORD_SIZE == 0
+        table = DepartmentTable()
+        for offset in range(0, len(B), DepartmentTable.RECORD_SIZE):
+            dept = Department.from_bytes(B[offset:offset + DepartmentTable.RECORD_SIZE])
+            assert table.__slots[dept.code] is None, f"duplicate department code {dept.code}"
+            table.__slots[dept.code] = dept
+            table.__offsets[dept.code] = offset
+        return table
+
+    def to_bytes(self) -> bytes:
+        """converts the occupied slots in ascending order of their codes into the content of DEPTDT.SDA"""
+        self.__update_offsets()
+        return b"".join(dept.to_bytes() for dept in self)
+
+    def __update_offsets(self):
+        offset = 0
+        for code, dept in enumerate(self.__slots):
+            if dept is None:
+                self.__offsets[code] = None
+            else:
+                self.__offsets[code] = offset
+                offset += DepartmentTable.RECORD_SIZE
+
+    def get(self, code: int, default=None):
+        if 0 <= code < DepartmentTable.SIZE and self.__slots[code] is not None:
+            return self.__slots[code]
+        return default
+
+    def offset(self, code: int) -> int:
+        """byte offset of the record of department `code` in DEPTDT.SDA, None for new departments"""
+        return self.__offsets[code]
+
+    def join(self, products: list) -> list:
+        """pairs every PLU with its department (None if the department does not exist)"""
+        slots = self.__slots
+        return [(prod, slots[prod.dept_no]) for prod in products]
+
+    def to_list(self) -> list[Department]:
+        return list(self)
+
+    def __getitem__(self, code: int) -> Department:
+        dept = self.__slots[code] if 0 <= code < DepartmentTable.SIZE else None
+        if dept is None:
+            raise KeyError(code)
+        return dept
+
+    def __setitem__(self, code: int, dept: Department):
+        assert isinstance(dept, Department) and dept.code == code
+        self.__slots[code] = dept
+
+    def __delitem__(self, code: int):
+        if self[code] is not None:
+            self.__slots[code] = None
+            self.__offsets[code] = None
+
+    def __contains__(self, code) -> bool:
+        return isinstance(code, int) and 0 <= code < DepartmentTable.SIZE and self.__slots[code] is not None
+
+    def __iter__(self):
+        return (dept for dept in self.__slots if dept is not None)
+
+    def __len__(self) -> int:
+        return sum(dept is not None for dept in self.__slots)
+
+    def __eq__(self, other):
+        return isinstance(other, DepartmentTable) and all(
+            a is b or (a is not None and b is not None and a == b) for a, b in zip(self.__slots, other.__slots))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return f"DepartmentTable({self.to_list()})"
+
 class Product:
     __code: int
     __text: str
     __price: float
     __dept_no: int
-    __open: bool
-    __preset: bool
+    __flags: int    # b'000000PO' as stored in B[9]
     def __init__(self,
                  code: int,
                  dept_no: int,
@@ -188,15 +325,19 @@ class Product:
         assert isinstance(dept_no, int) and 1 <= dept_no <= 99
         self.__dept_no = dept_no
         assert isinstance(open, bool)
-        self.__open = open
         assert isinstance(preset, bool)
-        self.__preset = preset
+        self.__flags = _PRODUCT_FLAGS[preset][open]
         assert isinstance(price, float) and 0 <= price < 1e9
         self.__price = price
         assert isinstance(text, str) and len(text) <= 16
         self.__text = text
 
     def from_bytes(B):
+        return Product(*Product._decode(B))
+
+    def _decode(B: bytes) -> tuple:
+        """decodes the bytes of a single PLU into the arguments of `Product.__init__`"""
+        assert len(B) == 31
         _code = int(B[5:8].hex())
         _dept_no = int(bytes([B[8]]).hex())
         preset_open_code = int(B[9])
@@ -204,106 +345,303 @@ class Product:
         _preset = preset_open_code & 0b10 != 0
         _price = float(B[10:15].hex())/100.
         _text = decode_text_part(B[15:31])
-        return Product(_code, _dept_no, _open, _preset, _price, _text)
+        return (_code, _dept_no, _open, _preset, _price, _text)
 
     def to_bytes(self) -> bytes:
         B = bytearray([0] * 31)
         B[5:8] = int2hex(self.__code, 3)
         B[8:9] = int2hex(self.__dept_no, 1)
-        if self.__open:
-            B[9] |= 0b01
-        if self.__preset:
-            B[9] |= 0b10
-        B[10:15] = int2hex(int(self.__price * 100.), 5)
+        B[9] = self.__flags
+        B[10:15] = int2hex(round(self.__price * 100.), 5)
         B[15:31] = encode_text_part(self.__text, 16)
         return bytes(B)
 
     def __repr__(self):
-        return f"Product(code={self.__code}, dept_no={self.__dept_no}, open={self.__open}, preset={self.__preset}, price={self.__price}, text={self.__text})"
+        return f"Product(code={self.__code}, dept_no={self.__dept_no}, open={self.open}, preset={self.preset}, price={self.__price}, text={self.__text})"
 
     def __str__(self):
-        return f"{self.__code}\t{self.__dept_no}\t{self.__open}\t{self.__preset}\t{self.__price}\t{self.__text}"
+        return f"{self.__code}\t{self.__dept_no}\t{self.open}\t{self.preset}\t{self.__price}\t{self.__text}"
 
     def __eq__(self, other):
         return (
             self.__code == other.__code and
             self.__dept_no == other.__dept_no and
-            self.__open == other.__open and
-            self.__preset == other.__preset and
-            int(self.__price * 100.) == int(other.__price * 100.) and
+            self.__flags == other.__flags and
+            round(self.__price * 100.) == round(other.__price * 100.) and
             self.__text == other.__text)
 
     def __ne__(self, other):
         return (
             self.__code != other.__code or
             self.__dept_no != other.__dept_no or
-            self.__open != other.__open or
-            self.__preset != other.__preset or
-            int(self.__price * 100.) != int(other.__price * 100.) or
+            self.__flags != other.__flags or
+            round(self.__price * 100.) != round(other.__price * 100.) or
             self.__text != other.__text)
 
     def __hash__(self):
         return int(self.to_bytes().hex(), 16)
 
+    @property
+    def code(self) -> int:
+        return self.__code
+
+    @property
+    def dept_no(self) -> int:
+        return self.__dept_no
+
+    @property
+    def open(self) -> bool:
+        return self.__flags & 0b01 != 0
+
+    @property
+    def preset(self) -> bool:
+        return self.__flags & 0b10 != 0
+
+    @property
+    def flags(self) -> int:
+        """preset and open price packed as in the PLUDT record (b'000000PO')"""
+        return self.__flags
+
+    @property
+    def price(self) -> float:
+        return self.__price
+
+    @property
+    def text(self) -> str:
+        return self.__text
+
 class Taxable:
-    __tax_1: bool
-    __tax_2: bool
-    __tax_3: bool
-    __tax_4: bool
-    def __init__(self, tax_1: bool, tax_2: bool, tax_3: bool, tax_4: bool):
+    """VATs that apply to a department
+
+    There are only 16 possible combinations, so every Taxable is one of 16
+    shared immutable instances: `Taxable(...)` and `Taxable.from_byte` return
+    the instance of the combination, equal Taxables are identical.
+    """
+    __slots__ = ("__byte",)
+    __byte: int     # b'0000DCBA' as stored in the DEPTDT record
+    __instances: list = []
+
+    def __new__(cls, tax_1: bool, tax_2: bool, tax_3: bool, tax_4: bool):
         assert isinstance(tax_1, bool) 
-        self.__tax_1 = tax_1
         assert isinstance(tax_2, bool)
-        self.__tax_2 = tax_2
         assert isinstance(tax_3, bool)
-        self.__tax_3 = tax_3
         assert isinstance(tax_4, bool)
-        self.__tax_4 = tax_4
+        return Taxable.__instances[tax_1 | tax_2 << 1 | tax_3 << 2 | tax_4 << 3]
+
+    def _create_instances():
+        """creates the 16 shared instances, only called once when the module is loaded"""
+        for byte in range(16):
+            taxable = object.__new__(Taxable)
+            object.__setattr__(taxable, "_Taxable__byte", byte)
+            Taxable.__instances.append(taxable)
 
     def from_byte(byte: int):
         assert isinstance(byte, int)
         assert 0 <= byte < 16
-        tax_1 = byte & 0b0001 != 0
-        tax_2 = byte & 0b0010 != 0
-        tax_3 = byte & 0b0100 != 0
-        tax_4 = byte & 0b1000 != 0
-        return Taxable(tax_1, tax_2, tax_3, tax_4)
+        return Taxable.__instances[byte]
 
     def to_byte(self) -> int:
-        B = 0
-        if self.__tax_1: B |= 0b0001
-        if self.__tax_2: B |= 0b0010
-        if self.__tax_3: B |= 0b0100
-        if self.__tax_4: B |= 0b1000
-        return B
+        return self.__byte
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Taxable is immutable")
+
+    def __reduce__(self):
+        return (Taxable.from_byte, (self.__byte,))
 
     def __repr__(self):
-        return f"Taxable (tax_1 = {self.__tax_1}, tax_2 = {self.__tax_2}, tax_3 = {self.__tax_3}, tax_4 = {self.__tax_4})"
+        return f"Taxable (tax_1 = {self.tax_1}, tax_2 = {self.tax_2}, tax_3 = {self.tax_3}, tax_4 = {self.tax_4})"
 
     def __eq__(self, other):
-        if (isinstance(other, self.__class__) and
-            self.__tax_1 == other.__tax_1 and
-            self.__tax_2 == other.__tax_2 and
-            self.__tax_3 == other.__tax_3 and
-            self.__tax_4 == other.__tax_4):
-            return True
-        return False
+        return self is other
     
     def __ne__(self, other):
-        if (not isinstance(other, self.__class__) or
-            self.__tax_1 != other.__tax_1 or
-            self.__tax_2 != other.__tax_2 or
-            self.__tax_3 != other.__tax_3 or
-            self.__tax_4 != other.__tax_4):
-            return True
-        return False
+        return self is not other
     
     def __hash__(self):
-        return self.to_byte()
+        return self.__byte
+
+    @property
+    def tax_1(self) -> bool:
+        return self.__byte & 0b0001 != 0
+
+    @property
+    def tax_2(self) -> bool:
+        return self.__byte & 0b0010 != 0
+
+    @property
+    def tax_3(self) -> bool:
+        return self.__byte & 0b0100 != 0
+
+    @property
+    def tax_4(self) -> bool:
+        return self.__byte & 0b1000 != 0
+
+Taxable._create_instances()
+
+# flag bytes of the DEPTDT (b'000S00PO') and PLUDT (b'000000PO') records indexed by [sales_type][preset][open]
+_DEPARTMENT_FLAGS = (((0b00000, 0b00001), (0b00010, 0b00011)), ((0b10000, 0b10001), (0b10010, 0b10011)))
+_PRODUCT_FLAGS = _DEPARTMENT_FLAGS[False]
 
-# TODO
 class Logo:
-    pass
+    """Graphic logo printed on the receipt, a 360 (W) x 130 (H) pixel monochrome bitmap
+
+    The PC-Link program only accepts logos with less than 35% black pixels,
+    which is checked when a logo is created from pixels or a BMP file.
+    The bitmap is kept packed: one bit per pixel (1 = black), most significant
+    bit first, rows from top to bottom, 45 bytes per row; to_bytes/from_bytes
+    use this layout. Converting from and to pixels or BMP files requires NumPy.
+    """
+    WIDTH = 360
+    HEIGHT = 130
+    MAX_BLACK_RATIO = 0.35
+    __bits: bytes
+
+    def __init__(self, bits: bytes = None):
+        """initializes new Logo object
+
+        Args:
+            bits (bytes): packed bitmap (5850 bytes), an empty (white) logo if not given
+        """
+        if bits is None:
+            bits = bytes(Logo.WIDTH // 8 * Logo.HEIGHT)
+        assert isinstance(bits, (bytes, bytearray)) and len(bits) == Logo.WIDTH // 8 * Logo.HEIGHT
+        self.__bits = bytes(bits)
+
+    def from_bytes(B: bytes):
+        return Logo(B)
+
+    def to_bytes(self) -> bytes:
+        return self.__bits
+
+    def from_pixels(pixels, threshold: int = 128, dither: bool = False):
+        """creates a new logo from a 130 x 360 array
+
+        Args:
+            pixels (numpy.ndarray): boolean array (True = black) or grayscale values 0 (black) - 255 (white)
+            threshold (int):        grayscale values below the threshold are black
+            dither (bool):          use ordered (Bayer) dithering instead of a fixed threshold
+        Returns:
+            Logo: a new Logo object
+        Raises:
+            ValueError: the logo has 35% or more black pixels
+        """
+        return _checked_logo(Logo(_pack_logo_pixels(pixels, threshold, dither).tobytes()))
+
+    def batch_from_pixels(pixels, threshold: int = 128, dither: bool = False) -> list:
+        """creates many logos at once from an N x 130 x 360 array, see `Logo.from_pixels`
+
+        Returns:
+            list[Logo]: N new Logo objects
+        Raises:
+            ValueError: a logo has 35% or more black pixels
+        """
+        return [_checked_logo(Logo(packed.tobytes())) for packed in _pack_logo_pixels(pixels, threshold, dither)]
+
+    def to_pixels(self):
+        """returns the logo as a boolean 130 x 360 array (True = black)"""
+        import numpy as np
+        packed = np.frombuffer(self.__bits, dtype=np.uint8).reshape(Logo.HEIGHT, Logo.WIDTH // 8)
+        return np.unpackbits(packed, axis=1).astype(bool)
+
+    def from_bmp(file: str, threshold: int = 128, dither: bool = False):
+        """creates a new logo from an uncompressed 360 x 130 pixel BMP file (1, 4, 8, 24 or 32 bit per pixel)
+
+        Args:
+            file (str):         BMP file
+            threshold (int):    see `Logo.from_pixels`
+            dither (bool):      see `Logo.from_pixels`
+        Returns:
+            Logo: a new Logo object
+        Raises:
+            ValueError: the logo has 35% or more black pixels
+        """
+        with open(file, "br") as f:
+            return Logo.from_pixels(_bmp_to_gray(f.read()), threshold, dither)
+
+    def to_bmp(self, file: str):
+        """writes the logo as a monochrome (1 bit per pixel) BMP file"""
+        import struct
+        row_size = Logo.WIDTH // 8
+        stride = (row_size + 3) // 4 * 4
+        rows = [self.__bits[y * row_size:(y + 1) * row_size].ljust(stride, b"\x00") for y in range(Logo.HEIGHT)]
+        data = b"".join(reversed(rows))
+        palette = b"\xff\xff\xff\x00\x00\x00\x00\x00"
+        offset = 14 + 40 + len(palette)
+        with open(file, "bw") as f:
+            f.write(struct.pack("<2sIHHI", b"BM", offset + len(data), 0, 0, offset))
+            f.write(struct.pack("<IiiHHIIiiII", 40, Logo.WIDTH, Logo.HEIGHT, 1, 1, 0, len(data), 2835, 2835, 2, 2))
+            f.write(palette)
+            f.write(data)
+
+    def black_ratio(self) -> float:
+        """share of black pixels"""
+        return bin(int.from_bytes(self.__bits, "big")).count("1") / (Logo.WIDTH * Logo.HEIGHT)
+
+    def is_empty(self) -> bool:
+        return not any(self.__bits)
+
+    def __repr__(self):
+        return f"Logo(black_ratio={self.black_ratio():.3f})"
+
+    def __eq__(self, other):
+        return isinstance(other, Logo) and self.__bits == other.__bits
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.__bits)
+
+def _checked_logo(logo: Logo) -> Logo:
+    """rejects logos the PC-Link program would not accept"""
+    if logo.black_ratio() >= Logo.MAX_BLACK_RATIO:
+        raise ValueError(f"logo has {logo.black_ratio():.1%} black pixels, less than {Logo.MAX_BLACK_RATIO:.0%} are allowed")
+    return logo
+
+def _pack_logo_pixels(pixels, threshold: int, dither: bool):
+    """thresholds or dithers (..., 130, 360) pixels and packs them into (..., 130, 45) bytes"""
+    import numpy as np
+    pixels = np.asarray(pixels)
+    assert pixels.shape[-2:] == (Logo.HEIGHT, Logo.WIDTH), f"logo has to be {Logo.WIDTH} x {Logo.HEIGHT} pixels"
+    if pixels.dtype == bool:
+        black = pixels
+    elif dither:
+        bayer = np.array([[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]])
+        thresholds = (bayer + 0.5) * (256 / 16)
+        black = pixels < np.tile(thresholds, (Logo.HEIGHT // 4 + 1, Logo.WIDTH // 4))[:Logo.HEIGHT]
+    else:
+        black = pixels < threshold
+    return np.packbits(black, axis=-1)
+
+def _bmp_to_gray(B: bytes):
+    """decodes an uncompressed BMP file into a top to bottom array of grayscale values (0-255)"""
+    import struct
+    import numpy as np
+    assert B[0:2] == b"BM", "not a BMP file"
+    offset, = struct.unpack_from("<I", B, 10)
+    header_size, width, height, _, bpp, compression = struct.unpack_from("<IiiHHI", B, 14)
+    assert compression in (0, 3), "compressed BMP files are not supported"
+    assert bpp in (1, 4, 8, 24, 32), f"{bpp} bit per pixel are not supported"
+    rows = abs(height)
+    stride = (bpp * width + 31) // 32 * 4
+    data = np.frombuffer(B, dtype=np.uint8, count=stride * rows, offset=offset).reshape(rows, stride)
+    if height > 0:
+        data = data[::-1]
+    if bpp <= 8:
+        colors, = struct.unpack_from("<I", B, 46) if header_size >= 40 else (0,)
+        colors = colors or 2 ** bpp
+        palette = np.frombuffer(B, dtype=np.uint8, count=4 * colors, offset=14 + header_size).reshape(colors, 4)
+        gray_palette = palette[:, 2] * 0.299 + palette[:, 1] * 0.587 + palette[:, 0] * 0.114
+        if bpp == 1:
+            indices = np.unpackbits(data, axis=1)[:, :width]
+        elif bpp == 4:
+            indices = np.stack((data >> 4, data & 0x0F), axis=2).reshape(rows, -1)[:, :width]
+        else:
+            indices = data[:, :width]
+        return gray_palette[indices]
+    pixels = data[:, :width * bpp // 8].reshape(rows, width, bpp // 8).astype(np.float64)
+    return pixels[:, :, 2] * 0.299 + pixels[:, :, 1] * 0.587 + pixels[:, :, 0] * 0.114
 
 class Logo_msg:
     __rows: list[str]
@@ -322,7 +660,7 @@ class Logo_msg:
         assert len(B) == 186
         rows = []
         for i in range(6):
-            rows.append(decode_text_part(B[i*31 + 1:i*31 + 30]))
+            rows.append(decode_text_part(B[i*31 + 1:i*31 + 31]))
         return Logo_msg(rows)
 
     def to_bytes(self) -> bytes:
@@ -348,6 +686,10 @@ class Logo_msg:
             string = string + row + "\n"
         return string
 
+    @property
+    def rows(self) -> list[str]:
+        return list(self.__rows)
+
 class Tax:
     __number: int
     __tax_rate: float
@@ -361,9 +703,34 @@ class Tax:
         assert isinstance(lower_tax_limit, float) and 0 <= lower_tax_limit <= 999.99
         self.__lower_tax_limit = lower_tax_limit
 
+    def from_bytes(B: bytes, number: int):
+        """creates a new tax object from the 90 bytes of tax slot `number`"""
+        return Tax(*Tax._decode(B, number))
+
+    def _decode(B: bytes, number: int) -> tuple:
+        """decodes the bytes of tax slot `number` into the arguments of `Tax.__init__`"""
+        assert len(B) == 90
+        _tax_rate = float(B[2:6].hex()) / 1e4
+        if B[1] == 13:
+            _tax_rate *= -1
+        _lower_tax_limit = float(B[9:12].hex()) / 100
+        return (number, _tax_rate, _lower_tax_limit)
+
     def __repr__(self):
         return f"Tax(number={self.__number}, tax_rate={self.__tax_rate}, lower_tax_rate={self.__lower_tax_limit})"
-    
+
+    @property
+    def number(self) -> int:
+        return self.__number
+
+    @property
+    def tax_rate(self) -> float:
+        return self.__tax_rate
+
+    @property
+    def lower_tax_limit(self) -> float:
+        return self.__lower_tax_limit
+
     def to_bytes(self) -> bytes:
         B = bytearray([0] * 90)
         if (self.__tax_rate == 0 and
@@ -371,9 +738,9 @@ class Tax:
             return bytes(B)
         B[0] = 1
         if self.__tax_rate < 0.:
-            B[1] = b'\x0D'
-        B[2:6] = int2hex(int(self.__tax_rate * 1e4), 4)
-        B[9:12] = int2hex(int(self.__lower_tax_limit * 100), 3)
+            B[1] = 0x0D
+        B[2:6] = int2hex(round(abs(self.__tax_rate) * 1e4), 4)
+        B[9:12] = int2hex(round(self.__lower_tax_limit * 100), 3)
         return bytes(B)
 
 class Programming:
@@ -400,7 +767,14 @@ class Programming:
         assert isinstance(tax, list) and all(map(lambda x: isinstance(x, Tax), tax))
         self.tax = tax
 
-    def read_directory(directory: str):
+    def read_directory(directory: str, logo_file: str = None):
+        """reads the PROGRAM directory of an SD card
+
+        Args:
+            directory (str):    root directory of the SD card
+            logo_file (str):    file in PROGRAM/ holding the logo (see `import_logo`), the logo
+                                is empty if not given since the register's own file is not known
+        """
         products_file = directory + "/PROGRAM/PLUDT.SDA"
         departments_file = directory + "/PROGRAM/DEPTDT.SDA"
         taxes_file = directory + "/PROGRAM/TAXTB.SDA"
@@ -408,92 +782,220 @@ class Programming:
         
         dept = import_departments(departments_file)
         plu = import_products(products_file)
-        #logo = import_logo(logo_file)
+        logo = import_logo(directory + "/PROGRAM/" + logo_file) if logo_file else Logo()
         logo_msg = import_logo_msg(logo_msg_file)
         tax = import_taxes(taxes_file)
+        return Programming(dept, plu, logo, logo_msg, tax)
+
+    def write_directory(self, directory: str, logo_file: str = None):
+        """writes the PROGRAM directory of an SD card
 
-    def write_directory(self, directory: str):
+        Args:
+            directory (str):    root directory of the SD card
+            logo_file (str):    file in PROGRAM/ to write the logo to (see `export_logo`),
+                                the logo is not written if not given
+        """
         products_file = directory + "/PROGRAM/PLUDT.SDA"
         departments_file = directory + "/PROGRAM/DEPTDT.SDA"
         taxes_file = directory + "/PROGRAM/TAXTB.SDA"
         logo_msg_file = directory + "/PROGRAM/LOGODT.SDA"
-        return (export_products(products_file, self.products),
-                export_departments(departments_file, self.departments),
-                export_taxes(taxes_file, self.taxes),
-                export_logo_msg(logo_msg_file, self.logo_msg))
-
-def import_products(file: str):
-    products = []
-    with open(file, 'br') as f:
-        while (B := f.read(31)):
-            products.append(Product.from_bytes(B))
-    return products
+        written = (export_products(products_file, self.plu),
+                   export_departments(departments_file, self.dept),
+                   export_taxes(taxes_file, self.tax),
+                   export_logo_msg(logo_msg_file, self.logo_msg))
+        if logo_file:
+            written += (export_logo(directory + "/PROGRAM/" + logo_file, self.logo),)
+        return written
+
+def _import_instrumented(file: str, record_size: int, decode, construct, metrics) -> list:
+    """imports records like the import_* functions, but measures every stage"""
+    with metrics.stage("read", file):
+        with open(file, 'br') as f:
+            B = f.read()
+    chunks = [B[i:i + record_size] for i in range(0, len(B), record_size)]
+    with metrics.stage("decode", file, len(chunks)):
+        fields = [decode(chunk, i) for i, chunk in enumerate(chunks, 1)]
+    with metrics.stage("validate", file, len(fields)):
+        return [construct(*args) for args in fields]
+
+def _export_instrumented(file: str, items: list, cls, record_size: int, metrics) -> bytearray:
+    """exports records like the export_* functions, but measures every stage"""
+    with metrics.stage("validate", file, len(items)):
+        assert all(isinstance(item, cls) for item in items)
+    with metrics.stage("encode", file, len(items)):
+        B = bytearray().join(item.to_bytes() for item in items)
+        assert len(items) * record_size == len(B)
+    with metrics.stage("write", file, len(items)):
+        with open(file, 'bw') as f:
+            f.write(B)
+    return B
 
-def export_products(file: str, products: list[Product]):
-    with open(file, 'bw') as f:
-        B = bytearray([])
-        for prod in products:
-            assert isinstance(prod, Product)
-            prod_bytes = prod.to_bytes()
-            assert len(prod_bytes) == 31, f"{len(prod_bytes)}, {prod_bytes}"
-            B = B + prod_bytes
-        assert len(products) * 31 == len(B)
+def _import_backend(file: str, record_size: int, codec: str, method: str) -> list:
+    """reads a file and decodes it with `method` of the codec backend, measuring the stages if profiling is active"""
+    from . import backends
+    metrics = _instrumentation.current()
+    if metrics is None:
+        with open(file, 'br') as f:
+            B = f.read()
+        return getattr(backends.get(codec, len(B) // record_size), method)(B)
+    with metrics.stage("read", file):
+        with open(file, 'br') as f:
+            B = f.read()
+    decode = getattr(backends.get(codec, len(B) // record_size), method)
+    with metrics.stage("decode", file, len(B) // record_size):
+        return decode(B)
+
+def _export_encoded(file: str, items: list, encode) -> bytes:
+    """writes `encode(items)` to a file, measuring the stages if profiling is active"""
+    metrics = _instrumentation.current()
+    if metrics is None:
+        B = encode(items)
+        with open(file, 'bw') as f:
+            f.write(B)
         return B
+    with metrics.stage("encode", file, len(items)):
+        B = encode(items)
+    with metrics.stage("write", file, len(items)):
+        with open(file, 'bw') as f:
+            f.write(B)
+    return B
 
-def import_departments(file: str):
-    departments = []
+def import_products(file: str, codec: str = None):
+    """reads PLUDT.SDA
+
+    Args:
+        file (str):     path of the file
+        codec (str):    name of the codec backend, see `backends.get`
+    """
+    return _import_backend(file, 31, codec, "decode_products")
+
+def export_products(file: str, products: list[Product], codec: str = None):
+    """writes PLUDT.SDA and returns its content
+
+    Args:
+        file (str):                 path of the file
+        products (list[Product]):   PLUs in the order of the file
+        codec (str):                name of the codec backend, see `backends.get`
+    """
+    return _export_encoded(file, products, lambda items: encode_products(items, codec))
+
+def encode_products(products: list[Product], codec: str = None) -> bytes:
+    """encodes PLUs into the content of PLUDT.SDA exactly like `export_products`, without writing a file"""
+    from . import backends
+    B = backends.get(codec, len(products)).encode_products(products)
+    assert len(products) * 31 == len(B)
+    return B
+
+def import_departments(file: str, codec: str = None):
+    """reads DEPTDT.SDA
+
+    Args:
+        file (str):     path of the file
+        codec (str):    name of the codec backend, see `backends.get`
+    """
+    return _import_backend(file, 28, codec, "decode_departments")
+
+def export_departments(file: str, department: list[Department], codec: str = None):
+    """writes DEPTDT.SDA and returns its content
+
+    Args:
+        file (str):                     path of the file
+        department (list[Department]):  departments in the order of the file
+        codec (str):                    name of the codec backend, see `backends.get`
+    """
+    return _export_encoded(file, department, lambda items: encode_departments(items, codec))
+
+def encode_departments(departments: list[Department], codec: str = None) -> bytes:
+    """encodes departments into the content of DEPTDT.SDA exactly like `export_departments`, without writing a file"""
+    from . import backends
+    B = backends.get(codec, len(departments)).encode_departments(departments)
+    assert len(departments) * 28 == len(B)
+    return B
+
+def import_department_table(file: str) -> DepartmentTable:
     with open(file, 'br') as f:
-        while (B := f.read(28)):
-            departments.append(Department.from_bytes(B))
-    return departments
+        return DepartmentTable.from_bytes(f.read())
 
-def export_departments(file: str, department: list[Department]):
+def export_department_table(file: str, table: DepartmentTable):
+    assert isinstance(table, DepartmentTable)
+    B = table.to_bytes()
     with open(file, 'bw') as f:
-        B = bytearray([])
-        for dept in department:
-            assert isinstance(dept, Department)
-            dept_bytes = dept.to_bytes()
-            assert len(dept_bytes) == 28
-            B = B + dept_bytes
-        assert len(department) * 28 == len(B)
         f.write(B)
-        return B
+    return B
 
 def import_taxes(file: str):
+    metrics = _instrumentation.current()
+    if metrics is not None:
+        return _import_instrumented(file, 90, Tax._decode, Tax, metrics)
     taxes = []
     with open(file, 'br') as f:
         i = 1
         while (B := f.read(90)):
-            _tax_no = i
-            _tax_rate = float(B[2:6].hex()) / 1e4
-            if B[1] == 13:
-                _tax_rate *= -1
-            _lower_tax_limit = float(B[9:12].hex()) / 100
-            taxes.append(Tax(_tax_no, _tax_rate, _lower_tax_limit))
+            taxes.append(Tax.from_bytes(B, i))
+            i += 1
     return taxes
 
 def export_taxes(file: str, taxes: list[Tax]):
+    metrics = _instrumentation.current()
+    if metrics is not None:
+        return _export_instrumented(file, taxes, Tax, 90, metrics)
+    B = encode_taxes(taxes)
     with open(file, "bw") as f:
-        B = bytearray([])
-        for tax in taxes:
-            assert isinstance(tax, Tax)
-            tax_bytes = tax.to_bytes()
-            assert len(tax_bytes) == 90
-            B = B + tax_bytes
-        assert len(taxes) * 90 == len(B)
         f.write(B)
-        return B
+    return B
+
+def encode_taxes(taxes: list[Tax]) -> bytearray:
+    """encodes taxes into the content of TAXTB.SDA exactly like `export_taxes`, without writing a file"""
+    B = bytearray([])
+    for tax in taxes:
+        assert isinstance(tax, Tax)
+        tax_bytes = tax.to_bytes()
+        assert len(tax_bytes) == 90
+        B += tax_bytes
+    assert len(taxes) * 90 == len(B)
+    return B
 
 def import_logo_msg(file: str) -> Logo_msg:
+    metrics = _instrumentation.current()
+    if metrics is not None:
+        with metrics.stage("read", file):
+            with open(file, "br") as f:
+                B = f.read()
+        with metrics.stage("decode", file, 1):
+            return Logo_msg.from_bytes(B)
     logo_msg: Logo_msg
     with open(file, "br") as f:
         logo_msg = Logo_msg.from_bytes(f.read())
     return logo_msg
 
 def export_logo_msg(file: str, logo_msg: Logo_msg):
+    metrics = _instrumentation.current()
+    if metrics is not None:
+        with metrics.stage("encode", file, 1):
+            B = logo_msg.to_bytes()
+        with metrics.stage("write", file, 1):
+            with open(file, "bw") as f:
+                f.write(B)
+        return
     with open(file, "bw") as f:
         f.write(logo_msg.to_bytes())
 
+def import_logo(file: str) -> Logo:
+    """reads a logo stored with `export_logo`, an empty logo is returned if the file does not exist"""
+    try:
+        with open(file, "br") as f:
+            return Logo.from_bytes(f.read())
+    except FileNotFoundError:
+        return Logo()
+
+def export_logo(file: str, logo: Logo):
+    """writes the packed bitmap of a logo (see `Logo`), nothing is written for an empty logo"""
+    assert isinstance(logo, Logo)
+    if logo.is_empty():
+        return
+    with open(file, "bw") as f:
+        f.write(logo.to_bytes())
+
 def decode_text_part(B: bytes) -> str:
     string = []
     for character in B:
@@ -0,0 +1,203 @@
+"""Columnar access to SDA files through NumPy structured arrays
+
+Requires the optional dependency NumPy (`pip install xe-a207[numpy]`).
+
+PLUDT.SDA and DEPTDT.SDA are decoded into structured arrays with the dtypes
+`PRODUCT_DTYPE` and `DEPARTMENT_DTYPE`: prices and HALOs are integer cents,
+taxable is the VAT byte and names are the raw zero padded Code page 437 bytes.
+Decoding and encoding are vectorized over all records. The arrays can be
+stored as .npy (loadable with `mmap_mode='r'`) or .npz files.
+"""
+import os
+
+import numpy as np
+
+from . import records
+
+PRODUCT_DTYPE = np.dtype([
+    ("code", "<u4"),
+    ("dept_no", "u1"),
+    ("open", "?"),
+    ("preset", "?"),
+    ("price", "<i8"),
+    ("text", "S16"),
+])
+
+DEPARTMENT_DTYPE = np.dtype([
+    ("code", "u1"),
+    ("sales_type", "?"),
+    ("open", "?"),
+    ("preset", "?"),
+    ("taxable", "u1"),
+    ("halo", "<i8"),
+    ("group_no", "u1"),
+    ("price", "<i8"),
+    ("text", "S16"),
+])
+
+def _as_matrix(B, record_size: int) -> np.ndarray:
+    raw = np.frombuffer(B, dtype=np.uint8)
+    assert raw.size % record_size == 0, f"{raw.size % record_size} trailing bytes do not form a complete record"
+    return raw.reshape(-1, record_size)
+
+def bcd_decode(columns: np.ndarray, name: str = "value") -> np.ndarray:
+    """decodes the packed BCD byte columns of a (records, bytes) matrix into int64 values"""
+    high = columns >> 4
+    low = columns & 0x0F
+    invalid = (high > 9) | (low > 9)
+    if invalid.any():
+        row = int(np.nonzero(invalid.any(axis=1))[0][0])
+        raise ValueError(f"record {row}: non decimal BCD digit in {name}")
+    digits = (high * 10 + low).astype(np.int64)
+    value = np.zeros(len(columns), dtype=np.int64)
+    for i in range(columns.shape[1]):
+        value = value * 100 + digits[:, i]
+    return value
+
+def bcd_encode(values: np.ndarray, width: int, name: str = "value") -> np.ndarray:
+    """encodes non negative integers into a (records, width) matrix of packed BCD bytes"""
+    values = np.asarray(values, dtype=np.int64)
+    if ((values < 0) | (values >= 100 ** width)).any():
+        raise ValueError(f"{name} does not fit into {width} BCD bytes")
+    columns = np.empty((len(values), width), dtype=np.uint8)
+    for i in range(width - 1, -1, -1):
+        pair = values % 100
+        columns[:, i] = (pair // 10) << 4 | pair % 10
+        values = values // 100
+    return columns
+
+def _text_column(matrix: np.ndarray) -> np.ndarray:
+    # everything after the first zero byte is ignored, like decode_text_part does
+    text = matrix.copy()
+    text[np.cumsum(text == 0, axis=1) > 0] = 0
+    return np.ascontiguousarray(text).view("S16").reshape(-1)
+
+def _text_matrix(text: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(text, dtype="S16").view(np.uint8).reshape(-1, 16)
+
+def decode_products(B) -> np.ndarray:
+    """decodes the content of PLUDT.SDA into an array of `PRODUCT_DTYPE`"""
+    raw = _as_matrix(B, records.PRODUCT_RECORD_SIZE)
+    result = np.empty(len(raw), dtype=PRODUCT_DTYPE)
+    result["code"] = bcd_decode(raw[:, 5:8], "code")
+    result["dept_no"] = bcd_decode(raw[:, 8:9], "dept_no")
+    result["open"] = raw[:, 9] & 0b01 != 0
+    result["preset"] = raw[:, 9] & 0b10 != 0
+    result["price"] = bcd_decode(raw[:, 10:15], "price")
+    result["text"] = _text_column(raw[:, 15:31])
+    return result
+
+def encode_products(products: np.ndarray) -> bytes:
+    """encodes an array of `PRODUCT_DTYPE` into the content of PLUDT.SDA"""
+    if ((products["code"] == 0) | (products["dept_no"] < 1) | (products["dept_no"] > 99)).any():
+        raise ValueError("invalid PLU code or department number")
+    raw = np.zeros((len(products), records.PRODUCT_RECORD_SIZE), dtype=np.uint8)
+    raw[:, 5:8] = bcd_encode(products["code"], 3, "code")
+    raw[:, 8:9] = bcd_encode(products["dept_no"], 1, "dept_no")
+    raw[:, 9] = products["open"].astype(np.uint8) | products["preset"].astype(np.uint8) << 1
+    raw[:, 10:15] = bcd_encode(products["price"], 5, "price")
+    raw[:, 15:31] = _text_matrix(products["text"])
+    return raw.tobytes()
+
+def decode_departments(B) -> np.ndarray:
+    """decodes the content of DEPTDT.SDA into an array of `DEPARTMENT_DTYPE`"""
+    raw = _as_matrix(B, records.DEPARTMENT_RECORD_SIZE)
+    flags = raw[:, 1]
+    if ((flags & ~np.uint8(0b10011)) != 0).any() or (raw[:, 2] > 15).any():
+        row = int(np.nonzero(((flags & ~np.uint8(0b10011)) != 0) | (raw[:, 2] > 15))[0][0])
+        raise ValueError(f"record {row}: illegal flag bits")
+    result = np.empty(len(raw), dtype=DEPARTMENT_DTYPE)
+    result["code"] = bcd_decode(raw[:, 0:1], "code")
+    result["sales_type"] = flags & 0b10000 != 0
+    result["open"] = flags & 0b00001 != 0
+    result["preset"] = flags & 0b00010 != 0
+    result["taxable"] = raw[:, 2]
+    result["halo"] = bcd_decode(raw[:, 3:7], "halo")
+    result["group_no"] = bcd_decode(raw[:, 7:8], "group_no")
+    result["price"] = bcd_decode(raw[:, 8:12], "price")
+    result["text"] = _text_column(raw[:, 12:28])
+    return result
+
+def encode_departments(departments: np.ndarray) -> bytes:
+    """encodes an array of `DEPARTMENT_DTYPE` into the content of DEPTDT.SDA"""
+    if (departments["taxable"] > 15).any() or (departments["group_no"] > 12).any():
+        raise ValueError("invalid taxable byte or group number")
+    raw = np.zeros((len(departments), records.DEPARTMENT_RECORD_SIZE), dtype=np.uint8)
+    raw[:, 0:1] = bcd_encode(departments["code"], 1, "code")
+    raw[:, 1] = (departments["sales_type"].astype(np.uint8) << 4 |
+                 departments["preset"].astype(np.uint8) << 1 |
+                 departments["open"].astype(np.uint8))
+    raw[:, 2] = departments["taxable"]
+    raw[:, 3:7] = bcd_encode(departments["halo"], 4, "halo")
+    raw[:, 7:8] = bcd_encode(departments["group_no"], 1, "group_no")
+    raw[:, 8:12] = bcd_encode(departments["price"], 4, "price")
+    raw[:, 12:28] = _text_matrix(departments["text"])
+    return raw.tobytes()
+
+def read_products(file: str) -> np.ndarray:
+    with open(file, "br") as f:
+        return decode_products(f.read())
+
+def write_products(file: str, products: np.ndarray):
+    with open(file, "bw") as f:
+        f.write(encode_products(products))
+
+def read_departments(file: str) -> np.ndarray:
+    with open(file, "br") as f:
+        return decode_departments(f.read())
+
+def write_departments(file: str, departments: np.ndarray):
+    with open(file, "bw") as f:
+        f.write(encode_departments(departments))
+
+def texts(array: np.ndarray) -> list[str]:
+    """decodes the name column of a PLU or department array"""
+    return [text.decode("cp437") for text in array["text"].tolist()]
+
+def card_to_npy(directory: str, output: str):
+    """stores PLUDT.SDA and DEPTDT.SDA of an SD card as plu.npy and dept.npy in `output`"""
+    program = os.path.join(directory, "PROGRAM")
+    os.makedirs(output, exist_ok=True)
+    np.save(os.path.join(output, "plu.npy"), read_products(os.path.join(program, "PLUDT.SDA")))
+    np.save(os.path.join(output, "dept.npy"), read_departments(os.path.join(program, "DEPTDT.SDA")))
+
+def card_to_npz(directory: str, file: str, compressed: bool = False):
+    """stores PLUDT.SDA and DEPTDT.SDA of an SD card as the arrays plu and dept of an .npz file"""
+    program = os.path.join(directory, "PROGRAM")
+    save = np.savez_compressed if compressed else np.savez
+    save(file,
+         plu=read_products(os.path.join(program, "PLUDT.SDA")),
+         dept=read_departments(os.path.join(program, "DEPTDT.SDA")))
+
+def npy_to_card(source: str, directory: str):
+    """writes plu.npy and dept.npy (or an .npz file with the arrays plu and dept) to an SD card"""
+    if os.path.isdir(source):
+        products = np.load(os.path.join(source, "plu.npy"), mmap_mode="r")
+        departments = np.load(os.path.join(source, "dept.npy"), mmap_mode="r")
+    else:
+        with np.load(source) as arrays:
+            products, departments = arrays["plu"], arrays["dept"]
+    program = os.path.join(directory, "PROGRAM")
+    os.makedirs(program, exist_ok=True)
+    write_products(os.path.join(program, "PLUDT.SDA"), products)
+    write_departments(os.path.join(program, "DEPTDT.SDA"), departments)
+
+def fleet_to_npy(directories: list[str], output: str):
+    """concatenates the tables of many SD cards into plu.npy and dept.npy in `output`
+
+    The additional int32 column `card` holds the index of the card in `directories`.
+    """
+    products = [read_products(os.path.join(d, "PROGRAM", "PLUDT.SDA")) for d in directories]
+    departments = [read_departments(os.path.join(d, "PROGRAM", "DEPTDT.SDA")) for d in directories]
+    os.makedirs(output, exist_ok=True)
+    for name, tables, dtype in (("plu.npy", products, PRODUCT_DTYPE), ("dept.npy", departments, DEPARTMENT_DTYPE)):
+        fleet_dtype = np.dtype([("card", "<i4")] + [(field, dtype.fields[field][0]) for field in dtype.names])
+        fleet = np.empty(sum(len(t) for t in tables), dtype=fleet_dtype)
+        offset = 0
+        for card, table in enumerate(tables):
+            part = fleet[offset:offset + len(table)]
+            part["card"] = card
+            for field in dtype.names:
+                part[field] = table[field]
+            offset += len(table)
+        np.save(os.path.join(output, name), fleet)
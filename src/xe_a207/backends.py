@@ -0,0 +1,254 @@
+"""Codec backends for PLUDT.SDA and DEPTDT.SDA behind the import_*/export_* functions
+
+All backends produce the same `Product`/`Department` objects and byte
+identical files for valid input, they only differ in speed:
+
+    "pure"      `from_bytes`/`to_bytes` record by record, the reference implementation
+    "struct"    one `struct.Struct` unpacks/packs all fields of a record, the fields
+                are converted with the helpers of `records`
+    "numpy"     vectorized decoding and encoding of all records with `arrays`,
+                only available if NumPy is installed
+
+`import_products`, `import_departments`, `export_products` and
+`export_departments` pick a backend for every call (the first one that is set):
+
+    1. the `codec` argument of the call
+    2. the backend set with `use` for the current context
+    3. the environment variable XE_A207_CODEC
+    4. automatically by the number of records (see `AUTO`) and the installed
+       optional dependencies
+
+"auto" can be used in all places to ask for the automatic selection. Further
+backends (subclasses of `Backend`) can be added with `register`. All backends
+raise ValueError for invalid records.
+"""
+import abc
+import contextlib
+import contextvars
+import functools
+import os
+import struct
+
+from .XE_A207 import Department, Product, Taxable
+from .records import bcd_decode, bcd_encode, decode_text, encode_text
+
+ENVIRONMENT_VARIABLE = "XE_A207_CODEC"
+
+# automatic selection: the first backend whose minimum number of records is reached and which is available;
+# measured per record, "struct" is faster than "pure" from the first record and "numpy" from about 64 records
+AUTO = [("numpy", 64), ("struct", 0)]
+
+class Backend(abc.ABC):
+    """Codec for lists of PLUs and departments
+
+    decode_* raise ValueError for invalid records (use `rejects_invalid`),
+    encode_* assert that they get `Product`/`Department` objects.
+    """
+    name = None
+
+    def available(self) -> bool:
+        return True
+
+    @abc.abstractmethod
+    def decode_products(self, B: bytes) -> list[Product]:
+        pass
+
+    @abc.abstractmethod
+    def encode_products(self, products: list[Product]) -> bytes:
+        pass
+
+    @abc.abstractmethod
+    def decode_departments(self, B: bytes) -> list[Department]:
+        pass
+
+    @abc.abstractmethod
+    def encode_departments(self, departments: list[Department]) -> bytes:
+        pass
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r}>"
+
+def rejects_invalid(decode):
+    """decorator for decode methods, turns failed record validation (AssertionError) into ValueError
+    so that every backend raises the same exception for the same invalid file"""
+    @functools.wraps(decode)
+    def wrapper(self, B):
+        try:
+            return decode(self, B)
+        except AssertionError as error:
+            raise ValueError(f"invalid record: {error}" if str(error) else "invalid record") from error
+    return wrapper
+
+class PureBackend(Backend):
+    name = "pure"
+
+    @rejects_invalid
+    def decode_products(self, B):
+        return [Product.from_bytes(B[i:i + 31]) for i in range(0, len(B), 31)]
+
+    def encode_products(self, products):
+        B = bytearray()
+        for prod in products:
+            assert isinstance(prod, Product)
+            B += prod.to_bytes()
+        assert len(products) * 31 == len(B)
+        return B
+
+    @rejects_invalid
+    def decode_departments(self, B):
+        return [Department.from_bytes(B[i:i + 28]) for i in range(0, len(B), 28)]
+
+    def encode_departments(self, departments):
+        B = bytearray()
+        for dept in departments:
+            assert isinstance(dept, Department)
+            B += dept.to_bytes()
+        assert len(departments) * 28 == len(B)
+        return B
+
+class StructBackend(Backend):
+    name = "struct"
+    # code, dept_no, flags, price, name
+    _PRODUCT = struct.Struct("5x3ssB5s16s")
+    # code, flags, taxable, halo, group_no, price, name
+    _DEPARTMENT = struct.Struct("sBB4ss4s16s")
+
+    @rejects_invalid
+    def decode_products(self, B):
+        assert len(B) % 31 == 0
+        return [Product(bcd_decode(code), bcd_decode(dept_no), flags & 0b01 != 0, flags & 0b10 != 0,
+                        bcd_decode(price) / 100., decode_text(text))
+                for code, dept_no, flags, price, text in self._PRODUCT.iter_unpack(B)]
+
+    def encode_products(self, products):
+        pack = self._PRODUCT.pack
+        chunks = []
+        for prod in products:
+            assert isinstance(prod, Product)
+            chunks.append(pack(bcd_encode(prod.code, 3), bcd_encode(prod.dept_no, 1), prod.flags,
+                               bcd_encode(round(prod.price * 100.), 5), encode_text(prod.text, 16)))
+        return b"".join(chunks)
+
+    @rejects_invalid
+    def decode_departments(self, B):
+        assert len(B) % 28 == 0
+        departments = []
+        for code, flags, taxable, halo, group_no, price, text in self._DEPARTMENT.iter_unpack(B):
+            assert flags & ~0b10011 == 0
+            departments.append(Department(bcd_decode(code), flags & 0b10000 != 0, flags & 0b00001 != 0, flags & 0b00010 != 0,
+                                          Taxable.from_byte(taxable), bcd_decode(halo) / 100., bcd_decode(group_no),
+                                          bcd_decode(price) / 100., decode_text(text)))
+        return departments
+
+    def encode_departments(self, departments):
+        pack = self._DEPARTMENT.pack
+        chunks = []
+        for dept in departments:
+            assert isinstance(dept, Department)
+            chunks.append(pack(bcd_encode(dept.code, 1), dept.flags, dept.taxable.to_byte(),
+                               bcd_encode(round(dept.halo * 100.), 4), bcd_encode(dept.group_no, 1),
+                               bcd_encode(round(dept.price * 100.), 4), encode_text(dept.text, 16)))
+        return b"".join(chunks)
+
+class NumpyBackend(Backend):
+    name = "numpy"
+
+    def available(self):
+        try:
+            import numpy
+        except ImportError:
+            return False
+        return True
+
+    @rejects_invalid
+    def decode_products(self, B):
+        from . import arrays
+        a = arrays.decode_products(B)
+        return list(map(Product, a["code"].tolist(), a["dept_no"].tolist(), a["open"].tolist(), a["preset"].tolist(),
+                        (a["price"] / 100.).tolist(), arrays.texts(a)))
+
+    def encode_products(self, products):
+        import numpy as np
+        from . import arrays
+        assert all(isinstance(prod, Product) for prod in products)
+        a = np.empty(len(products), dtype=arrays.PRODUCT_DTYPE)
+        a["code"] = [prod.code for prod in products]
+        a["dept_no"] = [prod.dept_no for prod in products]
+        a["open"] = [prod.open for prod in products]
+        a["preset"] = [prod.preset for prod in products]
+        a["price"] = [round(prod.price * 100.) for prod in products]
+        a["text"] = [prod.text.encode("cp437") for prod in products]
+        return arrays.encode_products(a)
+
+    @rejects_invalid
+    def decode_departments(self, B):
+        from . import arrays
+        a = arrays.decode_departments(B)
+        return list(map(Department, a["code"].tolist(), a["sales_type"].tolist(), a["open"].tolist(), a["preset"].tolist(),
+                        map(Taxable.from_byte, a["taxable"].tolist()), (a["halo"] / 100.).tolist(),
+                        a["group_no"].tolist(), (a["price"] / 100.).tolist(), arrays.texts(a)))
+
+    def encode_departments(self, departments):
+        import numpy as np
+        from . import arrays
+        assert all(isinstance(dept, Department) for dept in departments)
+        a = np.empty(len(departments), dtype=arrays.DEPARTMENT_DTYPE)
+        a["code"] = [dept.code for dept in departments]
+        a["sales_type"] = [dept.sales_type for dept in departments]
+        a["open"] = [dept.open for dept in departments]
+        a["preset"] = [dept.preset for dept in departments]
+        a["taxable"] = [dept.taxable.to_byte() for dept in departments]
+        a["halo"] = [round(dept.halo * 100.) for dept in departments]
+        a["group_no"] = [dept.group_no for dept in departments]
+        a["price"] = [round(dept.price * 100.) for dept in departments]
+        a["text"] = [dept.text.encode("cp437") for dept in departments]
+        return arrays.encode_departments(a)
+
+BACKENDS = {}
+
+def register(backend: Backend):
+    """adds a backend to the registry (or replaces the one with the same name)"""
+    assert isinstance(backend, Backend) and backend.name and backend.name != "auto"
+    BACKENDS[backend.name] = backend
+    return backend
+
+register(PureBackend())
+register(StructBackend())
+register(NumpyBackend())
+
+_current = contextvars.ContextVar("xe_a207_codec", default=None)
+
+@contextlib.contextmanager
+def use(name: str):
+    """selects a backend by name (or "auto") for all calls inside the with block"""
+    token = _current.set(name)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+def available() -> list[str]:
+    """names of the registered backends whose optional dependencies are installed"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def get(name: str = None, count: int = 0) -> Backend:
+    """returns the backend for a call with `count` records, see the module documentation for the order
+
+    Raises:
+        ValueError: the requested backend is unknown or not available
+    """
+    for requested in (name, _current.get(), os.environ.get(ENVIRONMENT_VARIABLE)):
+        if requested and requested != "auto":
+            backend = BACKENDS.get(requested)
+            if backend is None:
+                raise ValueError(f"unknown codec backend {requested!r}, known are {', '.join(BACKENDS)}")
+            if not backend.available():
+                raise ValueError(f"codec backend {requested!r} is not available")
+            return backend
+        if requested == "auto":
+            break
+    for candidate, minimum in AUTO:
+        backend = BACKENDS.get(candidate)
+        if count >= minimum and backend is not None and backend.available():
+            return backend
+    return BACKENDS["pure"]
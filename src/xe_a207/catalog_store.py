@@ -0,0 +1,350 @@
+"""SQLite mirror of the catalog of a SHARP XE-A207 cash register
+
+The store keeps PLUs, departments, taxes and the logo message in a local
+SQLite database. Every PLU and department row remembers its record slot in
+PLUDT.SDA / DEPTDT.SDA and whether it was changed since the last sync, so
+`CatalogStore.sync` only rewrites the records that actually changed.
+The code columns are the primary keys (and therefore indexed), PLUs are
+additionally indexed by their department number.
+"""
+import csv
+import os
+import sqlite3
+
+from .XE_A207 import (Department, Logo_msg, Product, Tax, Taxable,
+                      export_departments, export_logo_msg, export_products,
+                      export_taxes, import_departments, import_logo_msg,
+                      import_products, import_taxes)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plu (
+    code     INTEGER PRIMARY KEY,
+    dept_no  INTEGER NOT NULL,
+    open     INTEGER NOT NULL,
+    preset   INTEGER NOT NULL,
+    price    INTEGER NOT NULL,
+    text     TEXT    NOT NULL,
+    slot     INTEGER,
+    dirty    INTEGER NOT NULL DEFAULT 1,
+    deleted  INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS plu_dept_no ON plu (dept_no);
+CREATE INDEX IF NOT EXISTS plu_dirty ON plu (dirty) WHERE dirty = 1;
+CREATE TABLE IF NOT EXISTS dept (
+    code       INTEGER PRIMARY KEY,
+    sales_type INTEGER NOT NULL,
+    open       INTEGER NOT NULL,
+    preset     INTEGER NOT NULL,
+    taxable    INTEGER NOT NULL,
+    halo       INTEGER NOT NULL,
+    group_no   INTEGER NOT NULL,
+    price      INTEGER NOT NULL,
+    text       TEXT    NOT NULL,
+    slot       INTEGER,
+    dirty      INTEGER NOT NULL DEFAULT 1,
+    deleted    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS dept_dirty ON dept (dirty) WHERE dirty = 1;
+CREATE TABLE IF NOT EXISTS tax (
+    number          INTEGER PRIMARY KEY,
+    tax_rate        INTEGER NOT NULL,
+    lower_tax_limit INTEGER NOT NULL,
+    dirty           INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS logo_msg (
+    row   INTEGER PRIMARY KEY,
+    text  TEXT    NOT NULL,
+    dirty INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+_PLU_COLUMNS = ("code", "dept_no", "open", "preset", "price", "text")
+_DEPT_COLUMNS = ("code", "sales_type", "open", "preset", "taxable", "halo", "group_no", "price", "text")
+
+def _upsert_statement(table: str, columns: tuple) -> str:
+    """builds an upsert that only marks a row dirty if one of its values changed"""
+    values = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+    changed = " OR ".join(f"{c} IS NOT excluded.{c}" for c in columns[1:])
+    return (f"INSERT INTO {table} ({', '.join(columns)}, slot, dirty) VALUES ({values}, NULL, 1) "
+            f"ON CONFLICT({columns[0]}) DO UPDATE SET {updates}, dirty = 1, deleted = 0 "
+            f"WHERE {changed} OR {table}.deleted = 1")
+
+def _mirror_statement(table: str, columns: tuple) -> str:
+    """builds an upsert for rows read from the card, which are stored unchanged at their slot"""
+    values = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+    return (f"INSERT INTO {table} ({', '.join(columns)}, slot, dirty) VALUES ({values}, ?, 0) "
+            f"ON CONFLICT({columns[0]}) DO UPDATE SET {updates}, slot = excluded.slot, dirty = 0, deleted = 0")
+
+_PLU_UPSERT = _upsert_statement("plu", _PLU_COLUMNS)
+_PLU_MIRROR = _mirror_statement("plu", _PLU_COLUMNS)
+_DEPT_UPSERT = _upsert_statement("dept", _DEPT_COLUMNS)
+_DEPT_MIRROR = _mirror_statement("dept", _DEPT_COLUMNS)
+
+def _cents(value: float) -> int:
+    return round(value * 100)
+
+def _product_row(prod: Product) -> tuple:
+    assert isinstance(prod, Product)
+    return (prod.code, prod.dept_no, int(prod.open), int(prod.preset), _cents(prod.price), prod.text)
+
+def _department_row(dept: Department) -> tuple:
+    assert isinstance(dept, Department)
+    return (dept.code, int(dept.sales_type), int(dept.open), int(dept.preset), dept.taxable.to_byte(),
+            _cents(dept.halo), dept.group_no, _cents(dept.price), dept.text)
+
+def _product_from_row(row) -> Product:
+    code, dept_no, open_, preset, price, text = row
+    return Product(code, dept_no, bool(open_), bool(preset), price / 100., text)
+
+def _department_from_row(row) -> Department:
+    code, sales_type, open_, preset, taxable, halo, group_no, price, text = row
+    return Department(code, bool(sales_type), bool(open_), bool(preset), Taxable.from_byte(taxable),
+                      halo / 100., group_no, price / 100., text)
+
+def _parse_bool(value: str) -> bool:
+    value = value.strip().lower()
+    assert value in ("true", "false", "1", "0"), f"invalid boolean {value!r}"
+    return value in ("true", "1")
+
+class CatalogStore:
+    """Catalog of a cash register mirrored in a SQLite database"""
+    connection: sqlite3.Connection
+
+    def __init__(self, path: str = ":memory:"):
+        """opens (and if necessary creates) a catalog store
+
+        Args:
+            path (str): file name of the SQLite database, ":memory:" for a temporary store
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # bulk upserts
+    def upsert_products(self, products, slots=None) -> int:
+        """inserts or updates PLUs, rows are only marked as changed if their values differ
+
+        Args:
+            products (Iterable[Product]): PLUs to insert or update
+            slots (Iterable[int]): record slots in PLUDT.SDA, if the PLUs are already stored on the card
+        Returns:
+            int: number of inserted or changed PLUs
+        """
+        if slots is None:
+            statement, rows = _PLU_UPSERT, (_product_row(prod) for prod in products)
+        else:
+            statement, rows = _PLU_MIRROR, (_product_row(prod) + (slot,) for prod, slot in zip(products, slots))
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(statement, rows)
+            return self.connection.total_changes - before
+
+    def upsert_departments(self, departments, slots=None) -> int:
+        """inserts or updates departments, rows are only marked as changed if their values differ
+
+        Args:
+            departments (Iterable[Department]): departments to insert or update
+            slots (Iterable[int]): record slots in DEPTDT.SDA, if the departments are already stored on the card
+        Returns:
+            int: number of inserted or changed departments
+        """
+        if slots is None:
+            statement, rows = _DEPT_UPSERT, (_department_row(dept) for dept in departments)
+        else:
+            statement, rows = _DEPT_MIRROR, (_department_row(dept) + (slot,) for dept, slot in zip(departments, slots))
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(statement, rows)
+            return self.connection.total_changes - before
+
+    def set_taxes(self, taxes: list[Tax], dirty: bool = True):
+        with self.connection:
+            self.__replace_taxes(taxes, dirty)
+
+    def set_logo_msg(self, logo_msg: Logo_msg, dirty: bool = True):
+        with self.connection:
+            self.__replace_logo_msg(logo_msg, dirty)
+
+    def __replace_taxes(self, taxes: list[Tax], dirty: bool):
+        self.connection.execute("DELETE FROM tax")
+        self.connection.executemany(
+            "INSERT INTO tax (number, tax_rate, lower_tax_limit, dirty) VALUES (?, ?, ?, ?)",
+            ((tax.number, round(tax.tax_rate * 1e4), _cents(tax.lower_tax_limit), int(dirty)) for tax in taxes))
+
+    def __replace_logo_msg(self, logo_msg: Logo_msg, dirty: bool):
+        self.connection.execute("DELETE FROM logo_msg")
+        self.connection.executemany(
+            "INSERT INTO logo_msg (row, text, dirty) VALUES (?, ?, ?)",
+            ((i, row, int(dirty)) for i, row in enumerate(logo_msg.rows)))
+
+    def load_directory(self, directory: str):
+        """replaces the content of the store with the PROGRAM directory of an SD card,
+        the loaded rows are considered unchanged and missing files count as empty tables
+
+        Args:
+            directory (str): root directory of the SD card
+        """
+        program = os.path.join(directory, "PROGRAM")
+        def load(file_name, import_):
+            file = os.path.join(program, file_name)
+            return import_(file) if os.path.exists(file) else None
+        products = load("PLUDT.SDA", import_products) or []
+        departments = load("DEPTDT.SDA", import_departments) or []
+        taxes = load("TAXTB.SDA", import_taxes)
+        logo_msg = load("LOGODT.SDA", import_logo_msg)
+        # everything of a previously loaded card is dropped in the same transaction, so slots cannot collide
+        with self.connection:
+            self.connection.execute("DELETE FROM plu")
+            self.connection.execute("DELETE FROM dept")
+            self.connection.executemany(_PLU_MIRROR, (_product_row(prod) + (slot,) for slot, prod in enumerate(products)))
+            self.connection.executemany(_DEPT_MIRROR, (_department_row(dept) + (slot,) for slot, dept in enumerate(departments)))
+            self.__replace_taxes(taxes or [], dirty=False)
+            self.__replace_logo_msg(logo_msg or Logo_msg([]), dirty=False)
+
+    def load_products_csv(self, file: str) -> int:
+        """inserts or updates PLUs from a CSV file with the header code,dept_no,open,preset,price,text
+
+        Returns:
+            int: number of inserted or changed PLUs
+        """
+        with open(file, newline="", encoding="utf-8") as f:
+            products = (Product(int(row["code"]), int(row["dept_no"]), _parse_bool(row["open"]),
+                                _parse_bool(row["preset"]), float(row["price"]), row["text"])
+                        for row in csv.DictReader(f))
+            return self.upsert_products(products)
+
+    def load_departments_csv(self, file: str) -> int:
+        """inserts or updates departments from a CSV file with the header
+        code,sales_type,open,preset,taxable,halo,group_no,price,text where taxable is the VAT byte (0-15)
+
+        Returns:
+            int: number of inserted or changed departments
+        """
+        with open(file, newline="", encoding="utf-8") as f:
+            departments = (Department(int(row["code"]), _parse_bool(row["sales_type"]), _parse_bool(row["open"]),
+                                      _parse_bool(row["preset"]), Taxable.from_byte(int(row["taxable"])),
+                                      float(row["halo"]), int(row["group_no"]), float(row["price"]), row["text"])
+                           for row in csv.DictReader(f))
+            return self.upsert_departments(departments)
+
+    # queries
+    def product(self, code: int):
+        row = self.connection.execute(
+            f"SELECT {', '.join(_PLU_COLUMNS)} FROM plu WHERE code = ? AND deleted = 0", (code,)).fetchone()
+        return None if row is None else _product_from_row(row)
+
+    def department(self, code: int):
+        row = self.connection.execute(
+            f"SELECT {', '.join(_DEPT_COLUMNS)} FROM dept WHERE code = ? AND deleted = 0", (code,)).fetchone()
+        return None if row is None else _department_from_row(row)
+
+    def products(self, dept_no: int = None) -> list[Product]:
+        """all PLUs (of a department) in the order of their record slots"""
+        query = f"SELECT {', '.join(_PLU_COLUMNS)} FROM plu WHERE deleted = 0"
+        params = ()
+        if dept_no is not None:
+            query += " AND dept_no = ?"
+            params = (dept_no,)
+        query += " ORDER BY slot IS NULL, slot, code"
+        return [_product_from_row(row) for row in self.connection.execute(query, params)]
+
+    def departments(self) -> list[Department]:
+        """all departments in the order of their record slots"""
+        return [_department_from_row(row) for row in self.connection.execute(
+            f"SELECT {', '.join(_DEPT_COLUMNS)} FROM dept WHERE deleted = 0 ORDER BY slot IS NULL, slot, code")]
+
+    def taxes(self) -> list[Tax]:
+        return [Tax(number, tax_rate / 1e4, lower_tax_limit / 100.) for number, tax_rate, lower_tax_limit
+                in self.connection.execute("SELECT number, tax_rate, lower_tax_limit FROM tax ORDER BY number")]
+
+    def logo_msg(self) -> Logo_msg:
+        return Logo_msg([text for text, in self.connection.execute("SELECT text FROM logo_msg ORDER BY row")])
+
+    def changed_products(self) -> list[Product]:
+        return [_product_from_row(row) for row in self.connection.execute(
+            f"SELECT {', '.join(_PLU_COLUMNS)} FROM plu WHERE dirty = 1 AND deleted = 0 ORDER BY code")]
+
+    # deletions
+    def delete_product(self, code: int):
+        with self.connection:
+            self.connection.execute("UPDATE plu SET deleted = 1, dirty = 1 WHERE code = ?", (code,))
+
+    def delete_department(self, code: int):
+        with self.connection:
+            self.connection.execute("UPDATE dept SET deleted = 1, dirty = 1 WHERE code = ?", (code,))
+
+    # export
+    def sync(self, directory: str) -> dict:
+        """writes all changes since the last sync to the PROGRAM directory of an SD card
+
+        Changed records are overwritten in place and new records are appended. Only if records were
+        deleted (or the file does not exist yet) the whole file is rewritten.
+
+        Args:
+            directory (str): root directory of the SD card
+        Returns:
+            dict: number of written records per file
+        """
+        program = os.path.join(directory, "PROGRAM")
+        os.makedirs(program, exist_ok=True)
+        with self.connection:
+            return {
+                "PLUDT.SDA": self.__sync_table(os.path.join(program, "PLUDT.SDA"), "plu", _PLU_COLUMNS, 31,
+                                               _product_from_row, export_products),
+                "DEPTDT.SDA": self.__sync_table(os.path.join(program, "DEPTDT.SDA"), "dept", _DEPT_COLUMNS, 28,
+                                                _department_from_row, export_departments),
+                "TAXTB.SDA": self.__sync_taxes(os.path.join(program, "TAXTB.SDA")),
+                "LOGODT.SDA": self.__sync_logo_msg(os.path.join(program, "LOGODT.SDA")),
+            }
+
+    def __sync_table(self, file, table, columns, record_size, from_row, export) -> int:
+        con = self.connection
+        select = ", ".join(columns)
+        rewrite = (not os.path.exists(file) or
+                   con.execute(f"SELECT 1 FROM {table} WHERE deleted = 1 LIMIT 1").fetchone() is not None)
+        if rewrite:
+            con.execute(f"DELETE FROM {table} WHERE deleted = 1")
+            rows = con.execute(f"SELECT {select} FROM {table} ORDER BY slot IS NULL, slot, code").fetchall()
+            export(file, [from_row(row) for row in rows])
+            con.executemany(f"UPDATE {table} SET slot = ? WHERE code = ?",
+                            ((slot, row[0]) for slot, row in enumerate(rows)))
+            con.execute(f"UPDATE {table} SET dirty = 0 WHERE dirty = 1")
+            return len(rows)
+        rows = con.execute(f"SELECT {select}, slot FROM {table} WHERE dirty = 1 ORDER BY slot IS NULL, slot, code").fetchall()
+        with open(file, "r+b") as f:
+            next_slot = f.seek(0, os.SEEK_END) // record_size
+            for row in rows:
+                slot = row[-1]
+                if slot is None:
+                    slot = next_slot
+                    next_slot += 1
+                    con.execute(f"UPDATE {table} SET slot = ? WHERE code = ?", (slot, row[0]))
+                f.seek(slot * record_size)
+                f.write(from_row(row[:-1]).to_bytes())
+        con.execute(f"UPDATE {table} SET dirty = 0 WHERE dirty = 1")
+        return len(rows)
+
+    def __sync_taxes(self, file) -> int:
+        if self.connection.execute("SELECT 1 FROM tax WHERE dirty = 1 LIMIT 1").fetchone() is None:
+            return 0
+        taxes = self.taxes()
+        export_taxes(file, taxes)
+        self.connection.execute("UPDATE tax SET dirty = 0")
+        return len(taxes)
+
+    def __sync_logo_msg(self, file) -> int:
+        if self.connection.execute("SELECT 1 FROM logo_msg WHERE dirty = 1 LIMIT 1").fetchone() is None:
+            return 0
+        export_logo_msg(file, self.logo_msg())
+        self.connection.execute("UPDATE logo_msg SET dirty = 0")
+        return 1
@@ -0,0 +1,215 @@
+"""Command line interface `xe-a207` for SD cards of a SHARP XE-A207 cash register
+
+    xe-a207 dump CARD [--table plu|dept] [--format jsonl|tsv] [-o FILE]
+    xe-a207 load CARD FILE [--table plu|dept] [--format jsonl|tsv|csv]
+    xe-a207 diff CARD_A CARD_B [--table plu|dept]
+    xe-a207 patch CARD PATCH [--table plu|dept] [--dry-run]
+
+CARD is the root directory of the SD card (containing PROGRAM/). Only
+argparse is imported at startup, everything else is imported by the
+subcommand that needs it. Errors are reported on stderr with exit status 1;
+`load` and `patch` only replace the SDA file once their whole input was read
+and encoded, `patch --dry-run` checks the input the same way.
+"""
+import argparse
+import sys
+
+_FILES = {"plu": "PLUDT.SDA", "dept": "DEPTDT.SDA"}
+
+def _sda_file(card: str, table: str) -> str:
+    import os
+    return os.path.join(card, "PROGRAM", _FILES[table])
+
+def _codec(table: str):
+    """returns (record size, unpack, pack, columns) of a table"""
+    from . import records
+    if table == "plu":
+        from .csv_io import PRODUCT_COLUMNS
+        return records.PRODUCT_RECORD_SIZE, records.unpack_product, records.pack_product, PRODUCT_COLUMNS
+    from .csv_io import DEPARTMENT_COLUMNS
+    return records.DEPARTMENT_RECORD_SIZE, records.unpack_department, records.pack_department, DEPARTMENT_COLUMNS
+
+def _to_json_row(fields: tuple, columns: tuple) -> dict:
+    row = dict(zip(columns, fields))
+    for money in ("price", "halo"):
+        if money in row:
+            row[money] = row[money] / 100
+    return row
+
+def _from_json_row(row: dict, columns: tuple) -> tuple:
+    row = dict(row)
+    for money in ("price", "halo"):
+        if money in row:
+            row[money] = round(row[money] * 100)
+    return tuple(row[column] for column in columns)
+
+def _read_table(card: str, table: str) -> dict:
+    """reads a table as {code: (slot, fields)}"""
+    from .records import iter_records
+    record_size, unpack, _, _ = _codec(table)
+    with open(_sda_file(card, table), "br") as f:
+        B = f.read()
+    return {fields[0]: (slot, fields) for slot, fields in enumerate(map(unpack, iter_records(B, record_size)))}
+
+def dump(args) -> int:
+    from .records import iter_records
+    record_size, unpack, _, columns = _codec(args.table)
+    with open(_sda_file(args.card, args.table), "br") as f:
+        B = f.read()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        if args.format == "jsonl":
+            import json
+            for record in iter_records(B, record_size):
+                out.write(json.dumps(_to_json_row(unpack(record), columns), ensure_ascii=False) + "\n")
+        else:
+            from .csv_io import format_department, format_product
+            format_ = format_product if args.table == "plu" else format_department
+            out.writelines("\t".join(format_(record)) + "\n" for record in iter_records(B, record_size))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+def load(args) -> int:
+    import os
+    sda_file = _sda_file(args.card, args.table)
+    os.makedirs(os.path.dirname(sda_file), exist_ok=True)
+    if args.format == "jsonl":
+        import json
+        _, _, pack, columns = _codec(args.table)
+        from .csv_io import open_atomic
+        with open(args.file, encoding="utf-8") as src, open_atomic(sda_file) as dst:
+            count = 0
+            for number, line in enumerate(src, 1):
+                if line.strip():
+                    try:
+                        dst.write(pack(*_from_json_row(json.loads(line), columns)))
+                    except (KeyError, TypeError, ValueError, AssertionError) as error:
+                        raise ValueError(f"{args.file}: line {number}: {error!r}") from error
+                    count += 1
+    else:
+        from . import csv_io
+        convert = csv_io.products_to_sda if args.table == "plu" else csv_io.departments_to_sda
+        count = convert(args.file, sda_file, delimiter={"tsv": "\t", "csv": ","}[args.format])
+    print(f"{count} records written to {sda_file}", file=sys.stderr)
+    return 0
+
+def diff(args) -> int:
+    import json
+    _, _, _, columns = _codec(args.table)
+    old = _read_table(args.card_a, args.table)
+    new = _read_table(args.card_b, args.table)
+    differences = 0
+    for code in sorted(old.keys() | new.keys()):
+        before = old.get(code, (None, None))[1]
+        after = new.get(code, (None, None))[1]
+        if before == after:
+            continue
+        differences += 1
+        change = {"code": code}
+        if before is None:
+            change["added"] = _to_json_row(after, columns)
+        elif after is None:
+            change["removed"] = _to_json_row(before, columns)
+        else:
+            a, b = _to_json_row(before, columns), _to_json_row(after, columns)
+            change["changed"] = {key: [a[key], b[key]] for key in columns if a[key] != b[key]}
+        print(json.dumps(change, ensure_ascii=False))
+    return 1 if differences else 0
+
+def _read_patches(file: str) -> dict:
+    """reads price patches as {code: price in cents} from JSON Lines or "code<TAB>price" lines"""
+    import json
+    patches = {}
+    with open(file, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                row = json.loads(line)
+                patches[int(row["code"])] = round(float(row["price"]) * 100)
+            else:
+                code, price = line.replace(",", "\t").split("\t")[:2]
+                patches[int(code)] = round(float(price) * 100)
+    return patches
+
+def patch(args) -> int:
+    record_size, unpack, pack, columns = _codec(args.table)
+    price = columns.index("price")
+    table = _read_table(args.card, args.table)
+    patches = _read_patches(args.patch)
+    missing = sorted(patches.keys() - table.keys())
+    if missing:
+        raise ValueError(f"unknown codes: {', '.join(map(str, missing))}")
+    # pack every changed record before anything is written, so bad input fails the dry run as well
+    changes = []
+    for code, cents in sorted(patches.items()):
+        slot, fields = table[code]
+        if fields[price] == cents:
+            continue
+        try:
+            record = pack(*fields[:price], cents, *fields[price + 1:])
+        except (ValueError, AssertionError) as error:
+            raise ValueError(f"{args.patch}: code {code}: {error!r}") from error
+        changes.append((code, fields[price], cents, slot, record))
+    for code, old, cents, _, _ in changes:
+        print(f"{code}: {old / 100} -> {cents / 100}")
+    if changes and not args.dry_run:
+        from .csv_io import open_atomic
+        sda_file = _sda_file(args.card, args.table)
+        with open(sda_file, "br") as f:
+            B = bytearray(f.read())
+        for _, _, _, slot, record in changes:
+            B[slot * record_size:(slot + 1) * record_size] = record
+        with open_atomic(sda_file) as f:
+            f.write(B)
+    print(f"{len(changes)} prices {'would be ' if args.dry_run else ''}changed", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="xe-a207", description="Programming of SHARP XE-A207 SD cards")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def table_option(command):
+        command.add_argument("--table", choices=_FILES, default="plu", help="PLUs (default) or departments")
+
+    command = commands.add_parser("dump", help="dump a table as JSON Lines or TSV")
+    command.add_argument("card", help="root directory of the SD card")
+    table_option(command)
+    command.add_argument("--format", choices=("jsonl", "tsv"), default="jsonl")
+    command.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    command.set_defaults(func=dump)
+
+    command = commands.add_parser("load", help="write a table from JSON Lines, TSV or CSV")
+    command.add_argument("card", help="root directory of the SD card")
+    command.add_argument("file", help="input file")
+    table_option(command)
+    command.add_argument("--format", choices=("jsonl", "tsv", "csv"), default="jsonl")
+    command.set_defaults(func=load)
+
+    command = commands.add_parser("diff", help="compare a table of two cards, exits with 1 if they differ")
+    command.add_argument("card_a")
+    command.add_argument("card_b")
+    table_option(command)
+    command.set_defaults(func=diff)
+
+    command = commands.add_parser("patch", help="change prices in place (\"code<TAB>price\" or JSON Lines)")
+    command.add_argument("card", help="root directory of the SD card")
+    command.add_argument("patch", help="patch file")
+    table_option(command)
+    command.add_argument("--dry-run", action="store_true", help="only print the changes")
+    command.set_defaults(func=patch)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError, AssertionError) as error:
+        print(f"xe-a207 {args.command}: {error or type(error).__name__}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Streaming conversion between CSV/TSV price lists and SDA files
+
+The text rows use the column order of `Product.__str__` and
+`Department.__str__`, so their output can be read back:
+
+    PLU:        code, dept_no, open, preset, price, text
+    department: code, sales_type, open, preset, taxable, halo, group_no, price, text
+
+Booleans are written as True/False (1/0 is accepted as well), prices as
+decimal numbers and taxable as the `Taxable` repr (the VAT byte 0-15 is
+accepted as well). TSV rows are split on the first tabs only, so the name may
+contain tabs; CSV rows are parsed with the `csv` module. An optional header
+line starting with "code" is skipped.
+
+Rows are converted straight into SDA records with `records.pack_product` /
+`records.pack_department` and written in batches.
+"""
+import contextlib
+import csv
+import math
+import os
+import re
+import stat
+import tempfile
+
+from .XE_A207 import Taxable
+from . import records
+
+PRODUCT_COLUMNS = ("code", "dept_no", "open", "preset", "price", "text")
+DEPARTMENT_COLUMNS = ("code", "sales_type", "open", "preset", "taxable", "halo", "group_no", "price", "text")
+
+_BOOLEANS = {"True": True, "False": False, "true": True, "false": False, "1": True, "0": False}
+_TAXABLE_TEXT = [repr(Taxable.from_byte(i)) for i in range(16)]
+_TAXABLE_FROM_TEXT = {text: i for i, text in enumerate(_TAXABLE_TEXT)}
+_TAXABLE_PATTERN = re.compile(r"tax_(\d) = (True|False)")
+
+class RowError:
+    """A row of a text file that could not be converted"""
+    line: int
+    message: str
+
+    def __init__(self, line: int, message: str):
+        self.line = line
+        self.message = message
+
+    def __repr__(self):
+        return f"RowError(line={self.line}, message={self.message!r})"
+
+    def __str__(self):
+        return f"line {self.line}: {self.message}"
+
+def _delimiter(file: str, delimiter):
+    if delimiter is not None:
+        return delimiter
+    return "," if file.lower().endswith(".csv") else "\t"
+
+def _rows(f, delimiter: str, columns: int):
+    """yields (line number, fields) of a text file, skipping empty lines and the header"""
+    if delimiter == "\t":
+        rows = ((line.rstrip("\r\n").split("\t", columns - 1)) for line in f)
+    else:
+        rows = csv.reader(f, delimiter=delimiter)
+    for line, fields in enumerate(rows, 1):
+        if not fields or fields == [""]:
+            continue
+        if line == 1 and fields[0] == "code":
+            continue
+        yield line, fields
+
+def _bool(text: str) -> bool:
+    try:
+        return _BOOLEANS[text.strip()]
+    except KeyError:
+        raise ValueError(f"invalid boolean {text!r}") from None
+
+def _cents(text: str) -> int:
+    amount = float(text)
+    if not math.isfinite(amount):
+        raise ValueError(f"invalid amount {text!r}")
+    value = round(amount * 100)
+    if value < 0:
+        raise ValueError(f"negative amount {text!r}")
+    return value
+
+def _taxable(text: str) -> int:
+    text = text.strip()
+    if text in _TAXABLE_FROM_TEXT:
+        return _TAXABLE_FROM_TEXT[text]
+    if text.isdigit():
+        return int(text)
+    flags = _TAXABLE_PATTERN.findall(text)
+    if len(flags) != 4:
+        raise ValueError(f"invalid taxable {text!r}")
+    return sum(1 << (int(i) - 1) for i, value in flags if value == "True")
+
+def parse_product(fields: list[str]) -> bytes:
+    """converts the fields of a PLU row into a 31 byte PLUDT record"""
+    if len(fields) != len(PRODUCT_COLUMNS):
+        raise ValueError(f"expected {len(PRODUCT_COLUMNS)} columns, got {len(fields)}")
+    code, dept_no, open_, preset, price, text = fields
+    return records.pack_product(int(code), int(dept_no), _bool(open_), _bool(preset), _cents(price), text)
+
+def parse_department(fields: list[str]) -> bytes:
+    """converts the fields of a department row into a 28 byte DEPTDT record"""
+    if len(fields) != len(DEPARTMENT_COLUMNS):
+        raise ValueError(f"expected {len(DEPARTMENT_COLUMNS)} columns, got {len(fields)}")
+    code, sales_type, open_, preset, taxable, halo, group_no, price, text = fields
+    return records.pack_department(int(code), _bool(sales_type), _bool(open_), _bool(preset), _taxable(taxable),
+                                   _cents(halo), int(group_no), _cents(price), text)
+
+def format_product(record: bytes) -> list[str]:
+    """converts a 31 byte PLUDT record into the fields of `Product.__str__`"""
+    code, dept_no, open_, preset, price, text = records.unpack_product(record)
+    return [str(code), str(dept_no), str(open_), str(preset), str(price / 100.), text]
+
+def format_department(record: bytes) -> list[str]:
+    """converts a 28 byte DEPTDT record into the fields of `Department.__str__`"""
+    code, sales_type, open_, preset, taxable, halo, group_no, price, text = records.unpack_department(record)
+    return [str(code), str(sales_type), str(open_), str(preset), _TAXABLE_TEXT[taxable],
+            str(halo / 100.), str(group_no), str(price / 100.), text]
+
+def _read_batches(file, parse, columns, batch_size, delimiter, errors):
+    with open(file, newline="", encoding="utf-8") as f:
+        batch = []
+        for line, fields in _rows(f, _delimiter(file, delimiter), columns):
+            try:
+                batch.append(parse(fields))
+            except (AssertionError, ValueError, OverflowError, UnicodeEncodeError) as e:
+                error = RowError(line, str(e) or type(e).__name__)
+                if errors is None:
+                    raise ValueError(f"{file}: {error}") from e
+                errors.append(error)
+                continue
+            if len(batch) >= batch_size:
+                yield b"".join(batch)
+                batch = []
+        if batch:
+            yield b"".join(batch)
+
+def read_product_batches(file: str, batch_size: int = 4096, delimiter: str = None, errors: list = None):
+    """reads a PLU text file and yields batches of concatenated PLUDT records
+
+    Args:
+        file (str):         CSV (.csv) or TSV file
+        batch_size (int):   maximal number of records per batch
+        delimiter (str):    column delimiter, detected from the file extension if not given
+        errors (list):      invalid rows are appended as `RowError` and skipped, if not given the first invalid row raises a ValueError
+    """
+    return _read_batches(file, parse_product, len(PRODUCT_COLUMNS), batch_size, delimiter, errors)
+
+def read_department_batches(file: str, batch_size: int = 4096, delimiter: str = None, errors: list = None):
+    """reads a department text file and yields batches of concatenated DEPTDT records, see `read_product_batches`"""
+    return _read_batches(file, parse_department, len(DEPARTMENT_COLUMNS), batch_size, delimiter, errors)
+
+@contextlib.contextmanager
+def open_atomic(file: str):
+    """opens a temporary file next to `file` for binary writing, it replaces `file` only if the with block succeeds
+
+    The replaced file keeps its permissions, a new file gets the default permissions (0666 minus the umask).
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file)), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "bw") as f:
+            yield f
+        try:
+            mode = stat.S_IMODE(os.stat(file).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        os.replace(tmp, file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _convert_to_sda(batches, sda_file) -> int:
+    # the SDA file is only replaced once every row was parsed
+    size = 0
+    with open_atomic(sda_file) as f:
+        for batch in batches:
+            size += f.write(batch)
+    return size
+
+def products_to_sda(text_file: str, sda_file: str, delimiter: str = None, errors: list = None) -> int:
+    """converts a PLU text file into PLUDT.SDA
+
+    Returns:
+        int: number of written records
+    """
+    return _convert_to_sda(read_product_batches(text_file, delimiter=delimiter, errors=errors),
+                           sda_file) // records.PRODUCT_RECORD_SIZE
+
+def departments_to_sda(text_file: str, sda_file: str, delimiter: str = None, errors: list = None) -> int:
+    """converts a department text file into DEPTDT.SDA
+
+    Returns:
+        int: number of written records
+    """
+    return _convert_to_sda(read_department_batches(text_file, delimiter=delimiter, errors=errors),
+                           sda_file) // records.DEPARTMENT_RECORD_SIZE
+
+def _convert_to_text(sda_file, text_file, record_size, columns, format_, delimiter, header, batch_size) -> int:
+    delimiter = _delimiter(text_file, delimiter)
+    count = 0
+    with open(sda_file, "br") as src, open(text_file, "w", newline="", encoding="utf-8") as dst:
+        if delimiter == "\t":
+            def write_rows(rows):
+                dst.writelines("\t".join(row) + "\n" for row in rows)
+        else:
+            write_rows = csv.writer(dst, delimiter=delimiter, lineterminator="\n").writerows
+        if header:
+            write_rows([columns])
+        while (B := src.read(record_size * batch_size)):
+            rows = [format_(record) for record in records.iter_records(B, record_size)]
+            write_rows(rows)
+            count += len(rows)
+    return count
+
+def sda_to_products(sda_file: str, text_file: str, delimiter: str = None, header: bool = False,
+                    batch_size: int = 4096) -> int:
+    """converts PLUDT.SDA into a PLU text file
+
+    Returns:
+        int: number of written rows
+    """
+    return _convert_to_text(sda_file, text_file, records.PRODUCT_RECORD_SIZE, PRODUCT_COLUMNS,
+                            format_product, delimiter, header, batch_size)
+
+def sda_to_departments(sda_file: str, text_file: str, delimiter: str = None, header: bool = False,
+                       batch_size: int = 4096) -> int:
+    """converts DEPTDT.SDA into a department text file
+
+    Returns:
+        int: number of written rows
+    """
+    return _convert_to_text(sda_file, text_file, records.DEPARTMENT_RECORD_SIZE, DEPARTMENT_COLUMNS,
+                            format_department, delimiter, header, batch_size)
@@ -0,0 +1,151 @@
+"""Rule based PLU generator streaming encoded records into PLUDT.SDA
+
+A `Template` describes a family of PLUs declaratively instead of listing them:
+
+    drinks = Template(
+        codes=1000,                                     # first code, then consecutive codes
+        axes={"size": ["S", "M", "L"], "flavour": ["Cola", "Lemon"]},
+        name="{flavour} {size}",                        # format string over the fields
+        price={("S", "Cola"): 1.5, ("M", "Cola"): 2.0, ("L", "Cola"): 2.5,
+               ("S", "Lemon"): 1.6, ("M", "Lemon"): 2.1, ("L", "Lemon"): 2.6},
+        dept_no=3)
+    bulk = Template(codes=range(200000, 300000), name="Item {code}",
+                    price=lambda f: 0.5 + f["index"] % 100 / 10, dept_no={range(200000, 250000): 7, range(250000, 300000): 8})
+    write_products("PROGRAM/PLUDT.SDA", [drinks, bulk])
+
+Every record is built from the fields {"code", "index", *axes} of its PLU:
+
+    name        format string or callable(fields), cut to 16 characters
+    price       number, callable(fields) or mapping (see below), in the same unit as `Product.price`
+    dept_no     number, callable(fields) or mapping
+    open/preset booleans or callables(fields)
+
+A mapping is looked up with the tuple of axis values (or the single axis value
+if there is only one axis), then with `range` keys containing the code.
+
+The records are packed by `records.pack_product` one at a time and written in
+batches, so no `Product` objects are created and memory does not grow with the
+number of PLUs; duplicate codes are detected with a fixed size bitmap over all
+possible PLU codes.
+"""
+import itertools
+
+from . import records
+from .csv_io import open_atomic
+from .XE_A207 import Product
+
+MAX_CODE = 999999
+
+def _value(spec, fields: dict, key):
+    if callable(spec):
+        return spec(fields)
+    if isinstance(spec, dict):
+        if key is not None and key in spec:
+            return spec[key]
+        for k, value in spec.items():
+            if isinstance(k, range) and fields["code"] in k:
+                return value
+        raise KeyError(f"no value for PLU {fields['code']} ({key!r})")
+    return spec
+
+class Template:
+    """Declarative description of a family of PLUs"""
+    codes: object
+    axes: dict
+    name: object
+    price: object
+    dept_no: object
+    open: object
+    preset: object
+
+    def __init__(self, codes, name, price, dept_no, axes: dict = None, open=False, preset=True):
+        """initializes new Template object
+
+        Args:
+            codes (int | range):    first code of consecutive codes or the codes themselves,
+                                    without axes there is one PLU per code of the range
+            name (str | Callable):  name pattern formatted with the fields
+            price:                  price rule, see module documentation
+            dept_no:                department rule, see module documentation
+            axes (dict):            {field: list of values}, one PLU per combination
+            open:                   open price flag or callable(fields)
+            preset:                 preset price flag or callable(fields)
+        """
+        assert isinstance(codes, (int, range))
+        assert axes is not None or isinstance(codes, range), "a template without axes needs a range of codes"
+        self.codes = codes
+        self.axes = dict(axes) if axes else {}
+        self.name = name
+        self.price = price
+        self.dept_no = dept_no
+        self.open = open
+        self.preset = preset
+        if isinstance(codes, range) and self.axes:
+            assert len(codes) >= self.__combinations(), "the code range is too short for all combinations"
+
+    def __combinations(self) -> int:
+        n = 1
+        for values in self.axes.values():
+            n *= len(values)
+        return n
+
+    def __len__(self) -> int:
+        return self.__combinations() if self.axes else len(self.codes)
+
+    def __iter_fields(self):
+        codes = itertools.count(self.codes) if isinstance(self.codes, int) else iter(self.codes)
+        names = list(self.axes)
+        combinations = itertools.product(*self.axes.values()) if names else itertools.repeat(())
+        for index, (code, values) in enumerate(zip(codes, combinations)):
+            fields = {"code": code, "index": index}
+            fields.update(zip(names, values))
+            key = values[0] if len(values) == 1 else (values or None)
+            yield fields, key
+
+    def records(self):
+        """yields the encoded 31 byte records of the template"""
+        for fields, key in self.__iter_fields():
+            name = self.name(fields) if callable(self.name) else self.name.format(**fields)
+            price = _value(self.price, fields, key)
+            yield records.pack_product(fields["code"], _value(self.dept_no, fields, key),
+                                       _value(self.open, fields, key), _value(self.preset, fields, key),
+                                       round(price * 100), name[:16])
+
+def iter_records(templates: list[Template], unique: bool = True):
+    """yields the encoded records of all templates in order
+
+    Raises:
+        ValueError: a code is generated twice (if `unique`)
+    """
+    seen = bytearray(MAX_CODE + 1) if unique else None
+    for template in templates:
+        for B in template.records():
+            if seen is not None:
+                code = int(B[5:8].hex())
+                if seen[code]:
+                    raise ValueError(f"PLU code {code} is generated twice")
+                seen[code] = 1
+            yield B
+
+def products(templates: list[Template], unique: bool = True):
+    """yields the generated PLUs as `Product` objects"""
+    for B in iter_records(templates, unique):
+        yield Product.from_bytes(B)
+
+def write_products(file: str, templates: list[Template], unique: bool = True, batch_size: int = 4096) -> int:
+    """streams the generated records into PLUDT.SDA, the file is only replaced if all records were generated
+
+    Returns:
+        int: number of written PLUs
+    """
+    count = 0
+    with open_atomic(file) as f:
+        batch = []
+        for B in iter_records(templates, unique):
+            batch.append(B)
+            if len(batch) >= batch_size:
+                f.write(b"".join(batch))
+                count += len(batch)
+                batch = []
+        f.write(b"".join(batch))
+    return count + len(batch)
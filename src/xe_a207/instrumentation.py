@@ -0,0 +1,94 @@
+"""Opt-in timers and counters for importing and exporting SDA files
+
+Nothing is measured unless a `Metrics` object is active. The import and export
+functions check for it once per file, so the cost when disabled is a single
+context variable lookup.
+
+    with profile() as metrics:
+        programming = Programming.read_directory("/media/sd")
+    print(metrics.report())
+
+Stages are "read", "decode", "validate", "encode" and "write". PLUs and
+departments are decoded and encoded by the selected codec backend (see
+`backends`), which validates the records in the same pass, so their files have
+no separate "validate" stage. Every measurement is also passed to the optional
+callback as `callback(stage, file, seconds, records)`.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+STAGES = ("read", "decode", "validate", "encode", "write")
+
+_active = contextvars.ContextVar("xe_a207_metrics", default=None)
+
+class Metrics:
+    """Accumulated time and record counts per (stage, file)"""
+    seconds: dict
+    records: dict
+    calls: dict
+
+    def __init__(self, callback=None):
+        """
+        Args:
+            callback (Callable[[str, str, float, int], None]): called with (stage, file, seconds, records) for every measurement
+        """
+        self.callback = callback
+        self.seconds = {}
+        self.records = {}
+        self.calls = {}
+
+    def add(self, stage: str, file: str, seconds: float, records: int = 0):
+        key = (stage, file)
+        self.seconds[key] = self.seconds.get(key, 0.) + seconds
+        self.records[key] = self.records.get(key, 0) + records
+        self.calls[key] = self.calls.get(key, 0) + 1
+        if self.callback is not None:
+            self.callback(stage, file, seconds, records)
+
+    @contextmanager
+    def stage(self, stage: str, file: str, records: int = 0):
+        """measures the time of the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, file, time.perf_counter() - start, records)
+
+    def total(self, stage: str = None, file: str = None) -> float:
+        """total time in seconds, optionally restricted to a stage and/or a file"""
+        return sum(seconds for (s, f), seconds in self.seconds.items()
+                   if (stage is None or s == stage) and (file is None or f == file))
+
+    def report(self) -> str:
+        """formats the measurements as a table ordered by file and stage"""
+        lines = [f"{'file':<40} {'stage':<9} {'calls':>6} {'records':>9} {'ms':>10} {'us/record':>10}"]
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        for stage, file in sorted(self.seconds, key=lambda key: (key[1], order.get(key[0], len(STAGES)), key[0])):
+            seconds = self.seconds[(stage, file)]
+            records = self.records[(stage, file)]
+            per_record = f"{seconds / records * 1e6:10.2f}" if records else f"{'-':>10}"
+            lines.append(f"{file[-40:]:<40} {stage:<9} {self.calls[(stage, file)]:>6} {records:>9} "
+                         f"{seconds * 1e3:10.3f} {per_record}")
+        lines.append(f"{'total':<40} {'':<9} {sum(self.calls.values()):>6} {'':>9} {self.total() * 1e3:10.3f}")
+        return "\n".join(lines)
+
+def current():
+    """returns the active `Metrics` or None if instrumentation is disabled"""
+    return _active.get()
+
+@contextmanager
+def profile(callback=None, metrics: Metrics = None):
+    """activates a `Metrics` object for the enclosed block and yields it
+
+    Args:
+        callback (Callable[[str, str, float, int], None]): see `Metrics`
+        metrics (Metrics): existing object to accumulate into, a new one is created if not given
+    """
+    if metrics is None:
+        metrics = Metrics(callback)
+    token = _active.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _active.reset(token)
@@ -0,0 +1,93 @@
+"""Memory footprint harness for catalogs of increasing size
+
+Measures with `tracemalloc` how much memory the record objects and a loaded
+`Programming` take per record, both at the peak while building/loading and
+retained afterwards, and checks the results against per record budgets:
+
+    results = run(sizes=(1000, 10000, 100000))
+    print(report(results))
+    check_budgets(results)      # raises AssertionError if a budget is exceeded
+"""
+import tempfile
+import tracemalloc
+
+from . import synthetic
+from .XE_A207 import Programming
+
+# bytes per record; "card" is a whole Programming read from an SD card, per PLU
+DEFAULT_BUDGETS = {
+    "Product": {"retained": 350, "peak": 450},
+    "Department": {"retained": 400, "peak": 500},
+    "Taxable": {"retained": 16, "peak": 32},
+    "card": {"retained": 350, "peak": 500},
+}
+
+def measure(build, n: int) -> dict:
+    """measures the memory needed by `build()`
+
+    Args:
+        build (Callable[[], object]):   creates the measured objects
+        n (int):                        number of records created, used for the per record values
+    Returns:
+        dict: peak and retained bytes in total and per record
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        if started:
+            tracemalloc.stop()
+    retained = max(0, current - baseline)
+    peak = max(0, peak - baseline)
+    return {"records": n, "retained": retained, "peak": peak,
+            "retained_per_record": retained / max(n, 1), "peak_per_record": peak / max(n, 1)}
+
+def measure_card(n: int, seed: int = 0) -> dict:
+    """measures reading a synthetic SD card (see `synthetic.write_card`) with n PLUs and 99 departments into a Programming"""
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic.write_card(directory, products=n, seed=seed)
+        return measure(lambda: Programming.read_directory(directory), n)
+
+def run(sizes=(1000, 10000, 100000), seed: int = 0) -> list[dict]:
+    """measures every kind of record and a loaded card for all catalog sizes
+
+    Returns:
+        list[dict]: one result per (kind, size), see `measure`, with the additional key "kind"
+    """
+    results = []
+    for n in sizes:
+        for kind, build in (("Product", synthetic.products), ("Department", synthetic.departments),
+                            ("Taxable", synthetic.taxables)):
+            result = measure(lambda: build(n, seed), n)
+            result["kind"] = kind
+            results.append(result)
+        result = measure_card(n, seed)
+        result["kind"] = "card"
+        results.append(result)
+    return results
+
+def check_budgets(results: list[dict], budgets: dict = None):
+    """raises an AssertionError listing every result above its per record budget"""
+    if budgets is None:
+        budgets = DEFAULT_BUDGETS
+    exceeded = []
+    for result in results:
+        budget = budgets.get(result["kind"], {})
+        for key in ("retained", "peak"):
+            if key in budget and result[f"{key}_per_record"] > budget[key]:
+                exceeded.append(f"{result['kind']} x {result['records']}: {key} "
+                                f"{result[f'{key}_per_record']:.0f} B/record > {budget[key]} B/record")
+    assert not exceeded, "memory budget exceeded:\n" + "\n".join(exceeded)
+
+def report(results: list[dict]) -> str:
+    lines = [f"{'kind':<11} {'records':>9} {'retained':>12} {'peak':>12} {'B/rec ret':>10} {'B/rec peak':>10}"]
+    for r in results:
+        lines.append(f"{r['kind']:<11} {r['records']:>9} {r['retained']:>12} {r['peak']:>12} "
+                     f"{r['retained_per_record']:>10.1f} {r['peak_per_record']:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,127 @@
+"""Hash join merge of PLU catalogs from several sources
+
+All sources are joined on the PLU code in one pass over the input. PLUs whose
+encoded 31 byte records are identical are exact duplicates and collapse into
+one; PLUs with the same code but different records are conflicts and are
+resolved by a policy:
+
+    "last"          the PLU of the last source wins (e.g. central < regional < store)
+    "first"         the PLU of the first source wins
+    "lowest_price"  the cheapest PLU wins, ties are won by the last source
+    "fields"        field level priority, see `merge_products`
+
+The merged PLUs are yielded in ascending code order and can be streamed
+straight into PLUDT.SDA with `merge_to_file`.
+"""
+from .csv_io import open_atomic
+from .XE_A207 import Product
+
+POLICIES = ("last", "first", "lowest_price", "fields")
+FIELDS = ("dept_no", "open", "preset", "price", "text")
+
+class MergeReport:
+    """Statistics of a merge"""
+    records_in: int
+    records_out: int
+    duplicates: int
+    conflicts: list
+
+    def __init__(self):
+        self.records_in = 0
+        self.records_out = 0
+        self.duplicates = 0
+        self.conflicts = []     # (code, indexes of the sources with differing PLUs)
+
+    def __repr__(self):
+        return (f"MergeReport(records_in={self.records_in}, records_out={self.records_out}, "
+                f"duplicates={self.duplicates}, conflicts={len(self.conflicts)})")
+
+def _resolve(candidates: list, policy: str, field_priority: dict) -> Product:
+    """picks or builds the PLU of a code from its distinct (source indexes, PLU) candidates"""
+    if policy == "last":
+        return max(candidates, key=lambda candidate: candidate[0][-1])[1]
+    if policy == "first":
+        return min(candidates, key=lambda candidate: candidate[0][0])[1]
+    if policy == "lowest_price":
+        return min(candidates, key=lambda candidate: (round(candidate[1].price * 100), -candidate[0][-1]))[1]
+    by_source = {source: prod for sources, prod in candidates for source in sources}
+    last = by_source[max(by_source)]
+    values = {}
+    for field in FIELDS:
+        for source in field_priority.get(field, ()):
+            if source in by_source:
+                values[field] = getattr(by_source[source], field)
+                break
+        else:
+            values[field] = getattr(last, field)
+    return Product(last.code, values["dept_no"], values["open"], values["preset"], values["price"], values["text"])
+
+def merge_products(sources: list, policy: str = "last", field_priority: dict = None, report: MergeReport = None):
+    """merges PLU sources and yields the result in ascending code order
+
+    Args:
+        sources (list[Iterable[Product]]):  PLU sources in ascending priority (for "last")
+        policy (str):                       conflict policy, one of `POLICIES`
+        field_priority (dict):              for policy "fields": {field: [source indexes, highest priority first]},
+                                            fields not listed (or not present in the listed sources) are taken from the last source
+        report (MergeReport):               filled with the statistics of the merge
+    Raises:
+        ValueError: a source contains different PLUs with the same code (repeated identical PLUs count as duplicates)
+    """
+    assert policy in POLICIES, f"unknown policy {policy!r}"
+    assert policy != "fields" or isinstance(field_priority, dict)
+    assert field_priority is None or set(field_priority) <= set(FIELDS), "only non key fields can be prioritized"
+    if report is None:
+        report = MergeReport()
+    # build: code -> list of (source indexes, PLU, record) with distinct records,
+    # duplicates add their source so that every source of a record takes part in the resolution
+    table = {}
+    for source, products in enumerate(sources):
+        for prod in products:
+            assert isinstance(prod, Product)
+            report.records_in += 1
+            record = prod.to_bytes()
+            candidates = table.get(prod.code)
+            if candidates is None:
+                table[prod.code] = [([source], prod, record)]
+                continue
+            for indexes, _, other in candidates:
+                if indexes[-1] == source and record != other:
+                    raise ValueError(f"source {source} contains different PLUs with code {prod.code}")
+            for indexes, _, other in candidates:
+                if record == other:
+                    report.duplicates += 1
+                    if indexes[-1] != source:
+                        indexes.append(source)
+                    break
+            else:
+                candidates.append(([source], prod, record))
+    # probe in code order
+    for code in sorted(table):
+        candidates = table[code]
+        if len(candidates) == 1:
+            prod = candidates[0][1]
+        else:
+            report.conflicts.append((code, sorted(source for indexes, _, _ in candidates for source in indexes)))
+            prod = _resolve([(indexes, prod) for indexes, prod, _ in candidates], policy, field_priority or {})
+        report.records_out += 1
+        yield prod
+
+def merge_to_file(file: str, sources: list, policy: str = "last", field_priority: dict = None,
+                  batch_size: int = 4096) -> MergeReport:
+    """merges PLU sources (see `merge_products`) and streams the result into PLUDT.SDA,
+    the file is only replaced if the merge succeeds
+
+    Returns:
+        MergeReport: statistics of the merge
+    """
+    report = MergeReport()
+    with open_atomic(file) as f:
+        batch = []
+        for prod in merge_products(sources, policy, field_priority, report):
+            batch.append(prod.to_bytes())
+            if len(batch) >= batch_size:
+                f.write(b"".join(batch))
+                batch = []
+        f.write(b"".join(batch))
+    return report
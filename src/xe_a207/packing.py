@@ -0,0 +1,137 @@
+"""Capacity aware packing of a master catalog onto the PLU memory of registers
+
+Every PLU takes one slot of a register's PLU memory, so the best subset for a
+register is its pinned PLUs plus the PLUs with the highest priority (for
+example sales velocity) that fit into the remaining capacity. The catalog is
+sorted by priority once; every register then walks the sorted catalog until
+it is full, skipping PLUs of departments it does not sell. Registers with
+their own priorities are packed with a partial sort (`heapq.nlargest`) of the
+PLUs they may carry.
+
+    registers = [Register("front", 2000, pinned={1, 2, 3}),
+                 Register("bar", 500, departments={4, 5}, priorities=bar_sales)]
+    plan = pack(catalog, registers, priorities=sales)
+    plan.write("/srv/cards")     # /srv/cards/front/PROGRAM/PLUDT.SDA, /srv/cards/bar/PROGRAM/PLUDT.SDA
+"""
+import heapq
+import os
+
+from .XE_A207 import Product, export_products
+
+class Register:
+    """PLU memory limits and preferences of a single register"""
+    name: str
+    capacity: int
+    pinned: frozenset
+    departments: frozenset
+    priorities: dict
+
+    def __init__(self, name: str, capacity: int, pinned=(), departments=None, priorities: dict = None):
+        """initializes new Register object
+
+        Args:
+            name (str):             name of the register, used as directory name by `Plan.write`
+            capacity (int):         number of PLUs that fit into the register
+            pinned (Iterable[int]): codes of PLUs that have to be on the register
+            departments (Iterable[int]): department numbers sold on the register, all if None
+            priorities (dict):      {code: priority} overriding the catalog priorities for this register
+        """
+        assert isinstance(name, str) and name
+        assert isinstance(capacity, int) and capacity >= 0
+        self.name = name
+        self.capacity = capacity
+        self.pinned = frozenset(pinned)
+        self.departments = None if departments is None else frozenset(departments)
+        self.priorities = priorities
+
+    def __repr__(self):
+        return f"Register(name={self.name!r}, capacity={self.capacity}, pinned={len(self.pinned)})"
+
+    def accepts(self, prod: Product) -> bool:
+        return self.departments is None or prod.dept_no in self.departments
+
+class Plan:
+    """Result of `pack`"""
+    assignments: dict       # register name -> list[Product] in code order
+    priority: dict          # register name -> sum of the priorities of its PLUs
+    unassigned: list        # codes of catalog PLUs that are on no register
+
+    def __init__(self, assignments: dict, priority: dict, unassigned: list):
+        self.assignments = assignments
+        self.priority = priority
+        self.unassigned = unassigned
+
+    def __repr__(self):
+        used = ", ".join(f"{name}: {len(products)}" for name, products in self.assignments.items())
+        return f"Plan({used}, unassigned={len(self.unassigned)})"
+
+    def write(self, directory: str) -> dict:
+        """writes <directory>/<register>/PROGRAM/PLUDT.SDA for every register
+
+        Returns:
+            dict: {register name: path of the written file}
+        Raises:
+            ValueError: a register name is not a plain directory name (contains a path separator or is "." or "..")
+        """
+        for name in self.assignments:
+            if name in (".", "..") or any(character in name for character in "/\\\0"):
+                raise ValueError(f"register name {name!r} is not a valid directory name")
+        files = {}
+        for name, products in self.assignments.items():
+            program = os.path.join(directory, name, "PROGRAM")
+            os.makedirs(program, exist_ok=True)
+            files[name] = os.path.join(program, "PLUDT.SDA")
+            export_products(files[name], products)
+        return files
+
+def pack(catalog: list[Product], registers: list[Register], priorities: dict = None) -> Plan:
+    """picks the PLUs of every register
+
+    Args:
+        catalog (list[Product]):    master catalog, codes have to be unique
+        registers (list[Register]): registers to pack, names have to be unique
+        priorities (dict):          {code: priority}, PLUs without priority have priority 0
+    Returns:
+        Plan: PLUs per register
+    Raises:
+        ValueError: a pinned PLU is not in the catalog, is not sold on its register
+                    or there are more pinned PLUs than the capacity of the register
+    """
+    priorities = priorities or {}
+    by_code = {}
+    for prod in catalog:
+        assert isinstance(prod, Product)
+        assert prod.code not in by_code, f"PLU code {prod.code} is in the catalog twice"
+        by_code[prod.code] = prod
+    assert len({register.name for register in registers}) == len(registers), "register names have to be unique"
+    ranked = None       # catalog by priority (highest first, ties by code), sorted once when first needed
+    assignments, totals, assigned = {}, {}, set()
+    for register in registers:
+        for code in register.pinned:
+            if code not in by_code:
+                raise ValueError(f"{register.name}: pinned PLU {code} is not in the catalog")
+            if not register.accepts(by_code[code]):
+                raise ValueError(f"{register.name}: pinned PLU {code} belongs to department {by_code[code].dept_no}")
+        if len(register.pinned) > register.capacity:
+            raise ValueError(f"{register.name}: {len(register.pinned)} pinned PLUs exceed the capacity of {register.capacity}")
+        chosen = [by_code[code] for code in register.pinned]
+        free = register.capacity - len(chosen)
+        if register.priorities is None:
+            if ranked is None:
+                ranked = sorted(catalog, key=lambda prod: (-priorities.get(prod.code, 0), prod.code))
+            for prod in ranked:
+                if free == 0:
+                    break
+                if prod.code not in register.pinned and register.accepts(prod):
+                    chosen.append(prod)
+                    free -= 1
+        else:
+            rank = lambda prod: (register.priorities.get(prod.code, priorities.get(prod.code, 0)), -prod.code)
+            chosen.extend(heapq.nlargest(free, (prod for prod in catalog
+                                                if prod.code not in register.pinned and register.accepts(prod)), key=rank))
+        chosen.sort(key=lambda prod: prod.code)
+        register_priorities = register.priorities or {}
+        assignments[register.name] = chosen
+        totals[register.name] = sum(register_priorities.get(prod.code, priorities.get(prod.code, 0)) for prod in chosen)
+        assigned.update(prod.code for prod in chosen)
+    return Plan(assignments, totals, sorted(set(by_code) - assigned))
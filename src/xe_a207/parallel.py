@@ -0,0 +1,102 @@
+"""Parallel decoding of very large PLU files into columnar arrays
+
+Requires the optional dependency NumPy (`pip install xe-a207[numpy]`).
+
+The PLUDT.SDA files are read into one `multiprocessing.shared_memory` block,
+split on record boundaries and decoded by a process pool with
+`arrays.decode_products`. Every worker writes its rows straight into a second
+shared block holding the `arrays.PRODUCT_DTYPE` result, so nothing but the
+chunk boundaries is pickled between the processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import arrays
+from .records import PRODUCT_RECORD_SIZE
+
+# below this number of records per worker the pool costs more than it saves
+MIN_CHUNK_RECORDS = 50000
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:   # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+def _decode_chunk(input_name: str, output_name: str, records: int, start: int, stop: int):
+    """decodes the records [start, stop) of the input block into the output block, returns an error or None"""
+    source = _attach(input_name)
+    target = _attach(output_name)
+    try:
+        B = source.buf[start * PRODUCT_RECORD_SIZE:stop * PRODUCT_RECORD_SIZE]
+        result = np.ndarray((records,), dtype=arrays.PRODUCT_DTYPE, buffer=target.buf)
+        try:
+            result[start:stop] = arrays.decode_products(B)
+        except ValueError as e:
+            return f"{e} (chunk starting at record {start})"
+        finally:
+            del result
+            B.release()
+        return None
+    finally:
+        source.close()
+        target.close()
+
+def _chunks(records: int, workers: int, chunk_records: int):
+    if chunk_records is None:
+        chunk_records = max(MIN_CHUNK_RECORDS, -(-records // workers))
+    return [(start, min(start + chunk_records, records)) for start in range(0, records, chunk_records)]
+
+def decode_products(files, workers: int = None, chunk_records: int = None) -> np.ndarray:
+    """decodes one or many PLUDT.SDA files in parallel
+
+    Args:
+        files (str | list[str]):    PLUDT.SDA file(s), the records of all files are concatenated in the given order
+        workers (int):              number of processes, defaults to the number of CPUs
+        chunk_records (int):        records per task, by default the records are split evenly between the workers
+    Returns:
+        numpy.ndarray: array of `arrays.PRODUCT_DTYPE`
+    """
+    if isinstance(files, (str, os.PathLike)):
+        files = [files]
+    sizes = [os.path.getsize(file) for file in files]
+    for file, size in zip(files, sizes):
+        assert size % PRODUCT_RECORD_SIZE == 0, f"{file}: {size % PRODUCT_RECORD_SIZE} trailing bytes do not form a complete record"
+    total = sum(sizes)
+    records = total // PRODUCT_RECORD_SIZE
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = _chunks(records, workers, chunk_records)
+    if workers == 1 or len(chunks) <= 1:
+        B = bytearray()
+        for file in files:
+            with open(file, "br") as f:
+                B += f.read()
+        return arrays.decode_products(bytes(B))
+
+    source = shared_memory.SharedMemory(create=True, size=total)
+    target = shared_memory.SharedMemory(create=True, size=max(1, records * arrays.PRODUCT_DTYPE.itemsize))
+    try:
+        offset = 0
+        for file, size in zip(files, sizes):
+            with open(file, "br") as f:
+                view = source.buf[offset:offset + size]
+                f.readinto(view)
+                view.release()
+            offset += size
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            futures = [pool.submit(_decode_chunk, source.name, target.name, records, start, stop)
+                       for start, stop in chunks]
+            errors = [error for error in (future.result() for future in futures) if error is not None]
+        if errors:
+            raise ValueError("; ".join(errors))
+        result = np.ndarray((records,), dtype=arrays.PRODUCT_DTYPE, buffer=target.buf).copy()
+        return result
+    finally:
+        source.close()
+        source.unlink()
+        target.close()
+        target.unlink()
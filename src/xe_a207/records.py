@@ -0,0 +1,97 @@
+"""Table driven codec for the raw SDA records of a SHARP XE-A207 cash register
+
+The functions in this module convert directly between plain field tuples and
+the fixed width records stored on the SD card, without creating `Product` or
+`Department` objects. Prices and HALOs are integer cents, taxable flags are
+the VAT byte as used by `Taxable.to_byte`.
+
+    product tuple:    (code, dept_no, open, preset, price, text)
+    department tuple: (code, sales_type, open, preset, taxable, halo, group_no, price, text)
+
+The byte layout is documented in `Department.from_bytes`, the PLU layout is
+    B[0:5]   - zeros
+    B[5:8]   - code (BCD)
+    B[8]     - department number (BCD)
+    B[9]     - b'000000PO', P is 1 if preset price, O is 1 if price is open for change
+    B[10:15] - price in cents (BCD)
+    B[15:31] - PLU name (Code page 437)
+"""
+PRODUCT_RECORD_SIZE = 31
+DEPARTMENT_RECORD_SIZE = 28
+TAX_RECORD_SIZE = 90
+LOGO_MSG_RECORD_SIZE = 186
+
+_PRODUCT_PADDING = bytes(5)
+# flag byte of a PLU record indexed by (open, preset)
+_PRODUCT_FLAGS = (b"\x00", b"\x02", b"\x01", b"\x03")
+
+def bcd_encode(number: int, width: int) -> bytes:
+    """encodes a non negative integer as `width` bytes of packed BCD"""
+    assert 0 <= number < 100 ** width, f"{number} does not fit into {width} BCD bytes"
+    return bytes.fromhex(f"{number:0{2 * width}d}")
+
+def bcd_decode(B: bytes) -> int:
+    """decodes packed BCD bytes, raises ValueError on non decimal nibbles"""
+    return int(B.hex())
+
+def encode_text(text: str, width: int) -> bytes:
+    """encodes a name with Code page 437 and pads it with zeros to `width` bytes"""
+    assert len(text) <= width, f"{text!r} is longer than {width} characters"
+    return text.encode("cp437").ljust(width, b"\x00")
+
+def decode_text(B: bytes) -> str:
+    """decodes a zero padded Code page 437 name"""
+    end = B.find(0)
+    return (B if end < 0 else B[:end]).decode("cp437")
+
+def pack_product(code: int, dept_no: int, open: bool, preset: bool, price: int, text: str) -> bytes:
+    """encodes the fields of a PLU into a 31 byte PLUDT record"""
+    assert 0 < code < 1000000, f"invalid PLU code {code}"
+    assert 1 <= dept_no <= 99, f"invalid department number {dept_no}"
+    return b"".join((
+        _PRODUCT_PADDING,
+        bcd_encode(code, 3),
+        bcd_encode(dept_no, 1),
+        _PRODUCT_FLAGS[2 * bool(open) + bool(preset)],
+        bcd_encode(price, 5),
+        encode_text(text, 16),
+    ))
+
+def unpack_product(B: bytes) -> tuple:
+    """decodes a 31 byte PLUDT record into a product tuple"""
+    assert len(B) == PRODUCT_RECORD_SIZE
+    flags = B[9]
+    return (int(B[5:8].hex()), int(B[8:9].hex()), flags & 0b01 != 0, flags & 0b10 != 0,
+            int(B[10:15].hex()), decode_text(B[15:31]))
+
+def pack_department(code: int, sales_type: bool, open: bool, preset: bool, taxable: int,
+                    halo: int, group_no: int, price: int, text: str) -> bytes:
+    """encodes the fields of a department into a 28 byte DEPTDT record"""
+    assert 0 <= code < 100, f"invalid department code {code}"
+    assert 0 <= taxable < 16, f"invalid taxable byte {taxable}"
+    assert 0 <= group_no <= 12, f"invalid group number {group_no}"
+    assert halo <= 99999999 and price <= 99999999
+    flags = (0b10000 if sales_type else 0) | (0b00001 if open else 0) | (0b00010 if preset else 0)
+    return b"".join((
+        bcd_encode(code, 1),
+        bytes((flags, taxable)),
+        bcd_encode(halo, 4),
+        bcd_encode(group_no, 1),
+        bcd_encode(price, 4),
+        encode_text(text, 16),
+    ))
+
+def unpack_department(B: bytes) -> tuple:
+    """decodes a 28 byte DEPTDT record into a department tuple"""
+    assert len(B) == DEPARTMENT_RECORD_SIZE
+    flags = B[1]
+    assert flags & ~0b10011 == 0 and B[2] < 16
+    return (int(B[0:1].hex()), flags & 0b10000 != 0, flags & 0b00001 != 0, flags & 0b00010 != 0,
+            B[2], int(B[3:7].hex()), int(B[7:8].hex()), int(B[8:12].hex()), decode_text(B[12:28]))
+
+def iter_records(B: bytes, record_size: int):
+    """splits the content of an SDA file into records, a truncated final record is an error"""
+    assert len(B) % record_size == 0, f"{len(B) % record_size} trailing bytes do not form a complete record"
+    view = memoryview(B)
+    for offset in range(0, len(B), record_size):
+        yield bytes(view[offset:offset + record_size])
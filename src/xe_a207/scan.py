@@ -0,0 +1,185 @@
+"""Integrity scanner for the raw SDA files of an SD card
+
+The scanner checks a file before it is decoded and reports every problem with
+its byte offset and record index:
+
+    partial     the file ends with a truncated record
+    bcd         a non decimal nibble in a BCD field
+    flags       illegal bits in a flag byte
+    range       a code, department number, group number, VAT byte or row number out of range
+    name        a non printable character in a name, or data after its terminating zero
+
+Instead of decoding record by record, every column of a file is cut out with
+one slice (`B[column::record_size]`) and checked for all records at once with
+`bytes.translate` and integer bit operations, so a clean file is scanned at C
+speed and only the records with problems are visited in Python.
+"""
+import os
+
+from . import records
+
+def _mask(valid) -> bytes:
+    """translation table mapping bytes for which `valid(byte)` is true to 0 and all others to 1"""
+    return bytes(0 if valid(byte) else 1 for byte in range(256))
+
+_BCD = _mask(lambda b: b >> 4 <= 9 and b & 0x0F <= 9)
+_ZERO = _mask(lambda b: b != 0)      # 1 where the byte is zero
+_NONZERO = _mask(lambda b: b == 0)   # 1 where the byte is not zero
+_PRINTABLE = _mask(lambda b: b == 0 or bytes([b]).decode("cp437").isprintable())
+
+class Issue:
+    """A problem found in an SDA file"""
+    file: str
+    kind: str
+    offset: int
+    record: int
+    message: str
+
+    def __init__(self, file: str, kind: str, offset: int, record: int, message: str):
+        self.file = file
+        self.kind = kind
+        self.offset = offset
+        self.record = record
+        self.message = message
+
+    def __repr__(self):
+        return f"Issue(file={self.file!r}, kind={self.kind!r}, offset={self.offset}, record={self.record}, message={self.message!r})"
+
+    def __str__(self):
+        return f"{self.file}: offset {self.offset} (record {self.record}): {self.kind}: {self.message}"
+
+class _Scan:
+    def __init__(self, file: str, B: bytes, record_size: int, max_issues: int):
+        self.file = file
+        self.record_size = record_size
+        self.count = len(B) // record_size
+        self.data = B[:self.count * record_size]
+        self.issues = []
+        self.max_issues = max_issues
+        if len(B) % record_size:
+            self.issues.append(Issue(file, "partial", self.count * record_size, self.count,
+                                     f"{len(B) % record_size} trailing bytes do not form a complete {record_size} byte record"))
+
+    def column(self, index: int) -> bytes:
+        return self.data[index::self.record_size]
+
+    def report(self, marks: bytes, kind: str, column: int, message):
+        """reports every record with a 1 in `marks` (one byte per record)"""
+        record = marks.find(1)
+        while record >= 0 and len(self.issues) < self.max_issues:
+            self.issues.append(Issue(self.file, kind, record * self.record_size + column, record,
+                                     message(record) if callable(message) else message))
+            record = marks.find(1, record + 1)
+
+    def bcd(self, first: int, stop: int, field: str):
+        for column in range(first, stop):
+            self.report(self.column(column).translate(_BCD), "bcd", column,
+                        lambda r, c=column: f"non decimal BCD digit 0x{self.data[r * self.record_size + c]:02X} in {field}")
+
+    def allowed(self, column: int, valid, kind: str, field: str):
+        self.report(self.column(column).translate(_mask(valid)), kind, column,
+                    lambda r: f"illegal {field} 0x{self.data[r * self.record_size + column]:02X}")
+
+    def all_zero(self, first: int, stop: int) -> int:
+        """integer with a 1 byte for every record whose columns [first, stop) are all zero"""
+        result = (1 << (8 * self.count)) - 1 if self.count else 0
+        for column in range(first, stop):
+            result &= int.from_bytes(self.column(column).translate(_ZERO), "big")
+        return result
+
+    def marks(self, value: int) -> bytes:
+        return value.to_bytes(self.count, "big")
+
+    def zero_field(self, first: int, stop: int, message: str):
+        self.report(self.marks(self.all_zero(first, stop)), "range", first, message)
+
+    def name(self, first: int, width: int):
+        for column in range(first, first + width):
+            self.report(self.column(column).translate(_PRINTABLE), "name", column,
+                        lambda r, c=column: f"non printable character 0x{self.data[r * self.record_size + c]:02X} in name")
+        # a zero terminates the name, everything after it has to be zero as well
+        terminated = 0
+        for column in range(first, first + width):
+            nonzero = int.from_bytes(self.column(column).translate(_NONZERO), "big")
+            self.report(self.marks(terminated & nonzero), "name", column, "data after the terminating zero of the name")
+            terminated |= int.from_bytes(self.column(column).translate(_ZERO), "big")
+
+def scan_products(file: str, B: bytes, max_issues: int = 1000) -> list[Issue]:
+    """checks the content of PLUDT.SDA"""
+    scan = _Scan(file, B, records.PRODUCT_RECORD_SIZE, max_issues)
+    if scan.count:
+        scan.bcd(5, 8, "code")
+        scan.bcd(8, 9, "department number")
+        scan.bcd(10, 15, "price")
+        scan.allowed(9, lambda b: b & ~0b11 == 0, "flags", "open/preset flags")
+        for column in range(0, 5):
+            scan.allowed(column, lambda b: b == 0, "flags", "padding byte")
+        scan.zero_field(5, 8, "PLU code 0")
+        scan.zero_field(8, 9, "department number 0")
+        scan.name(15, 16)
+    return sorted(scan.issues, key=lambda issue: issue.offset)
+
+def scan_departments(file: str, B: bytes, max_issues: int = 1000) -> list[Issue]:
+    """checks the content of DEPTDT.SDA"""
+    scan = _Scan(file, B, records.DEPARTMENT_RECORD_SIZE, max_issues)
+    if scan.count:
+        scan.bcd(0, 1, "code")
+        scan.bcd(3, 7, "HALO")
+        scan.bcd(7, 8, "group number")
+        scan.bcd(8, 12, "price")
+        scan.allowed(1, lambda b: b & ~0b10011 == 0, "flags", "sales type/preset/open flags")
+        scan.allowed(2, lambda b: b < 16, "flags", "VAT byte")
+        scan.allowed(7, lambda b: b <= 0x12, "range", "group number")
+        scan.name(12, 16)
+    return sorted(scan.issues, key=lambda issue: issue.offset)
+
+def scan_taxes(file: str, B: bytes, max_issues: int = 1000) -> list[Issue]:
+    """checks the content of TAXTB.SDA"""
+    scan = _Scan(file, B, records.TAX_RECORD_SIZE, max_issues)
+    if scan.count:
+        scan.allowed(0, lambda b: b in (0, 1), "flags", "enabled byte")
+        scan.allowed(1, lambda b: b in (0, 0x0D), "flags", "sign byte")
+        scan.bcd(2, 6, "tax rate")
+        scan.bcd(9, 12, "lower tax limit")
+    return sorted(scan.issues, key=lambda issue: issue.offset)
+
+def scan_logo_msg(file: str, B: bytes, max_issues: int = 1000) -> list[Issue]:
+    """checks the content of LOGODT.SDA (6 rows of 31 bytes: row number and 30 characters)"""
+    issues = []
+    if len(B) != records.LOGO_MSG_RECORD_SIZE:
+        issues.append(Issue(file, "partial", min(len(B), records.LOGO_MSG_RECORD_SIZE), 0,
+                            f"file has {len(B)} bytes instead of {records.LOGO_MSG_RECORD_SIZE}"))
+    scan = _Scan(file, B[:records.LOGO_MSG_RECORD_SIZE], 31, max_issues)
+    scan.issues = issues
+    if scan.count:
+        scan.report(bytes(int(row != i + 1) for i, row in enumerate(scan.column(0))), "range", 0,
+                    lambda r: f"row number {scan.data[r * 31]} instead of {r + 1}")
+        scan.name(1, 30)
+    return sorted(scan.issues, key=lambda issue: issue.offset)
+
+SCANNERS = {
+    "PLUDT.SDA": scan_products,
+    "DEPTDT.SDA": scan_departments,
+    "TAXTB.SDA": scan_taxes,
+    "LOGODT.SDA": scan_logo_msg,
+}
+
+def scan_file(file: str, max_issues: int = 1000) -> list[Issue]:
+    """checks an SDA file, the kind of file is taken from its name"""
+    scanner = SCANNERS[os.path.basename(file).upper()]
+    with open(file, "br") as f:
+        return scanner(file, f.read(), max_issues)
+
+def scan_directory(directory: str, max_issues: int = 1000) -> dict:
+    """checks all known SDA files in the PROGRAM directory of an SD card
+
+    Returns:
+        dict: {file name: list of Issues} for every existing file
+    """
+    program = os.path.join(directory, "PROGRAM")
+    result = {}
+    for name in SCANNERS:
+        path = os.path.join(program, name)
+        if os.path.exists(path):
+            result[name] = scan_file(path, max_issues)
+    return result
@@ -0,0 +1,152 @@
+"""Trigram index for fuzzy search over PLU and department names
+
+Names are normalized (case folded, accents removed, runs of spaces collapsed)
+and padded with two spaces in front and one behind, so that "Käse" becomes the
+trigrams "  k", " ka", "kas", "ase", "se ". A query is split the same way and
+every indexed name sharing trigrams with it is scored with the Jaccard
+similarity of both trigram sets, so misspellings like "kaese" or "chese" still
+find "Käse" and "Cheese":
+
+    index = NameIndex.from_programming(programming)
+    index.search("coffe latte", limit=5)    # [Match(score, "plu", code, text), ...]
+    index.add_product(prod)                 # after an edit, replaces the old name
+    index.remove_product(prod.code)
+
+Only the posting lists of the query trigrams are visited, so a query costs
+time in proportion to the names that share trigrams with it, not to the size
+of the catalog.
+"""
+import heapq
+import re
+import unicodedata
+from collections import Counter
+
+from .XE_A207 import Department, Product, Programming
+
+KINDS = ("plu", "dept")
+
+_SPACES = re.compile(r"\s+")
+
+def normalize(text: str) -> str:
+    """lower case name without accents and with single spaces"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(" ", stripped).strip()
+
+def trigrams(text: str) -> frozenset:
+    padded = "  " + normalize(text) + " "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+class Match:
+    """Search result"""
+    score: float
+    kind: str
+    code: int
+    text: str
+
+    def __init__(self, score: float, kind: str, code: int, text: str):
+        self.score = score
+        self.kind = kind
+        self.code = code
+        self.text = text
+
+    def __repr__(self):
+        return f"Match(score={self.score:.3f}, kind={self.kind!r}, code={self.code}, text={self.text!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Match):
+            return NotImplemented
+        return (self.score, self.kind, self.code, self.text) == (other.score, other.kind, other.code, other.text)
+
+    def __hash__(self):
+        return hash((self.score, self.kind, self.code, self.text))
+
+class NameIndex:
+    """Trigram index over the names of PLUs and departments"""
+
+    def __init__(self):
+        # entries are keyed by code << 1 | kind (0 for PLUs, 1 for departments), small ints hash fastest
+        self.__postings = {}    # trigram -> set of keys
+        self.__entries = {}     # key -> (name, trigrams)
+        self.__sizes = {}       # key -> number of trigrams
+
+    def from_programming(programming: Programming):
+        """creates an index over all PLUs and departments of a Programming"""
+        index = NameIndex()
+        for prod in programming.plu:
+            index.add_product(prod)
+        for dept in programming.dept:
+            index.add_department(dept)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, entry) -> bool:
+        """checks if a (kind, code) pair is indexed"""
+        kind, code = entry
+        return code << 1 | KINDS.index(kind) in self.__entries
+
+    def add(self, kind: str, code: int, text: str):
+        """indexes a name, an already indexed name of the same kind and code is replaced"""
+        assert kind in KINDS
+        key = code << 1 | KINDS.index(kind)
+        if key in self.__entries:
+            self.remove(kind, code)
+        grams = trigrams(text)
+        self.__entries[key] = (text, grams)
+        self.__sizes[key] = len(grams)
+        for gram in grams:
+            self.__postings.setdefault(gram, set()).add(key)
+
+    def remove(self, kind: str, code: int) -> bool:
+        """removes a name from the index, returns False if it was not indexed"""
+        key = code << 1 | KINDS.index(kind)
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return False
+        del self.__sizes[key]
+        for gram in entry[1]:
+            keys = self.__postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self.__postings[gram]
+        return True
+
+    def add_product(self, prod: Product):
+        assert isinstance(prod, Product)
+        self.add("plu", prod.code, prod.text)
+
+    def add_department(self, dept: Department):
+        assert isinstance(dept, Department)
+        self.add("dept", dept.code, dept.text)
+
+    def remove_product(self, code: int) -> bool:
+        return self.remove("plu", code)
+
+    def remove_department(self, code: int) -> bool:
+        return self.remove("dept", code)
+
+    def search(self, query: str, limit: int = 10, kind: str = None, min_score: float = 0.2) -> list[Match]:
+        """finds the names most similar to `query`
+
+        Args:
+            query (str):        searched name, may be misspelled
+            limit (int):        maximal number of matches
+            kind (str):         only "plu" or only "dept" matches, both if None
+            min_score (float):  lowest Jaccard similarity of the trigram sets (0 to 1)
+        Returns:
+            list[Match]: best matches first, equal scores ordered by kind and code
+        """
+        assert kind is None or kind in KINDS
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.__postings.get(gram, ()))
+        sizes = self.__sizes
+        size = len(grams)
+        wanted = None if kind is None else KINDS.index(kind)
+        scored = ((count / (size + sizes[key] - count), key) for key, count in shared.items()
+                  if wanted is None or key & 1 == wanted)
+        best = heapq.nsmallest(limit, ((-score, key) for score, key in scored if score >= min_score))
+        return [Match(-score, KINDS[key & 1], key >> 1, self.__entries[key][0]) for score, key in best]
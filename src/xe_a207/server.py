@@ -0,0 +1,213 @@
+"""Small HTTP back-office service serving the card image of a `Programming`
+
+    GET /PROGRAM/PLUDT.SDA   (also DEPTDT.SDA, TAXTB.SDA and LOGODT.SDA)
+    GET /plu.json, /dept.json, /tax.json, /logo_msg.json
+
+The encoded files and JSON views are cached in a `CardImage` and only
+rebuilt after an edit through its methods (or an explicit `invalidate`).
+Responses carry an ETag, so polling clients get a 304 for If-None-Match
+(also for "*"), and a single byte range is answered with 206 Partial Content;
+other or invalid Range headers are ignored.
+
+Only the standard library is used:
+
+    server = make_server(CardImage(Programming.read_directory("/media/sd")), port=8080)
+    server.serve_forever()
+"""
+import hashlib
+import json
+import re
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .XE_A207 import (Department, Logo_msg, Product, Programming, Tax, encode_departments, encode_products,
+                      encode_taxes)
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+class CardImage:
+    """A Programming together with its cached encoded files"""
+    programming: Programming
+
+    def __init__(self, programming: Programming):
+        assert isinstance(programming, Programming)
+        self.programming = programming
+        self.__lock = threading.RLock()
+        self.__cache = {}
+
+    def __encode(self, name: str) -> bytes:
+        p = self.programming
+        # the same encoders (and codec backends) as the export_* functions
+        if name == "PLUDT.SDA":
+            return bytes(encode_products(p.plu))
+        if name == "DEPTDT.SDA":
+            return bytes(encode_departments(p.dept))
+        if name == "TAXTB.SDA":
+            return bytes(encode_taxes(p.tax))
+        if name == "LOGODT.SDA":
+            return p.logo_msg.to_bytes()
+        if name == "plu.json":
+            rows = [{"code": x.code, "dept_no": x.dept_no, "open": x.open, "preset": x.preset,
+                     "price": x.price, "text": x.text} for x in p.plu]
+        elif name == "dept.json":
+            rows = [{"code": x.code, "sales_type": x.sales_type, "open": x.open, "preset": x.preset,
+                     "taxable": x.taxable.to_byte(), "halo": x.halo, "group_no": x.group_no,
+                     "price": x.price, "text": x.text} for x in p.dept]
+        elif name == "tax.json":
+            rows = [{"number": x.number, "tax_rate": x.tax_rate, "lower_tax_limit": x.lower_tax_limit} for x in p.tax]
+        elif name == "logo_msg.json":
+            rows = p.logo_msg.rows
+        else:
+            raise KeyError(name)
+        return json.dumps(rows, ensure_ascii=False).encode("utf-8")
+
+    def get(self, name: str) -> tuple:
+        """returns (content, ETag) of a file or JSON view, encoding it only if it is not cached
+
+        Raises:
+            KeyError: unknown name
+        """
+        with self.__lock:
+            entry = self.__cache.get(name)
+            if entry is None:
+                B = self.__encode(name)
+                entry = self.__cache[name] = (B, '"' + hashlib.sha1(B).hexdigest() + '"')
+            return entry
+
+    def invalidate(self, *names: str):
+        """drops cached files (and their JSON views), everything if no name is given"""
+        views = {"PLUDT.SDA": "plu.json", "DEPTDT.SDA": "dept.json", "TAXTB.SDA": "tax.json", "LOGODT.SDA": "logo_msg.json"}
+        with self.__lock:
+            if not names:
+                self.__cache.clear()
+            for name in names:
+                self.__cache.pop(name, None)
+                self.__cache.pop(views.get(name), None)
+
+    def set_product(self, prod: Product):
+        """replaces the PLU with the same code or appends it"""
+        assert isinstance(prod, Product)
+        with self.__lock:
+            plu = self.programming.plu
+            for i, old in enumerate(plu):
+                if old.code == prod.code:
+                    plu[i] = prod
+                    break
+            else:
+                plu.append(prod)
+            self.invalidate("PLUDT.SDA")
+
+    def remove_product(self, code: int):
+        with self.__lock:
+            self.programming.plu = [prod for prod in self.programming.plu if prod.code != code]
+            self.invalidate("PLUDT.SDA")
+
+    def set_department(self, dept: Department):
+        """replaces the department with the same code or appends it"""
+        assert isinstance(dept, Department)
+        with self.__lock:
+            departments = self.programming.dept
+            for i, old in enumerate(departments):
+                if old.code == dept.code:
+                    departments[i] = dept
+                    break
+            else:
+                departments.append(dept)
+            self.invalidate("DEPTDT.SDA")
+
+    def set_taxes(self, taxes: list[Tax]):
+        assert all(isinstance(tax, Tax) for tax in taxes)
+        with self.__lock:
+            self.programming.tax = list(taxes)
+            self.invalidate("TAXTB.SDA")
+
+    def set_logo_msg(self, logo_msg: Logo_msg):
+        assert isinstance(logo_msg, Logo_msg)
+        with self.__lock:
+            self.programming.logo_msg = logo_msg
+            self.invalidate("LOGODT.SDA")
+
+class CardRequestHandler(BaseHTTPRequestHandler):
+    """Serves the files and JSON views of `server.card`"""
+    server_version = "xe-a207"
+
+    def __resolve(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/PROGRAM/"):
+            return path[len("/PROGRAM/"):], "application/octet-stream"
+        if path.endswith(".json"):
+            return path[1:], "application/json; charset=utf-8"
+        return None, None
+
+    def __respond(self, send_body: bool):
+        name, content_type = self.__resolve()
+        try:
+            B, etag = self.server.card.get(name) if name else (None, None)
+        except KeyError:
+            B = None
+        if B is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        tags = {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}
+        if etag in tags or "*" in tags:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        status, body, content_range = HTTPStatus.OK, B, None
+        requested = self.headers.get("Range")
+        match = _RANGE.match(requested.strip()) if requested else None
+        first, last = match.groups() if match else ("", "")
+        # ranges that are not a single valid byte range (no positions, first > last) are ignored (RFC 7233, 3.1)
+        if (first or last) and not (first and last and int(first) > int(last)) and self.headers.get("If-Range", etag) == etag:
+            if first:
+                start, stop = int(first), (int(last) + 1 if last else len(B))
+            else:
+                start, stop = max(0, len(B) - int(last)), len(B)
+            stop = min(stop, len(B))
+            if start >= stop:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{len(B)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status, body, content_range = HTTPStatus.PARTIAL_CONTENT, B[start:stop], f"bytes {start}-{stop - 1}/{len(B)}"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Cache-Control", "no-cache")
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.__respond(True)
+
+    def do_HEAD(self):
+        self.__respond(False)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(card: CardImage, host: str = "127.0.0.1", port: int = 8000, verbose: bool = False) -> ThreadingHTTPServer:
+    """creates (but does not start) a threaded HTTP server for a card image
+
+    Args:
+        card (CardImage):   served card image, a Programming is wrapped automatically
+        host (str):         address to bind to
+        port (int):         port to bind to, 0 picks a free port
+        verbose (bool):     log every request to stderr
+    """
+    if isinstance(card, Programming):
+        card = CardImage(card)
+    assert isinstance(card, CardImage)
+    server = ThreadingHTTPServer((host, port), CardRequestHandler)
+    server.card = card
+    server.verbose = verbose
+    return server
@@ -0,0 +1,196 @@
+"""Vectorized receipt and tax simulation over basket logs
+
+Requires the optional dependency NumPy (`pip install xe-a207[numpy]`).
+
+A basket log is an array of `BASKET_DTYPE` with one line per sold PLU:
+receipt number, PLU code, quantity and an optional open price in cents (-1
+uses the price of the PLU). `simulate` joins all lines with the PLU table (by
+binary search over the sorted codes) and the department table (by direct
+indexing with the department code) and computes for the whole log at once:
+
+    - line totals in cents, negative for minus departments (group 10 and 12)
+    - per receipt and tax slot the taxable amount and the tax
+    - the totals per tax slot and per group number
+
+Taxes are calculated per receipt and tax slot like on the register: the
+taxable amount of a slot is the sum of the lines of the departments whose
+`Taxable` contains the slot, amounts below `lower_tax_limit` are not taxed,
+and the tax is rounded half up to cents. With mode "vat" the tax is included
+in the prices (amount * rate / (100 + rate)), with mode "addon" it is added
+(amount * rate / 100). To try out a new tax table or new department taxables,
+pass them as `taxes` and `taxables`:
+
+    basket = read_basket_csv("march.csv")
+    before = simulate_card(basket, "/media/sd")
+    after = simulate_card(basket, "/media/sd", taxes=[Tax(1, 7.0, 0.), Tax(2, 19.0, 0.)])
+    print(after.tax - before.tax)
+
+Sums are exact as long as they stay below 2**53 cents.
+"""
+import numpy as np
+
+from . import arrays
+from .XE_A207 import Department, Product, Tax, Taxable, import_taxes
+
+BASKET_DTYPE = np.dtype([
+    ("receipt", "<u8"),
+    ("code", "<u4"),
+    ("quantity", "<f8"),
+    ("price", "<i8"),
+])
+
+LINE_DTYPE = np.dtype([
+    ("receipt", "<u8"),
+    ("code", "<u4"),
+    ("dept_no", "u1"),
+    ("group_no", "u1"),
+    ("taxable", "u1"),
+    ("quantity", "<f8"),
+    ("total", "<i8"),
+])
+
+RECEIPT_DTYPE = np.dtype([
+    ("receipt", "<u8"),
+    ("total", "<i8"),
+    ("taxable", "<i8", (4,)),
+    ("tax", "<i8", (4,)),
+])
+
+MODES = ("vat", "addon")
+MINUS_GROUPS = (10, 12)
+
+class SimulationResult:
+    """Result of `simulate`, all amounts in cents"""
+    lines: np.ndarray       # LINE_DTYPE, one per known basket line
+    receipts: np.ndarray    # RECEIPT_DTYPE, ordered by receipt number
+    taxable: np.ndarray     # taxable amount per tax slot (4,)
+    tax: np.ndarray         # tax per tax slot (4,)
+    groups: np.ndarray      # total per group number (13,)
+    total: int
+    unknown: np.ndarray     # indexes of basket lines with an unknown PLU or department
+
+    def __init__(self, lines, receipts, taxable, tax, groups, unknown):
+        self.lines = lines
+        self.receipts = receipts
+        self.taxable = taxable
+        self.tax = tax
+        self.groups = groups
+        self.total = int(lines["total"].sum())
+        self.unknown = unknown
+
+    def __repr__(self):
+        return (f"SimulationResult(lines={len(self.lines)}, receipts={len(self.receipts)}, total={self.total}, "
+                f"tax={self.tax.tolist()}, unknown={len(self.unknown)})")
+
+def basket(receipts, codes, quantities, prices=None) -> np.ndarray:
+    """builds a basket log from columns, `prices` (cents, -1 for the PLU price) is optional"""
+    result = np.empty(len(codes), dtype=BASKET_DTYPE)
+    result["receipt"] = receipts
+    result["code"] = codes
+    result["quantity"] = quantities
+    result["price"] = -1 if prices is None else prices
+    return result
+
+def read_basket_csv(file: str, delimiter: str = ",", skiprows: int = 0) -> np.ndarray:
+    """reads a basket log with the columns receipt, code, quantity and optionally price in cents"""
+    table = np.loadtxt(file, delimiter=delimiter, skiprows=skiprows, ndmin=2, comments="#")
+    assert table.shape[1] in (3, 4), "a basket log has the columns receipt, code, quantity[, price]"
+    return basket(table[:, 0], table[:, 1], table[:, 2], table[:, 3] if table.shape[1] == 4 else None)
+
+def _as_products(products) -> np.ndarray:
+    if isinstance(products, np.ndarray):
+        assert products.dtype == arrays.PRODUCT_DTYPE
+        return products
+    assert all(isinstance(prod, Product) for prod in products)
+    return arrays.decode_products(b"".join(prod.to_bytes() for prod in products))
+
+def _as_departments(departments) -> np.ndarray:
+    if isinstance(departments, np.ndarray):
+        assert departments.dtype == arrays.DEPARTMENT_DTYPE
+        return departments
+    assert all(isinstance(dept, Department) for dept in departments)
+    return arrays.decode_departments(b"".join(dept.to_bytes() for dept in departments))
+
+def _round_half_up(values: np.ndarray) -> np.ndarray:
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+def _divide_half_up(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    sign = np.sign(numerator) * (1 if denominator > 0 else -1)
+    return sign * ((2 * np.abs(numerator) + abs(denominator)) // (2 * abs(denominator)))
+
+def _sum_by(index: np.ndarray, values: np.ndarray, n: int) -> np.ndarray:
+    return np.rint(np.bincount(index, weights=values, minlength=n)).astype(np.int64)
+
+def simulate(basket: np.ndarray, products, departments, taxes: list[Tax],
+             taxables: dict = None, mode: str = "vat") -> SimulationResult:
+    """re-costs a basket log with a PLU table, a department table and a tax table
+
+    Args:
+        basket (np.ndarray):    basket log of `BASKET_DTYPE`
+        products:               list[Product] or array of `arrays.PRODUCT_DTYPE`
+        departments:            list[Department] or array of `arrays.DEPARTMENT_DTYPE`
+        taxes (list[Tax]):      tax slots, missing slots have a rate of 0
+        taxables (dict):        {department code: Taxable} replacing the taxables of departments
+        mode (str):             "vat" (included in the prices) or "addon" (added to the prices)
+    Returns:
+        SimulationResult: line, receipt, tax and group totals
+    """
+    assert basket.dtype == BASKET_DTYPE
+    assert mode in MODES, f"unknown mode {mode!r}"
+    plu = _as_products(products)
+    dept = _as_departments(departments)
+    if taxables:
+        dept = dept.copy()
+        for code, taxable in taxables.items():
+            assert isinstance(taxable, Taxable)
+            dept["taxable"][dept["code"] == code] = taxable.to_byte()
+
+    # join basket -> PLU
+    order = np.argsort(plu["code"], kind="stable")
+    codes = plu["code"][order]
+    position = np.minimum(np.searchsorted(codes, basket["code"]), max(len(codes) - 1, 0))
+    found = (codes[position] == basket["code"]) if len(codes) else np.zeros(len(basket), dtype=bool)
+    line_plu = plu[order[position]] if len(codes) else np.zeros(len(basket), dtype=arrays.PRODUCT_DTYPE)
+    # join PLU -> department
+    dept_index = np.full(100, -1, dtype=np.int64)
+    dept_index[dept["code"]] = np.arange(len(dept))
+    line_dept = dept_index[line_plu["dept_no"]]
+    found &= line_dept >= 0
+    unknown = np.flatnonzero(~found)
+    items, line_plu, line_dept = basket[found], line_plu[found], dept[line_dept[found]]
+
+    lines = np.empty(len(items), dtype=LINE_DTYPE)
+    lines["receipt"] = items["receipt"]
+    lines["code"] = items["code"]
+    lines["dept_no"] = line_plu["dept_no"]
+    lines["group_no"] = line_dept["group_no"]
+    lines["taxable"] = line_dept["taxable"]
+    lines["quantity"] = items["quantity"]
+    unit = np.where(items["price"] >= 0, items["price"], line_plu["price"])
+    total = _round_half_up(unit * items["quantity"])
+    lines["total"] = np.where(np.isin(lines["group_no"], MINUS_GROUPS), -total, total)
+
+    numbers, receipt_index = np.unique(lines["receipt"], return_inverse=True)
+    receipts = np.zeros(len(numbers), dtype=RECEIPT_DTYPE)
+    receipts["receipt"] = numbers
+    receipts["total"] = _sum_by(receipt_index, lines["total"], len(numbers))
+    rates = {tax.number: tax for tax in taxes}
+    for slot in range(4):
+        in_slot = (lines["taxable"] >> slot) & 1
+        amount = _sum_by(receipt_index, lines["total"] * in_slot, len(numbers))
+        tax = rates.get(slot + 1)
+        if tax is not None:
+            amount = np.where(amount < round(tax.lower_tax_limit * 100), 0, amount)
+            rate = round(tax.tax_rate * 1e4)    # 1/10000 percent
+            denominator = 1000000 + rate if mode == "vat" else 1000000
+            receipts["tax"][:, slot] = _divide_half_up(amount * rate, denominator) if denominator else 0
+        receipts["taxable"][:, slot] = amount
+    return SimulationResult(lines, receipts, receipts["taxable"].sum(axis=0), receipts["tax"].sum(axis=0),
+                            _sum_by(lines["group_no"], lines["total"], 13), unknown)
+
+def simulate_card(basket: np.ndarray, directory: str, taxes: list[Tax] = None,
+                  taxables: dict = None, mode: str = "vat") -> SimulationResult:
+    """simulates a basket log with the tables of an SD card, `taxes` replaces the card's tax table"""
+    program = directory + "/PROGRAM/"
+    return simulate(basket, arrays.read_products(program + "PLUDT.SDA"), arrays.read_departments(program + "DEPTDT.SDA"),
+                    import_taxes(program + "TAXTB.SDA") if taxes is None else taxes, taxables, mode)
@@ -0,0 +1,226 @@
+"""Deduplicated, compressed history of SD card PROGRAM directories
+
+Every SDA file of a snapshot is split into record aligned chunks whose
+boundaries depend on the records themselves: a chunk ends after every record
+whose CRC-32 is divisible by `chunk_records` (64 records on average, at most
+four times as many). Inserting or deleting a record therefore only changes the
+chunk around it instead of shifting every later chunk. Chunks are stored once
+per content hash, compressed with zlib or lzma, so the store only grows with
+the records that changed between snapshots.
+
+    root/objects/ab/abcdef...       compressed chunk, named by the SHA-256 of its content
+    root/snapshots/<name>.json      file names, sizes and chunk hashes of a snapshot
+"""
+import datetime
+import hashlib
+import json
+import lzma
+import os
+import zlib
+
+from .XE_A207 import (Department, Logo, Logo_msg, Product, Programming, Tax)
+from . import records
+
+# record size per file, files not listed here are stored as a single chunk
+RECORD_SIZES = {
+    "PLUDT.SDA": records.PRODUCT_RECORD_SIZE,
+    "DEPTDT.SDA": records.DEPARTMENT_RECORD_SIZE,
+    "TAXTB.SDA": records.TAX_RECORD_SIZE,
+    "LOGODT.SDA": records.LOGO_MSG_RECORD_SIZE,
+}
+
+_COMPRESSORS = {
+    "zlib": (b"z", lambda B: zlib.compress(B, 9)),
+    "lzma": (b"x", lzma.compress),
+}
+_DECOMPRESSORS = {
+    b"z": zlib.decompress,
+    b"x": lzma.decompress,
+    b"-": lambda B: B,
+}
+
+class SnapshotStore:
+    """Content addressed store of card snapshots"""
+    root: str
+    compression: str
+    chunk_records: int
+
+    def __init__(self, root: str, compression: str = "zlib", chunk_records: int = 64):
+        """opens (and if necessary creates) a snapshot store
+
+        Args:
+            root (str):             directory of the store
+            compression (str):      "zlib" or "lzma"
+            chunk_records (int):    average number of records per chunk
+        """
+        assert compression in _COMPRESSORS
+        assert isinstance(chunk_records, int) and chunk_records > 0
+        self.root = root
+        self.compression = compression
+        self.chunk_records = chunk_records
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "snapshots"), exist_ok=True)
+
+    def __object_file(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def __snapshot_file(self, name: str) -> str:
+        assert name and os.sep not in name and not name.startswith("."), f"invalid snapshot name {name!r}"
+        return os.path.join(self.root, "snapshots", name + ".json")
+
+    def __split(self, B: bytes, record_size: int) -> list:
+        """cuts B after every record whose CRC-32 is a multiple of chunk_records (content defined chunking)"""
+        chunks = []
+        start = 0
+        maximum = record_size * self.chunk_records * 4
+        for end in range(record_size, len(B) + record_size, record_size):
+            if zlib.crc32(B[end - record_size:end]) % self.chunk_records == 0 or end - start >= maximum:
+                chunks.append(B[start:end])
+                start = end
+        if start < len(B):
+            chunks.append(B[start:])
+        return chunks
+
+    def __put(self, chunk: bytes) -> str:
+        digest = hashlib.sha256(chunk).hexdigest()
+        file = self.__object_file(digest)
+        if not os.path.exists(file):
+            prefix, compress = _COMPRESSORS[self.compression]
+            data = compress(chunk)
+            if len(data) >= len(chunk):
+                prefix, data = b"-", chunk
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            with open(file + ".tmp", "bw") as f:
+                f.write(prefix + data)
+            os.replace(file + ".tmp", file)
+        return digest
+
+    def __get(self, digest: str) -> bytes:
+        with open(self.__object_file(digest), "br") as f:
+            data = f.read()
+        chunk = _DECOMPRESSORS[data[:1]](data[1:])
+        assert hashlib.sha256(chunk).hexdigest() == digest, f"object {digest} is corrupted"
+        return chunk
+
+    def save(self, directory: str, name: str = None) -> str:
+        """stores the PROGRAM directory of an SD card as a new snapshot
+
+        Args:
+            directory (str):    root directory of the SD card
+            name (str):         name of the snapshot, defaults to the current time
+        Returns:
+            str: name of the snapshot
+        """
+        if name is None:
+            name = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        snapshot_file = self.__snapshot_file(name)
+        assert not os.path.exists(snapshot_file), f"snapshot {name} already exists"
+        program = os.path.join(directory, "PROGRAM")
+        files = {}
+        for file_name in sorted(os.listdir(program)):
+            path = os.path.join(program, file_name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, "br") as f:
+                B = f.read()
+            record_size = RECORD_SIZES.get(file_name)
+            chunks = self.__split(B, record_size) if record_size else [B] if B else []
+            files[file_name] = {"size": len(B), "chunks": [self.__put(chunk) for chunk in chunks]}
+        with open(snapshot_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"name": name, "files": files}, f)
+        os.replace(snapshot_file + ".tmp", snapshot_file)
+        return name
+
+    def snapshots(self) -> list[str]:
+        """names of all snapshots in alphabetical (for the default names chronological) order"""
+        return sorted(file[:-5] for file in os.listdir(os.path.join(self.root, "snapshots")) if file.endswith(".json"))
+
+    def __manifest(self, name: str) -> dict:
+        with open(self.__snapshot_file(name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def files(self, name: str) -> dict:
+        """returns the content of all files of a snapshot as {file name: bytes}"""
+        result = {}
+        for file_name, entry in self.__manifest(name)["files"].items():
+            B = b"".join(self.__get(digest) for digest in entry["chunks"])
+            assert len(B) == entry["size"]
+            result[file_name] = B
+        return result
+
+    def restore(self, name: str, directory: str) -> list[str]:
+        """writes the PROGRAM directory of a snapshot to `directory`
+
+        Files in PROGRAM that are not part of the snapshot are deleted, so the
+        directory afterwards is the one that was saved.
+
+        Returns:
+            list[str]: names of the deleted files
+        """
+        program = os.path.join(directory, "PROGRAM")
+        os.makedirs(program, exist_ok=True)
+        files = self.files(name)
+        for file_name, B in files.items():
+            with open(os.path.join(program, file_name), "bw") as f:
+                f.write(B)
+        stale = sorted(file_name for file_name in os.listdir(program)
+                       if file_name not in files and os.path.isfile(os.path.join(program, file_name)))
+        for file_name in stale:
+            os.remove(os.path.join(program, file_name))
+        return stale
+
+    def programming(self, name: str) -> Programming:
+        """decodes a snapshot into a Programming without writing any files, the logo is empty like with `Programming.read_directory`"""
+        files = self.files(name)
+        def split(file_name):
+            B = files.get(file_name, b"")
+            size = RECORD_SIZES[file_name]
+            return [B[i:i + size] for i in range(0, len(B), size)]
+        logo_msg = files.get("LOGODT.SDA")
+        return Programming(
+            [Department.from_bytes(B) for B in split("DEPTDT.SDA")],
+            [Product.from_bytes(B) for B in split("PLUDT.SDA")],
+            Logo(),
+            Logo_msg.from_bytes(logo_msg) if logo_msg is not None else Logo_msg([]),
+            [Tax.from_bytes(B, i) for i, B in enumerate(split("TAXTB.SDA"), 1)])
+
+    def delete(self, name: str) -> int:
+        """deletes a snapshot and all chunks no other snapshot refers to
+
+        Returns:
+            int: number of deleted chunks
+        """
+        os.remove(self.__snapshot_file(name))
+        return self.prune()
+
+    def prune(self) -> int:
+        """deletes all chunks no snapshot refers to
+
+        Returns:
+            int: number of deleted chunks
+        """
+        referenced = set()
+        for name in self.snapshots():
+            for entry in self.__manifest(name)["files"].values():
+                referenced.update(entry["chunks"])
+        deleted = 0
+        objects = os.path.join(self.root, "objects")
+        for prefix in os.listdir(objects):
+            for digest in os.listdir(os.path.join(objects, prefix)):
+                if digest not in referenced:
+                    os.remove(os.path.join(objects, prefix, digest))
+                    deleted += 1
+        return deleted
+
+    def stats(self) -> dict:
+        """number of snapshots and chunks, stored bytes and the total size of all snapshotted files"""
+        chunks = 0
+        stored = 0
+        objects = os.path.join(self.root, "objects")
+        for prefix in os.listdir(objects):
+            for digest in os.listdir(os.path.join(objects, prefix)):
+                chunks += 1
+                stored += os.path.getsize(os.path.join(objects, prefix, digest))
+        names = self.snapshots()
+        logical = sum(entry["size"] for name in names for entry in self.__manifest(name)["files"].values())
+        return {"snapshots": len(names), "chunks": chunks, "stored_bytes": stored, "logical_bytes": logical}
@@ -0,0 +1,223 @@
+"""Seeded synthetic SD card images and a bulk round-trip verifier
+
+`write_card` creates a valid PROGRAM directory (PLUDT, DEPTDT, TAXTB and
+LOGODT) of any size from a seed. The records are packed directly by the
+`records` codec and streamed to disk, so cards with millions of PLUs are
+generated without creating `Product` objects. A fraction `edge_ratio` of the
+records is replaced by edge cases: the lowest and highest codes, zero and
+maximum prices, 16 character names using the whole printable Code page 437
+and every `Taxable` combination and flag of the departments.
+
+`verify_card` reads every file in chunks, imports each chunk with the
+`import_*` function of the file, exports it again with the `export_*`
+function and compares the result byte by byte:
+
+    write_card("/tmp/card", products=2000000, seed=1)
+    results = verify_card("/tmp/card")
+    print(report(results))
+    assert all(result["ok"] for result in results)
+"""
+import os
+import random
+import tempfile
+import time
+
+from . import records
+from .XE_A207 import (Department, Product, Tax, Taxable, export_departments, export_logo_msg, export_products, export_taxes,
+                      import_departments, import_logo_msg, import_products, import_taxes)
+
+MAX_PRODUCT_PRICE = 10 ** 10 - 1        # cents, 5 BCD bytes
+MAX_DEPARTMENT_PRICE = 10 ** 8 - 1      # cents, 4 BCD bytes
+MAX_TAX_RATE = 999.9999
+MAX_LOWER_TAX_LIMIT = 999.99
+
+# printable Code page 437 characters (without the zero byte, which terminates a name)
+CHARACTERS = "".join(c for c in bytes(range(0x20, 0x100)).decode("cp437") if c.isprintable())
+
+# price distributions in cents: name -> f(rng, maximum)
+PRICES = {
+    "uniform": lambda rng, maximum: rng.randint(0, maximum),
+    "retail": lambda rng, maximum: min(maximum, round(rng.lognormvariate(5.5, 1.2))),
+    "round": lambda rng, maximum: min(maximum, rng.randint(1, 200) * 50),
+}
+
+def _name(rng: random.Random, width: int = 16) -> str:
+    return "".join(rng.choices(CHARACTERS, k=rng.randint(1, width)))
+
+def _price(prices, rng: random.Random, maximum: int) -> int:
+    return (PRICES[prices] if isinstance(prices, str) else prices)(rng, maximum)
+
+def product_records(n: int, seed: int = 0, prices="retail", edge_ratio: float = 0.01, departments: int = 99):
+    """yields n encoded PLU records with unique, ascending codes
+
+    Args:
+        n (int):                number of PLUs (at most 999999)
+        seed (int):             seed of the random generator
+        prices (str | Callable):name of a distribution in `PRICES` or f(rng, maximum) -> cents
+        edge_ratio (float):     fraction of records replaced by edge cases
+        departments (int):      department numbers are drawn from 1 to `departments`
+    """
+    assert 0 <= n <= 999999
+    rng = random.Random(seed)
+    codes = sorted(rng.sample(range(2, 999999), n - 2) + [1, 999999]) if n >= 2 else list(range(1, n + 1))
+    for code in codes:
+        if rng.random() < edge_ratio:
+            price = rng.choice((0, 1, MAX_PRODUCT_PRICE))
+            text = "".join(rng.choices(CHARACTERS, k=16))
+            dept_no = rng.choice((1, departments))
+        else:
+            price = _price(prices, rng, MAX_PRODUCT_PRICE)
+            text = _name(rng)
+            dept_no = rng.randint(1, departments)
+        yield records.pack_product(code, dept_no, rng.random() < 0.5, rng.random() < 0.5, price, text)
+
+def department_records(n: int = 99, seed: int = 0, prices="retail", edge_ratio: float = 0.01):
+    """yields n (at most 99) encoded department records with codes 1 to n
+
+    The departments cycle through all 16 `Taxable` combinations and all
+    combinations of the sales type, open and preset flags.
+    """
+    assert 0 <= n <= 99
+    rng = random.Random(seed)
+    for code in range(1, n + 1):
+        flags = code % 8
+        if rng.random() < edge_ratio:
+            halo = price = rng.choice((0, MAX_DEPARTMENT_PRICE))
+            text = "".join(rng.choices(CHARACTERS, k=16))
+            group_no = rng.choice((0, 12))
+        else:
+            price = _price(prices, rng, MAX_DEPARTMENT_PRICE)
+            halo = rng.randint(price, MAX_DEPARTMENT_PRICE)
+            text = _name(rng)
+            group_no = rng.randint(1, 12)
+        yield records.pack_department(code, bool(flags & 4), bool(flags & 2), bool(flags & 1), code % 16,
+                                      halo, group_no, price, text)
+
+def tax_records(seed: int = 0):
+    """yields the 4 encoded tax slots: a random rate, a negative rate, the extremes and an empty slot"""
+    rng = random.Random(seed)
+    taxes = [Tax(1, rng.randint(0, 300000) / 1e4, rng.randint(0, 99999) / 100),
+             Tax(2, -rng.randint(1, 9999999) / 1e4, 0.),
+             Tax(3, MAX_TAX_RATE, MAX_LOWER_TAX_LIMIT),
+             Tax(4, 0., 0.)]
+    for tax in taxes:
+        yield tax.to_bytes()
+
+def products(n: int, seed: int = 0, prices="retail", edge_ratio: float = 0.01, departments: int = 99) -> list[Product]:
+    """the PLUs of `product_records` as Product objects"""
+    return [Product.from_bytes(B) for B in product_records(n, seed, prices, edge_ratio, departments)]
+
+def departments(n: int = 99, seed: int = 0, prices="retail", edge_ratio: float = 0.01) -> list[Department]:
+    """the departments of `department_records` as Department objects, codes repeat after 99 for larger n"""
+    table = list(department_records(min(n, 99), seed, prices, edge_ratio))
+    return [Department.from_bytes(table[i % 99]) for i in range(n)]
+
+def taxables(n: int, seed: int = 0) -> list[Taxable]:
+    """n random Taxable combinations"""
+    rng = random.Random(seed)
+    return [Taxable.from_byte(rng.randrange(16)) for _ in range(n)]
+
+def logo_msg_record(seed: int = 0) -> bytes:
+    """encoded LOGODT.SDA with a full width row, random rows and an empty row"""
+    rng = random.Random(seed)
+    rows = ["".join(rng.choices(CHARACTERS, k=30))] + [_name(rng, 30) for _ in range(4)] + [""]
+    return b"".join(bytes([i + 1]) + records.encode_text(row, 30) for i, row in enumerate(rows))
+
+def _write(file: str, chunks, batch_size: int) -> int:
+    count = 0
+    with open(file, "bw") as f:
+        batch = []
+        for B in chunks:
+            batch.append(B)
+            if len(batch) >= batch_size:
+                f.write(b"".join(batch))
+                count += len(batch)
+                batch = []
+        f.write(b"".join(batch))
+    return count + len(batch)
+
+def write_card(directory: str, products: int = 10000, departments: int = 99, seed: int = 0,
+               prices="retail", edge_ratio: float = 0.01, batch_size: int = 4096) -> dict:
+    """writes a synthetic PROGRAM directory into `directory`
+
+    Returns:
+        dict: {file name: number of records}
+    """
+    program = os.path.join(directory, "PROGRAM")
+    os.makedirs(program, exist_ok=True)
+    result = {
+        "PLUDT.SDA": _write(os.path.join(program, "PLUDT.SDA"),
+                            product_records(products, seed, prices, edge_ratio, max(departments, 1)), batch_size),
+        "DEPTDT.SDA": _write(os.path.join(program, "DEPTDT.SDA"),
+                             department_records(departments, seed, prices, edge_ratio), batch_size),
+        "TAXTB.SDA": _write(os.path.join(program, "TAXTB.SDA"), tax_records(seed), batch_size),
+    }
+    with open(os.path.join(program, "LOGODT.SDA"), "bw") as f:
+        f.write(logo_msg_record(seed))
+    result["LOGODT.SDA"] = 1
+    return result
+
+# file -> (record size, import function, export function, verified in chunks)
+_CODECS = {
+    "PLUDT.SDA": (records.PRODUCT_RECORD_SIZE, import_products, export_products, True),
+    "DEPTDT.SDA": (records.DEPARTMENT_RECORD_SIZE, import_departments, export_departments, True),
+    "TAXTB.SDA": (records.TAX_RECORD_SIZE, import_taxes, export_taxes, False),
+    "LOGODT.SDA": (records.LOGO_MSG_RECORD_SIZE, import_logo_msg, export_logo_msg, False),
+}
+
+def verify_file(file: str, chunk_records: int = 100000) -> dict:
+    """checks that importing and exporting an SDA file reproduces it byte by byte
+
+    Returns:
+        dict: file, records, bytes, import/export seconds, records per second,
+              the indexes of the first mismatching records (at most 100) and "ok"
+    """
+    size, import_, export, chunked = _CODECS[os.path.basename(file).upper()]
+    step = chunk_records * size if chunked else None
+    result = {"file": os.path.basename(file), "records": 0, "bytes": 0,
+              "import_seconds": 0., "export_seconds": 0., "mismatches": []}
+    with tempfile.TemporaryDirectory() as tmp, open(file, "br") as f:
+        original_file = os.path.join(tmp, "original.SDA")
+        exported_file = os.path.join(tmp, "exported.SDA")
+        while (B := f.read(step) if step else f.read()):
+            with open(original_file, "bw") as o:
+                o.write(B)
+            start = time.perf_counter()
+            items = import_(original_file)
+            middle = time.perf_counter()
+            export(exported_file, items)
+            result["import_seconds"] += middle - start
+            result["export_seconds"] += time.perf_counter() - middle
+            with open(exported_file, "br") as e:
+                exported = e.read()
+            if exported != B:
+                for i in range(0, max(len(B), len(exported)), size):
+                    if B[i:i + size] != exported[i:i + size] and len(result["mismatches"]) < 100:
+                        result["mismatches"].append(result["records"] + i // size)
+            result["records"] += len(B) // size
+            result["bytes"] += len(B)
+            if not step:
+                break
+    result["ok"] = not result["mismatches"]
+    seconds = result["import_seconds"] + result["export_seconds"]
+    result["records_per_second"] = result["records"] / seconds if seconds else 0.
+    return result
+
+def verify_card(directory: str, chunk_records: int = 100000) -> list[dict]:
+    """runs `verify_file` for every existing SDA file of the PROGRAM directory in `directory`"""
+    program = os.path.join(directory, "PROGRAM")
+    return [verify_file(os.path.join(program, name), chunk_records)
+            for name in _CODECS if os.path.exists(os.path.join(program, name))]
+
+def run(products: int = 1000000, seed: int = 0, chunk_records: int = 100000, **options) -> list[dict]:
+    """generates a card in a temporary directory and verifies it, see `write_card` for the options"""
+    with tempfile.TemporaryDirectory() as directory:
+        write_card(directory, products, seed=seed, **options)
+        return verify_card(directory, chunk_records)
+
+def report(results: list[dict]) -> str:
+    lines = [f"{'file':<11} {'records':>9} {'import s':>9} {'export s':>9} {'records/s':>11} {'result':>7}"]
+    for r in results:
+        lines.append(f"{r['file']:<11} {r['records']:>9} {r['import_seconds']:>9.3f} {r['export_seconds']:>9.3f} "
+                     f"{r['records_per_second']:>11.0f} {'ok' if r['ok'] else 'FAILED':>7}")
+    return "\n".join(lines)
@@ -0,0 +1,213 @@
+"""Copy-on-write versioned tables of encoded records with undo and redo
+
+A version of a table is a tuple of immutable pages, every page holds up to
+`page_records` encoded records (31 bytes for PLUs, 28 bytes for departments).
+An edit copies only the pages it touches, all other pages are shared with the
+previous version. Undo and redo switch between versions, and `diff` skips all
+pages that are shared, so all of them cost time in proportion to the change
+instead of the size of the table.
+
+    table = VersionedTable.from_file("PLUDT.SDA", Product)
+    table.set(3, Product(4, 1, False, True, 1.99, "Coffee"))
+    table.undo()
+    table.redo()
+    table.export("PLUDT.SDA")
+"""
+from .XE_A207 import Department, Product
+
+_RECORD_SIZES = {Product: 31, Department: 28}
+
+class VersionedTable:
+    """Table of PLUs or departments with cheap versions"""
+    record_type: type
+    record_size: int
+    page_records: int
+
+    def __init__(self, record_type: type, items: list = (), page_records: int = 256):
+        """initializes new VersionedTable object
+
+        Args:
+            record_type (type):     Product or Department
+            items (list):           initial PLUs or departments
+            page_records (int):     number of records per page
+        """
+        assert record_type in _RECORD_SIZES
+        assert isinstance(page_records, int) and page_records > 0
+        self.record_type = record_type
+        self.record_size = _RECORD_SIZES[record_type]
+        self.page_records = page_records
+        records = []
+        for item in items:
+            assert isinstance(item, record_type)
+            records.append(item.to_bytes())
+        self.__versions = [self.__paginate(records)]
+        self.__current = 0
+
+    def from_bytes(B: bytes, record_type: type, page_records: int = 256):
+        """creates a new table from the content of an SDA file without decoding the records"""
+        table = VersionedTable(record_type, page_records=page_records)
+        assert len(B) % table.record_size == 0
+        page_size = table.record_size * page_records
+        table.__versions = [tuple(bytes(B[i:i + page_size]) for i in range(0, len(B), page_size))]
+        return table
+
+    def from_file(file: str, record_type: type, page_records: int = 256):
+        with open(file, "br") as f:
+            return VersionedTable.from_bytes(f.read(), record_type, page_records)
+
+    def __paginate(self, records: list) -> tuple:
+        return tuple(b"".join(records[i:i + self.page_records]) for i in range(0, len(records), self.page_records))
+
+    # versions
+    @property
+    def version(self) -> int:
+        """index of the current version, 0 is the initial table"""
+        return self.__current
+
+    @property
+    def versions(self) -> int:
+        return len(self.__versions)
+
+    def __pages(self, version: int = None) -> tuple:
+        return self.__versions[self.__current if version is None else version]
+
+    def __commit(self, pages: tuple) -> int:
+        # a new edit discards all versions that were undone
+        del self.__versions[self.__current + 1:]
+        self.__versions.append(pages)
+        self.__current += 1
+        return self.__current
+
+    def undo(self) -> bool:
+        """goes back to the previous version, returns False if there is none"""
+        if self.__current == 0:
+            return False
+        self.__current -= 1
+        return True
+
+    def redo(self) -> bool:
+        """goes forward to the next version, returns False if there is none"""
+        if self.__current + 1 >= len(self.__versions):
+            return False
+        self.__current += 1
+        return True
+
+    def checkout(self, version: int):
+        """makes an older or newer version the current one"""
+        assert 0 <= version < len(self.__versions)
+        self.__current = version
+
+    # reading
+    def __len__(self) -> int:
+        return self.__length(self.__pages())
+
+    def __length(self, pages: tuple) -> int:
+        if not pages:
+            return 0
+        return (len(pages) - 1) * self.page_records + len(pages[-1]) // self.record_size
+
+    def record(self, index: int, version: int = None) -> bytes:
+        """encoded record at `index`, negative indexes count from the end of the version"""
+        pages = self.__pages(version)
+        length = self.__length(pages)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(index)
+        page, offset = divmod(index, self.page_records)
+        return pages[page][offset * self.record_size:(offset + 1) * self.record_size]
+
+    def __getitem__(self, index: int):
+        return self.record_type.from_bytes(self.record(index))
+
+    def __iter__(self):
+        for page in self.__pages():
+            for offset in range(0, len(page), self.record_size):
+                yield self.record_type.from_bytes(page[offset:offset + self.record_size])
+
+    def to_bytes(self, version: int = None) -> bytes:
+        return b"".join(self.__pages(version))
+
+    def export(self, file: str, version: int = None):
+        """writes a version (by default the current one) as SDA file"""
+        with open(file, "bw") as f:
+            for page in self.__pages(version):
+                f.write(page)
+
+    # editing, every call creates a new version
+    def set(self, index: int, item) -> int:
+        """replaces the record at `index`, returns the new version"""
+        return self.update({index: item})
+
+    def update(self, items: dict) -> int:
+        """replaces many records {index: item} in one version, returns the new version"""
+        pages = list(self.__pages())
+        length = len(self)
+        changed = {}
+        for index, item in items.items():
+            assert isinstance(item, self.record_type)
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError(index)
+            page, offset = divmod(index, self.page_records)
+            if page not in changed:
+                changed[page] = bytearray(pages[page])
+            changed[page][offset * self.record_size:(offset + 1) * self.record_size] = item.to_bytes()
+        for page, B in changed.items():
+            pages[page] = bytes(B)
+        return self.__commit(tuple(pages))
+
+    def append(self, item) -> int:
+        """appends a record, returns the new version"""
+        assert isinstance(item, self.record_type)
+        pages = list(self.__pages())
+        if pages and len(pages[-1]) < self.page_records * self.record_size:
+            pages[-1] = pages[-1] + item.to_bytes()
+        else:
+            pages.append(item.to_bytes())
+        return self.__commit(tuple(pages))
+
+    def delete(self, index: int) -> int:
+        """removes the record at `index`, returns the new version
+
+        The pages before the deleted record are shared, the following ones are
+        shifted by one record.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        pages = self.__pages()
+        first = index // self.page_records
+        tail = b"".join(pages[first:])
+        offset = (index - first * self.page_records) * self.record_size
+        tail = tail[:offset] + tail[offset + self.record_size:]
+        page_size = self.page_records * self.record_size
+        return self.__commit(pages[:first] + tuple(tail[i:i + page_size] for i in range(0, len(tail), page_size)))
+
+    # comparing
+    def diff(self, old: int, new: int = None) -> list:
+        """indexes of the records that differ between two versions (by default from `old` to the current one)
+
+        Returns:
+            list[tuple[int, bytes | None, bytes | None]]: (index, old record, new record), None if the record does not exist
+        """
+        a, b = self.__pages(old), self.__pages(new)
+        changes = []
+        for page in range(max(len(a), len(b))):
+            pa = a[page] if page < len(a) else b""
+            pb = b[page] if page < len(b) else b""
+            if pa is pb or pa == pb:
+                continue
+            for offset in range(0, max(len(pa), len(pb)), self.record_size):
+                ra = pa[offset:offset + self.record_size] or None
+                rb = pb[offset:offset + self.record_size] or None
+                if ra != rb:
+                    changes.append((page * self.page_records + offset // self.record_size, ra, rb))
+        return changes
+
+    def shared_pages(self, old: int, new: int = None) -> int:
+        """number of pages two versions share"""
+        a, b = self.__pages(old), self.__pages(new)
+        return sum(1 for pa, pb in zip(a, b) if pa is pb)
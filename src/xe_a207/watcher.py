@@ -0,0 +1,194 @@
+"""Polling watcher keeping a `Programming` in sync with a PROGRAM directory
+
+The watcher only uses `os.stat` and plain reads, so it works the same on every
+platform and on every mounted file system:
+
+    watcher = DirectoryWatcher("/media/sd")
+    watcher.subscribe(lambda change: print(change))
+    watcher.watch(interval=1.0)         # or call watcher.poll() from your own loop
+
+A file is only read when its modification time or size changed and then
+stayed the same until the next poll, so a file that is being rewritten (which
+starts with truncating it) is not read halfway. The file is then cut into
+blocks of `block_records` records and the hash of every block is compared
+with the hash from the previous read; only the records of changed blocks are
+compared with the in-memory records and only the records that differ are
+decoded and replaced. Records appended to or truncated from a file
+are added to or removed from the end of the table. The lists of the watched
+`Programming` are modified in place.
+
+A file whose size is not a multiple of its record size or that changes while
+it is read is skipped and read again at a later poll. `watch` also retries
+files with invalid records at the next poll instead of stopping.
+"""
+import hashlib
+import os
+import threading
+
+from .XE_A207 import Department, Logo_msg, Product, Programming, Tax
+from . import records
+
+# file -> (attribute of Programming, record size, decode(record, slot))
+_TABLES = {
+    "PLUDT.SDA": ("plu", records.PRODUCT_RECORD_SIZE, lambda B, slot: Product.from_bytes(B)),
+    "DEPTDT.SDA": ("dept", records.DEPARTMENT_RECORD_SIZE, lambda B, slot: Department.from_bytes(B)),
+    "TAXTB.SDA": ("tax", records.TAX_RECORD_SIZE, lambda B, slot: Tax.from_bytes(B, slot + 1)),
+}
+# file -> (attribute of Programming, decode(content)), replaced as a whole
+_OBJECTS = {
+    "LOGODT.SDA": ("logo_msg", Logo_msg.from_bytes),
+}
+
+def _hash(B: bytes) -> bytes:
+    return hashlib.blake2b(B, digest_size=16).digest()
+
+class Change:
+    """Change event of one file"""
+    file: str
+    attribute: str
+    updated: list[int]
+    added: list[int]
+    removed: list[int]
+
+    def __init__(self, file: str, attribute: str, updated: list[int], added: list[int] = (), removed: list[int] = ()):
+        self.file = file
+        self.attribute = attribute
+        self.updated = list(updated)
+        self.added = list(added)
+        self.removed = list(removed)
+
+    def __repr__(self):
+        return (f"Change(file={self.file!r}, attribute={self.attribute!r}, updated={self.updated}, "
+                f"added={self.added}, removed={self.removed})")
+
+class DirectoryWatcher:
+    """Watches the PROGRAM directory of an SD card and reloads changed records"""
+    directory: str
+    programming: Programming
+    block_records: int
+
+    def __init__(self, directory: str, programming: Programming = None, block_records: int = 64):
+        """initializes new DirectoryWatcher object
+
+        Args:
+            directory (str):            SD card directory containing PROGRAM
+            programming (Programming):  in-memory content of the card, read from `directory` if omitted;
+                                        it has to match the files when the watcher is created
+            block_records (int):        number of records per hashed block
+        """
+        assert isinstance(block_records, int) and block_records > 0
+        self.directory = directory
+        self.programming = Programming.read_directory(directory) if programming is None else programming
+        assert isinstance(self.programming, Programming)
+        self.block_records = block_records
+        self.__subscribers = []
+        self.__state = {}   # file -> (mtime_ns, size, block hashes)
+        self.__pending = {} # file -> (mtime_ns, size) or None (deleted) seen at the last poll, but not read yet
+        for name in (*_TABLES, *_OBJECTS):
+            stat = self.__stat(name)
+            if stat is not None:
+                self.__state[name] = (*stat, self.__blocks(name, self.__read(name)))
+
+    def __path(self, name: str) -> str:
+        return os.path.join(self.directory, "PROGRAM", name)
+
+    def __stat(self, name: str):
+        try:
+            st = os.stat(self.__path(name))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def __read(self, name: str) -> bytes:
+        try:
+            with open(self.__path(name), "br") as f:
+                return f.read()
+        except FileNotFoundError:
+            return b""
+
+    def __blocks(self, name: str, B: bytes) -> list[bytes]:
+        if name not in _TABLES:
+            return [_hash(B)]
+        size = _TABLES[name][1] * self.block_records
+        return [_hash(B[i:i + size]) for i in range(0, len(B), size)]
+
+    def subscribe(self, callback):
+        """registers callback(Change), called for every change found by `poll`"""
+        self.__subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.__subscribers.remove(callback)
+
+    def poll(self) -> list[Change]:
+        """checks all files once, applies the changes of files that stopped changing and notifies the subscribers
+
+        Returns:
+            list[Change]: the changes found, files without changed content are not listed
+        """
+        changes = []
+        for name in (*_TABLES, *_OBJECTS):
+            stat = self.__stat(name)
+            old = self.__state.get(name)
+            if (old[:2] if old else None) == stat:
+                self.__pending.pop(name, None)
+                continue
+            if name not in self.__pending or self.__pending[name] != stat:
+                # changed since the last poll, it is read once it stopped changing
+                self.__pending[name] = stat
+                continue
+            B = self.__read(name)
+            if self.__stat(name) != stat or (name in _TABLES and len(B) % _TABLES[name][1]):
+                continue
+            blocks = self.__blocks(name, B)
+            change = self.__apply(name, B, old[2] if old else [], blocks)
+            del self.__pending[name]
+            if stat is None:
+                self.__state.pop(name, None)
+            else:
+                self.__state[name] = (*stat, blocks)
+            if change is not None:
+                changes.append(change)
+        for change in changes:
+            for callback in list(self.__subscribers):
+                callback(change)
+        return changes
+
+    def __apply(self, name: str, B: bytes, old_blocks: list, new_blocks: list):
+        if name in _OBJECTS:
+            if old_blocks == new_blocks or (name == "LOGODT.SDA" and not B):
+                return None
+            attribute, decode = _OBJECTS[name]
+            setattr(self.programming, attribute, decode(B))
+            return Change(name, attribute, [0])
+        attribute, size, decode = _TABLES[name]
+        items = getattr(self.programming, attribute)
+        count = len(B) // size
+        updated = []
+        for block, h in enumerate(new_blocks):
+            if block < len(old_blocks) and old_blocks[block] == h:
+                continue
+            for slot in range(block * self.block_records, min((block + 1) * self.block_records, count, len(items))):
+                R = B[slot * size:(slot + 1) * size]
+                if items[slot].to_bytes() != R:
+                    items[slot] = decode(R, slot)
+                    updated.append(slot)
+        added = list(range(len(items), count))
+        items.extend(decode(B[slot * size:(slot + 1) * size], slot) for slot in added)
+        removed = list(range(count, len(items)))
+        del items[count:]
+        if not (updated or added or removed):
+            return None
+        return Change(name, attribute, updated, added, removed)
+
+    def watch(self, interval: float = 1.0, stop: threading.Event = None):
+        """polls every `interval` seconds until `stop` is set"""
+        if stop is None:
+            stop = threading.Event()
+        while not stop.is_set():
+            try:
+                self.poll()
+            except (ValueError, AssertionError):
+                # invalid records, most likely a file written by another program right now: retried at the next poll
+                pass
+            stop.wait(interval)
@@ -345,10 +345,38 @@ def invalid_subject_to_VAT(request):
 
 # Logo initialization values
 ## valid
-# TODO have to find out how logo works first
+@pytest.fixture
+def logo_bits_white():
+    return (bytes(5850), 0.)
+
+@pytest.fixture
+def logo_bits_stripes():
+    return (bytes([0xFF] * 45 + [0x00] * 135) * 32 + bytes(90), 32 / 130)
+
+@pytest.fixture
+def logo_bits_almost_limit():
+    return (bytes([0xFF] * 15 + [0x00] * 30) * 100 + bytes([0x01] * 45) * 30, (100 * 120 + 30 * 45) / (130 * 360))
+
+@pytest.fixture(params=["logo_bits_white", "logo_bits_stripes", "logo_bits_almost_limit"])
+def valid_logo_bits(request):
+    return request.getfixturevalue(request.param)
 
 ## invalid
-# TODO have to find out how logo works first
+@pytest.fixture
+def logo_bits_too_black():
+    return bytes([0xFF] * 5850)
+
+@pytest.fixture
+def logo_bits_too_short():
+    return bytes(5849)
+
+@pytest.fixture
+def logo_bits_wrong_type():
+    return [0] * 5850
+
+@pytest.fixture(params=["logo_bits_too_short", "logo_bits_wrong_type"])
+def invalid_logo_bits(request):
+    return request.getfixturevalue(request.param)
 
 # Logo_msg initialization values
 ## valid
@@ -0,0 +1,68 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import xe_a207
+from xe_a207 import arrays
+
+@pytest.fixture
+def card(tmp_path):
+    (tmp_path / "PROGRAM").mkdir()
+    products = [xe_a207.Product(code, 1 + code % 99, code % 2 == 0, code % 3 == 0, code * 37 / 100., f"Käse {code}")
+                for code in range(1, 1000)]
+    departments = [xe_a207.Department(code, code % 2 == 0, code % 3 == 0, True, xe_a207.Taxable.from_byte(code % 16),
+                                      999999.99, code % 13, code / 100., "Heißgetränke")
+                   for code in range(100)]
+    xe_a207.export_products(str(tmp_path / "PROGRAM" / "PLUDT.SDA"), products)
+    xe_a207.export_departments(str(tmp_path / "PROGRAM" / "DEPTDT.SDA"), departments)
+    return tmp_path, products, departments
+
+def test_decode_products(card):
+    directory, products, departments = card
+    plu = arrays.read_products(str(directory / "PROGRAM" / "PLUDT.SDA"))
+    assert plu.dtype == arrays.PRODUCT_DTYPE
+    assert plu["code"].tolist() == [prod.code for prod in products]
+    assert plu["price"].tolist() == [round(prod.price * 100) for prod in products]
+    assert arrays.texts(plu) == [prod.text for prod in products]
+    assert arrays.encode_products(plu) == (directory / "PROGRAM" / "PLUDT.SDA").read_bytes()
+
+def test_decode_departments(card):
+    directory, products, departments = card
+    dept = arrays.read_departments(str(directory / "PROGRAM" / "DEPTDT.SDA"))
+    assert dept["taxable"].tolist() == [d.taxable.to_byte() for d in departments]
+    assert dept["halo"].tolist() == [99999999] * 100
+    assert arrays.encode_departments(dept) == (directory / "PROGRAM" / "DEPTDT.SDA").read_bytes()
+
+def test_decode_departments_invalid(dept_invalid_bytes):
+    with pytest.raises((ValueError, AssertionError)):
+        arrays.decode_departments(dept_invalid_bytes)
+
+def test_npy_roundtrip(card, tmp_path_factory):
+    directory, products, departments = card
+    output = tmp_path_factory.mktemp("npy")
+    arrays.card_to_npy(str(directory), str(output))
+    plu = np.load(output / "plu.npy", mmap_mode="r")
+    assert int(plu["price"][plu["code"] == 10][0]) == 370
+    restored = tmp_path_factory.mktemp("card")
+    arrays.npy_to_card(str(output), str(restored))
+    for name in ("PLUDT.SDA", "DEPTDT.SDA"):
+        assert (restored / "PROGRAM" / name).read_bytes() == (directory / "PROGRAM" / name).read_bytes()
+
+def test_npz_and_fleet(card, tmp_path_factory):
+    directory, products, departments = card
+    npz = tmp_path_factory.mktemp("npz") / "card.npz"
+    arrays.card_to_npz(str(directory), str(npz), compressed=True)
+    restored = tmp_path_factory.mktemp("card")
+    arrays.npy_to_card(str(npz), str(restored))
+    assert (restored / "PROGRAM" / "PLUDT.SDA").read_bytes() == (directory / "PROGRAM" / "PLUDT.SDA").read_bytes()
+    fleet = tmp_path_factory.mktemp("fleet")
+    arrays.fleet_to_npy([str(directory), str(restored)], str(fleet))
+    plu = np.load(fleet / "plu.npy", mmap_mode="r")
+    assert len(plu) == 2 * len(products)
+    assert plu["card"].tolist() == [0] * len(products) + [1] * len(products)
+
+def test_bcd_invalid_nibble():
+    B = bytearray(xe_a207.Product(1, 1, False, False, 1., "x").to_bytes() * 3)
+    B[31 + 12] = 0xA0
+    with pytest.raises(ValueError, match="record 1"):
+        arrays.decode_products(bytes(B))
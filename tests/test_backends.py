@@ -0,0 +1,85 @@
+import pytest
+
+import xe_a207
+from xe_a207 import backends, synthetic
+
+@pytest.fixture
+def products():
+    return synthetic.products(300)[:-1] + [xe_a207.Product(999999, 99, True, True, 99999999.99, "ÄÖÜ ßéè ░▒▓│┤╡╢╖")]
+
+@pytest.fixture
+def departments():
+    return synthetic.departments(99)
+
+@pytest.mark.parametrize("name", backends.available())
+def test_backends_byte_identical(tmp_path, name, products, departments):
+    reference = backends.BACKENDS["pure"]
+    backend = backends.BACKENDS[name]
+    B = bytes(reference.encode_products(products))
+    D = bytes(reference.encode_departments(departments))
+    assert bytes(backend.encode_products(products)) == B
+    assert bytes(backend.encode_departments(departments)) == D
+    assert backend.decode_products(B) == products
+    assert backend.decode_departments(D) == departments
+    assert backend.decode_products(b"") == [] and bytes(backend.encode_products([])) == b""
+    file = str(tmp_path / "PLUDT.SDA")
+    assert bytes(xe_a207.export_products(file, products, codec=name)) == B
+    assert xe_a207.import_products(file, codec=name) == products
+
+def _patched(B: bytes, offset: int, value: int) -> bytes:
+    B = bytearray(B)
+    B[offset] = value
+    return bytes(B)
+
+@pytest.mark.parametrize("name", backends.available())
+def test_backends_reject_invalid_records(name, products, departments):
+    backend = backends.BACKENDS[name]
+    P = bytes(backends.BACKENDS["pure"].encode_products(products))
+    D = bytes(backends.BACKENDS["pure"].encode_departments(departments))
+    for B in (P[:-1], _patched(P, 10, 0xA0), _patched(P, 8, 0x00), P[:5] + bytes(3) + P[8:31]):
+        with pytest.raises(ValueError):
+            backend.decode_products(B)
+    for B in (D[:-1], _patched(D, 3, 0xAB), _patched(D, 1, 0xFF), _patched(D, 2, 0x20), _patched(D, 7, 0x13)):
+        with pytest.raises(ValueError):
+            backend.decode_departments(B)
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        backends.Backend()
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.delenv(backends.ENVIRONMENT_VARIABLE, raising=False)
+    assert backends.get(count=0).name == "struct"
+    assert backends.get(count=100000).name == ("numpy" if "numpy" in backends.available() else "struct")
+    assert backends.get("pure", 100000).name == "pure"
+    monkeypatch.setenv(backends.ENVIRONMENT_VARIABLE, "pure")
+    assert backends.get(count=100000).name == "pure"
+    with backends.use("struct"):
+        assert backends.get(count=100000).name == "struct"
+        assert backends.get("pure").name == "pure"
+        with backends.use("auto"):
+            assert backends.get(count=0).name == "struct"
+    assert backends.get(count=5).name == "pure"
+    with pytest.raises(ValueError, match="unknown"):
+        backends.get("fortran")
+
+def test_register_backend(tmp_path, products):
+    class Counting(backends.PureBackend):
+        name = "counting"
+        calls = 0
+        def encode_products(self, products):
+            Counting.calls += 1
+            return super().encode_products(products)
+    backends.register(Counting())
+    try:
+        with backends.use("counting"):
+            xe_a207.export_products(str(tmp_path / "PLUDT.SDA"), products)
+        assert Counting.calls == 1
+    finally:
+        del backends.BACKENDS["counting"]
+
+def test_unavailable_backend(monkeypatch):
+    monkeypatch.setattr(backends.NumpyBackend, "available", lambda self: False)
+    assert backends.get(count=100000).name == "struct"
+    with pytest.raises(ValueError, match="not available"):
+        backends.get("numpy")
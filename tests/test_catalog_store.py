@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+import xe_a207
+from xe_a207.catalog_store import CatalogStore
+
+@pytest.fixture
+def card(tmp_path):
+    os.makedirs(tmp_path / "PROGRAM")
+    products = [xe_a207.Product(code, 1 + code % 5, False, True, code * 1.01, f"PLU {code}") for code in range(1, 51)]
+    departments = [xe_a207.Department(code, False, True, True, xe_a207.Taxable.from_byte(code % 16), 999.99, 1, 1.5, f"Dept {code}")
+                   for code in range(1, 11)]
+    xe_a207.export_products(str(tmp_path / "PROGRAM" / "PLUDT.SDA"), products)
+    xe_a207.export_departments(str(tmp_path / "PROGRAM" / "DEPTDT.SDA"), departments)
+    xe_a207.export_taxes(str(tmp_path / "PROGRAM" / "TAXTB.SDA"), [xe_a207.Tax(i, 19.0, 0.) for i in range(1, 5)])
+    xe_a207.export_logo_msg(str(tmp_path / "PROGRAM" / "LOGODT.SDA"), xe_a207.Logo_msg(["Hello", "World"]))
+    return tmp_path, products, departments
+
+def test_catalog_store_load_directory(card):
+    directory, products, departments = card
+    with CatalogStore() as store:
+        store.load_directory(str(directory))
+        assert store.products() == products
+        assert store.departments() == departments
+        assert store.products(dept_no=2) == [prod for prod in products if prod.dept_no == 2]
+        assert store.product(7) == products[6]
+        assert store.product(1000) is None
+        assert store.changed_products() == []
+        assert store.sync(str(directory)) == {"PLUDT.SDA": 0, "DEPTDT.SDA": 0, "TAXTB.SDA": 0, "LOGODT.SDA": 0}
+
+def test_catalog_store_incremental_sync(card):
+    directory, products, departments = card
+    with CatalogStore() as store:
+        store.load_directory(str(directory))
+        changed = xe_a207.Product(7, 2, True, False, 0.29, "changed")
+        new = xe_a207.Product(999, 3, False, False, 1.0, "new")
+        assert store.upsert_products(products[:5] + [changed, new]) == 2
+        assert store.sync(str(directory))["PLUDT.SDA"] == 2
+        expected = products[:6] + [changed] + products[7:] + [new]
+        assert xe_a207.import_products(str(directory / "PROGRAM" / "PLUDT.SDA")) == expected
+
+def test_catalog_store_delete_rewrites_file(card):
+    directory, products, departments = card
+    with CatalogStore() as store:
+        store.load_directory(str(directory))
+        store.delete_product(3)
+        store.delete_department(1)
+        result = store.sync(str(directory))
+        assert result["PLUDT.SDA"] == len(products) - 1
+        assert xe_a207.import_products(str(directory / "PROGRAM" / "PLUDT.SDA")) == products[:2] + products[3:]
+        assert xe_a207.import_departments(str(directory / "PROGRAM" / "DEPTDT.SDA")) == departments[1:]
+
+def test_catalog_store_load_second_card(card, tmp_path):
+    directory, products, departments = card
+    other = tmp_path / "other"
+    os.makedirs(other / "PROGRAM")
+    second = [xe_a207.Product(code, 1, False, True, 2.0, f"Other {code}") for code in (3, 500, 600)]
+    xe_a207.export_products(str(other / "PROGRAM" / "PLUDT.SDA"), second)
+    with CatalogStore() as store:
+        store.load_directory(str(directory))
+        store.load_directory(str(other))
+        assert store.products() == second
+        assert store.departments() == [] and store.taxes() == [] and store.logo_msg().rows == []
+        store.upsert_products([xe_a207.Product(500, 2, False, True, 3.0, "changed")])
+        assert store.sync(str(other))["PLUDT.SDA"] == 1
+        assert xe_a207.import_products(str(other / "PROGRAM" / "PLUDT.SDA")) == [
+            second[0], xe_a207.Product(500, 2, False, True, 3.0, "changed"), second[2]]
+        assert xe_a207.import_departments(str(other / "PROGRAM" / "DEPTDT.SDA")) == []
+
+def test_catalog_store_products_csv(tmp_path):
+    file = tmp_path / "plu.csv"
+    file.write_text("code,dept_no,open,preset,price,text\n1,2,True,False,1.25,Coffee\n2,2,0,1,2.5,Tea\n")
+    with CatalogStore() as store:
+        assert store.load_products_csv(str(file)) == 2
+        assert store.products() == [xe_a207.Product(1, 2, True, False, 1.25, "Coffee"),
+                                    xe_a207.Product(2, 2, False, True, 2.5, "Tea")]
+        assert store.sync(str(tmp_path))["PLUDT.SDA"] == 2
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import xe_a207
+from xe_a207 import cli
+
+@pytest.fixture
+def card(tmp_path):
+    (tmp_path / "card" / "PROGRAM").mkdir(parents=True)
+    products = [xe_a207.Product(code, 1 + code % 9, False, True, code * 11 / 100., f"Item {code}") for code in range(1, 21)]
+    departments = [xe_a207.Department(code, False, True, True, xe_a207.Taxable.from_byte(code % 16), 100., 1, 0.5, f"Dept {code}")
+                   for code in range(1, 10)]
+    xe_a207.export_products(str(tmp_path / "card" / "PROGRAM" / "PLUDT.SDA"), products)
+    xe_a207.export_departments(str(tmp_path / "card" / "PROGRAM" / "DEPTDT.SDA"), departments)
+    return tmp_path / "card"
+
+@pytest.mark.parametrize("table, file, fmt", [("plu", "PLUDT.SDA", "jsonl"), ("plu", "PLUDT.SDA", "tsv"),
+                                              ("dept", "DEPTDT.SDA", "jsonl"), ("dept", "DEPTDT.SDA", "tsv")])
+def test_cli_dump_load_roundtrip(card, tmp_path, table, file, fmt):
+    dump = tmp_path / f"dump.{fmt}"
+    assert cli.main(["dump", str(card), "--table", table, "--format", fmt, "-o", str(dump)]) == 0
+    copy = tmp_path / "copy"
+    assert cli.main(["load", str(copy), str(dump), "--table", table, "--format", fmt]) == 0
+    assert (copy / "PROGRAM" / file).read_bytes() == (card / "PROGRAM" / file).read_bytes()
+
+def test_cli_dump_jsonl(card, capsys):
+    assert cli.main(["dump", str(card)]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert rows[2] == {"code": 3, "dept_no": 4, "open": False, "preset": True, "price": 0.33, "text": "Item 3"}
+
+def test_cli_patch_and_diff(card, tmp_path, capsys):
+    original = tmp_path / "original"
+    original.mkdir()
+    (original / "PROGRAM").mkdir()
+    (original / "PROGRAM" / "PLUDT.SDA").write_bytes((card / "PROGRAM" / "PLUDT.SDA").read_bytes())
+    patch = tmp_path / "patch.tsv"
+    patch.write_text("# new prices\n3\t1.99\n{\"code\": 5, \"price\": 0.55}\n")
+    assert cli.main(["patch", str(card), str(patch), "--dry-run"]) == 0
+    assert cli.main(["diff", str(original), str(card)]) == 0
+    assert cli.main(["patch", str(card), str(patch)]) == 0
+    assert xe_a207.import_products(str(card / "PROGRAM" / "PLUDT.SDA"))[2].price == 1.99
+    capsys.readouterr()
+    assert cli.main(["diff", str(original), str(card)]) == 1
+    changes = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert changes == [{"code": 3, "changed": {"price": [0.33, 1.99]}}]
+
+def test_cli_patch_unknown_code(card, tmp_path):
+    patch = tmp_path / "patch.tsv"
+    patch.write_text("999\t1.00\n")
+    assert cli.main(["patch", str(card), str(patch)]) == 1
+
+def test_cli_patch_invalid_price(card, tmp_path, capsys):
+    original = (card / "PROGRAM" / "PLUDT.SDA").read_bytes()
+    patch = tmp_path / "patch.tsv"
+    patch.write_text("3\t1.99\n5\t-1.00\n")
+    assert cli.main(["patch", str(card), str(patch), "--dry-run"]) == 1
+    assert "code 5" in capsys.readouterr().err
+    assert cli.main(["patch", str(card), str(patch)]) == 1
+    assert (card / "PROGRAM" / "PLUDT.SDA").read_bytes() == original
+
+def test_cli_errors(card, tmp_path, capsys):
+    assert cli.main(["dump", str(tmp_path / "missing")]) == 1
+    assert "missing" in capsys.readouterr().err
+    original = (card / "PROGRAM" / "PLUDT.SDA").read_bytes()
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text('{"code": 1, "dept_no": 1, "open": false, "preset": true, "price": 1.0, "text": "ok"}\n{"code": 2}\n')
+    assert cli.main(["load", str(card), str(bad)]) == 1
+    assert "line 2" in capsys.readouterr().err
+    bad.write_text("1\t1\tTrue\tFalse\t1.5\tok\n0\t1\tTrue\tFalse\t1.5\tbad code\n")
+    assert cli.main(["load", str(card), str(bad), "--format", "tsv"]) == 1
+    assert (card / "PROGRAM" / "PLUDT.SDA").read_bytes() == original
+    (card / "PROGRAM" / "PLUDT.SDA").write_bytes(original[:-3])
+    assert cli.main(["dump", str(card)]) == 1
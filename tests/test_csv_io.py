@@ -0,0 +1,83 @@
+import os
+import stat
+
+import pytest
+
+import xe_a207
+from xe_a207 import csv_io
+
+@pytest.fixture
+def products():
+    return [xe_a207.Product(code, 1 + code % 99, code % 2 == 0, code % 3 == 0, code * 29 / 100., f"PLU\t{code}")
+            for code in range(1, 200)]
+
+@pytest.fixture
+def departments():
+    return [xe_a207.Department(code, code % 2 == 0, True, False, xe_a207.Taxable.from_byte(code % 16),
+                               999.99, 1 + code % 12, code / 10., f"Dept {code}")
+            for code in range(1, 100)]
+
+def test_products_tsv_roundtrip(tmp_path, products):
+    text_file = tmp_path / "plu.tsv"
+    text_file.write_text("".join(str(prod) + "\n" for prod in products), encoding="utf-8")
+    assert csv_io.products_to_sda(str(text_file), str(tmp_path / "PLUDT.SDA")) == len(products)
+    assert xe_a207.import_products(str(tmp_path / "PLUDT.SDA")) == products
+    assert csv_io.sda_to_products(str(tmp_path / "PLUDT.SDA"), str(tmp_path / "out.tsv")) == len(products)
+    assert (tmp_path / "out.tsv").read_text(encoding="utf-8") == text_file.read_text(encoding="utf-8")
+
+def test_departments_tsv_roundtrip(tmp_path, departments):
+    text_file = tmp_path / "dept.tsv"
+    text_file.write_text("".join(str(dept) + "\n" for dept in departments), encoding="utf-8")
+    assert csv_io.departments_to_sda(str(text_file), str(tmp_path / "DEPTDT.SDA")) == len(departments)
+    assert xe_a207.import_departments(str(tmp_path / "DEPTDT.SDA")) == departments
+    csv_io.sda_to_departments(str(tmp_path / "DEPTDT.SDA"), str(tmp_path / "out.tsv"))
+    assert (tmp_path / "out.tsv").read_text(encoding="utf-8") == text_file.read_text(encoding="utf-8")
+
+def test_products_csv_roundtrip(tmp_path, products):
+    xe_a207.export_products(str(tmp_path / "PLUDT.SDA"), products)
+    csv_io.sda_to_products(str(tmp_path / "PLUDT.SDA"), str(tmp_path / "plu.csv"), header=True)
+    assert (tmp_path / "plu.csv").read_text(encoding="utf-8").startswith("code,dept_no,open,preset,price,text\n")
+    csv_io.products_to_sda(str(tmp_path / "plu.csv"), str(tmp_path / "COPY.SDA"))
+    assert (tmp_path / "COPY.SDA").read_bytes() == (tmp_path / "PLUDT.SDA").read_bytes()
+
+def test_products_row_errors(tmp_path):
+    text_file = tmp_path / "plu.tsv"
+    text_file.write_text("1\t1\tTrue\tFalse\t1.5\tok\n"
+                         "0\t1\tTrue\tFalse\t1.5\tbad code\n"
+                         "2\t1\tyes\tFalse\t1.5\tbad bool\n"
+                         "3\t1\tTrue\n"
+                         "4\t1\tTrue\tFalse\t1.5\tname that is much too long\n"
+                         "5\t1\tTrue\tFalse\t2\tok\n"
+                         "6\t1\tTrue\tFalse\tinf\tinfinite price\n"
+                         "7\t1\tTrue\tFalse\tnan\tno price\n", encoding="utf-8")
+    errors = []
+    assert csv_io.products_to_sda(str(text_file), str(tmp_path / "PLUDT.SDA"), errors=errors) == 2
+    assert [error.line for error in errors] == [2, 3, 4, 5, 7, 8]
+    with pytest.raises(ValueError, match="line 2"):
+        csv_io.products_to_sda(str(text_file), str(tmp_path / "PLUDT.SDA"))
+
+def test_products_to_sda_keeps_file_on_error(tmp_path):
+    sda_file = tmp_path / "PLUDT.SDA"
+    sda_file.write_bytes(b"original")
+    text_file = tmp_path / "plu.tsv"
+    text_file.write_text("1\t1\tTrue\tFalse\t1.5\tok\n" * 5000 + "0\t1\tTrue\tFalse\t1.5\tbad code\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        csv_io.products_to_sda(str(text_file), str(sda_file))
+    assert sda_file.read_bytes() == b"original"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["PLUDT.SDA", "plu.tsv"]
+
+def test_open_atomic_keeps_mode(tmp_path):
+    file = tmp_path / "PLUDT.SDA"
+    file.write_bytes(b"original")
+    os.chmod(file, 0o644)
+    with csv_io.open_atomic(str(file)) as f:
+        f.write(b"replaced")
+    assert file.read_bytes() == b"replaced"
+    assert stat.S_IMODE(os.stat(file).st_mode) == 0o644
+    umask = os.umask(0o022)
+    try:
+        with csv_io.open_atomic(str(tmp_path / "NEW.SDA")) as f:
+            f.write(b"new")
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(os.stat(tmp_path / "NEW.SDA").st_mode) == 0o644
@@ -0,0 +1,69 @@
+import pytest
+
+import xe_a207
+from xe_a207 import generator
+
+@pytest.fixture
+def drinks():
+    return generator.Template(
+        codes=1000,
+        axes={"size": ["S", "L"], "flavour": ["Cola", "Lemon"]},
+        name="{flavour} {size}",
+        price={("S", "Cola"): 1.5, ("L", "Cola"): 2.5, ("S", "Lemon"): 1.6, ("L", "Lemon"): 2.6},
+        dept_no=3)
+
+def test_template_axes(drinks):
+    assert len(drinks) == 4
+    assert list(generator.products([drinks])) == [
+        xe_a207.Product(1000, 3, False, True, 1.5, "Cola S"),
+        xe_a207.Product(1001, 3, False, True, 1.6, "Lemon S"),
+        xe_a207.Product(1002, 3, False, True, 2.5, "Cola L"),
+        xe_a207.Product(1003, 3, False, True, 2.6, "Lemon L"),
+    ]
+
+def test_template_code_range_and_formulas():
+    template = generator.Template(codes=range(10, 20, 2), name=lambda f: f"Item number {f['code']:06d} long",
+                                  price=lambda f: 0.1 * f["index"], dept_no={range(10, 14): 1, range(14, 20): 2},
+                                  open=lambda f: f["code"] > 15)
+    prods = list(generator.products([template]))
+    assert [p.code for p in prods] == [10, 12, 14, 16, 18]
+    assert [p.dept_no for p in prods] == [1, 1, 2, 2, 2]
+    assert [p.price for p in prods] == [0.0, 0.1, 0.2, 0.3, 0.4]
+    assert [p.open for p in prods] == [False, False, False, True, True]
+    assert prods[0].text == "Item number 0000"
+
+def test_single_axis_mapping():
+    template = generator.Template(codes=1, axes={"size": ["S", "M"]}, name="Tea {size}",
+                                  price={"S": 1, "M": 2}, dept_no=1)
+    assert [p.price for p in generator.products([template])] == [1.0, 2.0]
+
+def test_duplicate_codes(drinks):
+    with pytest.raises(ValueError, match="1000"):
+        list(generator.iter_records([drinks, drinks]))
+    assert len(list(generator.iter_records([drinks, drinks], unique=False))) == 8
+
+def test_missing_mapping_value():
+    template = generator.Template(codes=range(1, 5), name="X", price=1, dept_no={range(1, 3): 1})
+    with pytest.raises(KeyError):
+        list(generator.iter_records([template]))
+
+def test_write_products(tmp_path, drinks):
+    bulk = generator.Template(codes=range(5000, 15000), name="Item {code}", price=lambda f: f["index"] % 100 / 4,
+                              dept_no=lambda f: f["code"] % 99 + 1)
+    file = str(tmp_path / "PLUDT.SDA")
+    assert generator.write_products(file, [drinks, bulk], batch_size=1000) == 10004
+    prods = xe_a207.import_products(file)
+    assert prods == list(generator.products([drinks, bulk]))
+    assert prods[-1] == xe_a207.Product(14999, 14999 % 99 + 1, False, True, 24.75, "Item 14999")
+
+def test_write_products_keeps_file_on_error(tmp_path, drinks):
+    file = tmp_path / "PLUDT.SDA"
+    generator.write_products(str(file), [drinks])
+    original = file.read_bytes()
+    departments = {code: 1 for code in range(1000, 9000)}
+    broken = generator.Template(codes=range(1000, 10000), name="Item {code}", price=1.0,
+                                dept_no=lambda f: departments[f["code"]])
+    with pytest.raises(KeyError):
+        generator.write_products(str(file), [broken], batch_size=1000)
+    assert file.read_bytes() == original
+    assert [path.name for path in tmp_path.iterdir()] == ["PLUDT.SDA"]
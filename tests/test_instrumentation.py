@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import xe_a207
+from xe_a207 import instrumentation
+
+def test_profile_import_export(tmp_path):
+    os.makedirs(tmp_path / "PROGRAM")
+    programming = xe_a207.Programming(
+        [xe_a207.Department(code, False, True, True, xe_a207.Taxable.from_byte(1), 10., 1, 1., f"D{code}") for code in range(1, 10)],
+        [xe_a207.Product(code, 1, False, False, 2.5, f"P{code}") for code in range(1, 101)],
+        xe_a207.Logo(),
+        xe_a207.Logo_msg(["Thank you"]),
+        [xe_a207.Tax(i, 7.0, 0.) for i in range(1, 5)])
+    events = []
+    with instrumentation.profile(callback=lambda *event: events.append(event)) as metrics:
+        programming.write_directory(str(tmp_path))
+        loaded = xe_a207.Programming.read_directory(str(tmp_path))
+    assert instrumentation.current() is None
+    assert loaded.plu == programming.plu and loaded.dept == programming.dept
+    plu_file = str(tmp_path) + "/PROGRAM/PLUDT.SDA"
+    assert ("read", plu_file) in metrics.seconds
+    assert metrics.records[("decode", plu_file)] == 100
+    assert ("validate", plu_file) not in metrics.records
+    assert metrics.records[("validate", str(tmp_path) + "/PROGRAM/TAXTB.SDA")] == 8
+    assert metrics.records[("encode", plu_file)] == 100
+    assert metrics.records[("write", plu_file)] == 100
+    assert metrics.records[("decode", str(tmp_path) + "/PROGRAM/TAXTB.SDA")] == 4
+    assert len(events) == sum(metrics.calls.values())
+    assert metrics.total() >= metrics.total("decode") > 0
+    report = metrics.report()
+    assert "PLUDT.SDA" in report and "validate" in report
+
+def test_disabled_by_default(tmp_path):
+    xe_a207.export_products(str(tmp_path / "PLUDT.SDA"), [xe_a207.Product(1, 1, False, False, 1., "x")])
+    assert instrumentation.current() is None
+    with instrumentation.profile() as outer:
+        with instrumentation.profile(metrics=outer):
+            xe_a207.import_products(str(tmp_path / "PLUDT.SDA"))
+        assert instrumentation.current() is outer
+    assert outer.records[("decode", str(tmp_path / "PLUDT.SDA"))] == 1
+
+def test_profile_uses_codec_backend(tmp_path):
+    from xe_a207 import backends
+    file = str(tmp_path / "PLUDT.SDA")
+    calls = []
+    class Recording(backends.PureBackend):
+        name = "recording"
+        def decode_products(self, B):
+            calls.append("decode")
+            return super().decode_products(B)
+        def encode_products(self, products):
+            calls.append("encode")
+            return super().encode_products(products)
+    backends.register(Recording())
+    try:
+        with instrumentation.profile() as metrics:
+            xe_a207.export_products(file, [xe_a207.Product(1, 1, False, False, 1., "x")], codec="recording")
+            with backends.use("recording"):
+                assert xe_a207.import_products(file)[0].text == "x"
+            with pytest.raises(ValueError, match="unknown codec"):
+                xe_a207.import_products(file, codec="unknown")
+    finally:
+        del backends.BACKENDS["recording"]
+    assert calls == ["encode", "decode"]
+    assert metrics.records[("encode", file)] == 1 and metrics.records[("decode", file)] == 1
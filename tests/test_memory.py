@@ -0,0 +1,14 @@
+import pytest
+
+from xe_a207 import memory
+
+def test_memory_budgets():
+    results = memory.run(sizes=(500, 5000))
+    assert {result["kind"] for result in results} == {"Product", "Department", "Taxable", "card"}
+    memory.check_budgets(results)
+
+def test_memory_budget_exceeded():
+    results = memory.run(sizes=(100,))
+    with pytest.raises(AssertionError, match="Product x 100: retained"):
+        memory.check_budgets(results, {"Product": {"retained": 1}})
+    assert "Taxable" in memory.report(results)
@@ -0,0 +1,66 @@
+import pytest
+
+import xe_a207
+from xe_a207 import merge
+
+@pytest.fixture
+def sources():
+    central = [xe_a207.Product(code, 1, False, True, 2.0, f"Central {code}") for code in range(1, 11)]
+    regional = [xe_a207.Product(3, 1, False, True, 1.5, "Regional 3"),
+                xe_a207.Product(4, 1, False, True, 2.0, "Central 4"),
+                xe_a207.Product(20, 2, False, True, 5.0, "Regional 20")]
+    store = [xe_a207.Product(3, 1, True, True, 2.5, "Store 3"),
+             xe_a207.Product(15, 3, False, False, 0.5, "Store 15")]
+    return [central, regional, store]
+
+def test_merge_last_wins(sources):
+    report = merge.MergeReport()
+    merged = list(merge.merge_products(sources, report=report))
+    assert [prod.code for prod in merged] == list(range(1, 11)) + [15, 20]
+    assert merged[2].text == "Store 3"
+    assert report.records_in == 15 and report.records_out == 12
+    assert report.duplicates == 1
+    assert report.conflicts == [(3, [0, 1, 2])]
+
+def test_merge_first_and_lowest_price(sources):
+    assert list(merge.merge_products(sources, "first"))[2].text == "Central 3"
+    assert list(merge.merge_products(sources, "lowest_price"))[2].text == "Regional 3"
+
+def test_merge_field_priority(sources):
+    merged = list(merge.merge_products(sources, "fields", {"price": [1, 0], "text": [0]}))
+    assert merged[2] == xe_a207.Product(3, 1, True, True, 1.5, "Central 3")
+
+def test_merge_duplicate_from_later_source():
+    a = xe_a207.Product(7, 1, False, True, 1.0, "A")
+    b = xe_a207.Product(7, 2, True, False, 2.0, "B")
+    report = merge.MergeReport()
+    assert list(merge.merge_products([[a], [b], [a]], "last", report=report)) == [a]
+    assert report.duplicates == 1 and report.conflicts == [(7, [0, 1, 2])]
+    assert list(merge.merge_products([[b], [a], [b]], "first")) == [b]
+    assert list(merge.merge_products([[a], [b], [xe_a207.Product(7, 1, False, True, 2.0, "A")]], "lowest_price"))[0].text == "A"
+    assert list(merge.merge_products([[a], [b], [a]], "fields", {"price": [1]})) == [xe_a207.Product(7, 1, False, True, 2.0, "A")]
+
+def test_merge_duplicates_within_source(tmp_path, sources):
+    a = xe_a207.Product(7, 1, False, True, 1.0, "A")
+    b = xe_a207.Product(7, 2, True, False, 2.0, "B")
+    report = merge.MergeReport()
+    assert list(merge.merge_products([[a, a], [b]], report=report)) == [b]
+    assert report.duplicates == 1
+    for broken in ([[a, b]], [[a], [b, a]], [[a], [a, b]]):
+        with pytest.raises(ValueError, match="source 1|source 0"):
+            list(merge.merge_products(broken))
+    file = tmp_path / "PLUDT.SDA"
+    merge.merge_to_file(str(file), sources)
+    original = file.read_bytes()
+    with pytest.raises(ValueError):
+        merge.merge_to_file(str(file), sources + [[a, b]])
+    assert file.read_bytes() == original
+
+def test_merge_to_file(tmp_path, sources):
+    report = merge.merge_to_file(str(tmp_path / "PLUDT.SDA"), sources, batch_size=5)
+    assert xe_a207.import_products(str(tmp_path / "PLUDT.SDA")) == list(merge.merge_products(sources))
+    assert report.records_out == 12
+
+def test_merge_invalid_policy(sources):
+    with pytest.raises(AssertionError):
+        list(merge.merge_products(sources, "random"))
@@ -0,0 +1,64 @@
+import pytest
+
+import xe_a207
+from xe_a207.packing import Register, pack
+
+@pytest.fixture
+def catalog():
+    return [xe_a207.Product(code, 1 + code % 3, False, True, 1.0, f"PLU {code}") for code in range(1, 21)]
+
+@pytest.fixture
+def sales():
+    return {code: code * 10 for code in range(1, 21)}
+
+def test_pack_by_priority(catalog, sales):
+    plan = pack(catalog, [Register("front", 5)], sales)
+    assert [prod.code for prod in plan.assignments["front"]] == [16, 17, 18, 19, 20]
+    assert plan.priority["front"] == 900
+    assert plan.unassigned == list(range(1, 16))
+
+def test_pack_pinned_and_departments(catalog, sales):
+    registers = [Register("front", 4, pinned={1, 2}),
+                 Register("bar", 3, departments={1}),
+                 Register("kiosk", 2, priorities={5: 1000, 8: 999})]
+    plan = pack(catalog, registers, sales)
+    assert [prod.code for prod in plan.assignments["front"]] == [1, 2, 19, 20]
+    assert [prod.code for prod in plan.assignments["bar"]] == [12, 15, 18]
+    assert all(prod.dept_no == 1 for prod in plan.assignments["bar"])
+    assert [prod.code for prod in plan.assignments["kiosk"]] == [5, 8]
+    assert plan.priority["kiosk"] == 1999
+    assert 3 in plan.unassigned and 20 not in plan.unassigned
+
+def test_pack_ties_and_missing_priorities(catalog):
+    plan = pack(catalog, [Register("a", 3)], {7: 1})
+    assert [prod.code for prod in plan.assignments["a"]] == [1, 2, 7]
+
+def test_pack_infeasible(catalog):
+    with pytest.raises(ValueError, match="capacity"):
+        pack(catalog, [Register("a", 1, pinned={1, 2})])
+    with pytest.raises(ValueError, match="not in the catalog"):
+        pack(catalog, [Register("a", 2, pinned={99})])
+    with pytest.raises(ValueError, match="department"):
+        pack(catalog, [Register("a", 2, pinned={1}, departments={1})])
+
+def test_plan_write(tmp_path, catalog, sales):
+    plan = pack(catalog, [Register("front", 5), Register("bar", 2, departments={2})], sales)
+    files = plan.write(str(tmp_path))
+    assert files["front"] == str(tmp_path / "front" / "PROGRAM" / "PLUDT.SDA")
+    assert xe_a207.import_products(files["front"]) == plan.assignments["front"]
+    assert [prod.code for prod in xe_a207.import_products(files["bar"])] == [16, 19]
+
+@pytest.mark.parametrize("name", ["..", ".", "../outside", "a/b", "a\\b"])
+def test_plan_write_rejects_paths(tmp_path, catalog, name):
+    plan = pack(catalog, [Register("front", 1), Register(name, 1)])
+    with pytest.raises(ValueError, match="directory name"):
+        plan.write(str(tmp_path / "cards"))
+    assert not (tmp_path / "cards").exists() and not (tmp_path / "outside").exists()
+
+def test_pack_fleet():
+    catalog = [xe_a207.Product(code, 1 + code % 99, False, True, 1.0, f"PLU {code}") for code in range(1, 50001)]
+    sales = {code: (code * 7919) % 10007 for code in range(1, 50001)}
+    registers = [Register(f"store{i}", 2000, departments=range(1 + i % 10, 100, 10)) for i in range(50)]
+    plan = pack(catalog, registers, sales)
+    assert all(len(products) == 2000 for products in plan.assignments.values())
+    assert plan.assignments["store0"] == plan.assignments["store10"]
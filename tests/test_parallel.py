@@ -0,0 +1,33 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import xe_a207
+from xe_a207 import arrays, parallel
+
+@pytest.fixture
+def plu_files(tmp_path):
+    files = []
+    for card in range(3):
+        products = [xe_a207.Product(code, 1 + (code + card) % 99, code % 2 == 0, False, (code + card) / 100., f"Card {card} {code}")
+                    for code in range(1, 1001)]
+        file = tmp_path / f"PLUDT{card}.SDA"
+        xe_a207.export_products(str(file), products)
+        files.append(str(file))
+    return files
+
+def test_decode_products_parallel(plu_files):
+    expected = np.concatenate([arrays.read_products(file) for file in plu_files])
+    result = parallel.decode_products(plu_files, workers=2, chunk_records=700)
+    assert result.dtype == arrays.PRODUCT_DTYPE
+    assert (result == expected).all()
+
+def test_decode_products_single_worker(plu_files):
+    assert (parallel.decode_products(plu_files[0], workers=1) == arrays.read_products(plu_files[0])).all()
+
+def test_decode_products_parallel_invalid(plu_files):
+    with open(plu_files[1], "r+b") as f:
+        f.seek(31 * 10 + 12)
+        f.write(b"\xAA")
+    with pytest.raises(ValueError, match="chunk starting at record 700"):
+        parallel.decode_products(plu_files, workers=2, chunk_records=700)
@@ -0,0 +1,27 @@
+import pytest
+
+import xe_a207
+from xe_a207 import records
+
+def test_pack_product_matches_to_bytes(prod_valid_code, prod_valid_dept_no, valid_open, valid_preset, valid_text):
+    prod = xe_a207.Product(prod_valid_code, prod_valid_dept_no, valid_open, valid_preset, 12.34, valid_text)
+    record = records.pack_product(prod_valid_code, prod_valid_dept_no, valid_open, valid_preset, 1234, valid_text)
+    assert record == prod.to_bytes()
+    assert records.unpack_product(record) == (prod_valid_code, prod_valid_dept_no, valid_open, valid_preset, 1234, valid_text)
+
+def test_pack_department_matches_to_bytes(dept_valid_bytes):
+    B, dept = dept_valid_bytes
+    fields = records.unpack_department(B)
+    assert records.pack_department(*fields) == B == dept.to_bytes()
+
+def test_unpack_department_invalid(dept_invalid_bytes):
+    with pytest.raises(Exception):
+        records.unpack_department(dept_invalid_bytes)
+
+def test_bcd_encode_too_large():
+    with pytest.raises(AssertionError):
+        records.bcd_encode(100, 1)
+
+def test_iter_records_truncated():
+    with pytest.raises(AssertionError):
+        list(records.iter_records(bytes(40), 31))
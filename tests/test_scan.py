@@ -0,0 +1,55 @@
+import pytest
+
+import xe_a207
+from xe_a207 import scan
+
+@pytest.fixture
+def products():
+    return [xe_a207.Product(code, 1 + code % 99, code % 2 == 0, False, code / 100., f"PLU {code}") for code in range(1, 101)]
+
+def test_scan_clean_card(tmp_path, products):
+    (tmp_path / "PROGRAM").mkdir()
+    xe_a207.Programming(
+        [xe_a207.Department(code, False, True, True, xe_a207.Taxable.from_byte(code % 16), 10., 12, 1., "Heißgetränke") for code in range(1, 100)],
+        products, xe_a207.Logo(), xe_a207.Logo_msg(["Thank you"]), [xe_a207.Tax(i, -7.5, 1.) for i in range(1, 5)]
+    ).write_directory(str(tmp_path))
+    result = scan.scan_directory(str(tmp_path))
+    assert set(result) == {"PLUDT.SDA", "DEPTDT.SDA", "TAXTB.SDA", "LOGODT.SDA"}
+    assert all(issues == [] for issues in result.values())
+
+def test_scan_products(products):
+    B = bytearray(b"".join(prod.to_bytes() for prod in products))
+    B[3 * 31 + 11] = 0x1A           # price nibble
+    B[5 * 31 + 9] = 0x04            # flag bit
+    B[7 * 31 + 5:7 * 31 + 8] = b"\x00\x00\x00"   # code 0
+    B[8 * 31 + 15] = 0x07           # control character in name
+    B[9 * 31 + 30] = 0x41           # data after the name terminator
+    issues = scan.scan_products("PLUDT.SDA", bytes(B) + b"\x00" * 10)
+    assert [(issue.kind, issue.record, issue.offset) for issue in issues] == [
+        ("bcd", 3, 3 * 31 + 11),
+        ("flags", 5, 5 * 31 + 9),
+        ("range", 7, 7 * 31 + 5),
+        ("name", 8, 8 * 31 + 15),
+        ("name", 9, 9 * 31 + 30),
+        ("partial", 100, 100 * 31),
+    ]
+    assert "0x1A" in issues[0].message
+
+def test_scan_departments(dept_valid_bytes, dept_invalid_bytes):
+    assert scan.scan_departments("DEPTDT.SDA", dept_valid_bytes[0]) == []
+    assert scan.scan_departments("DEPTDT.SDA", dept_invalid_bytes) != []
+
+def test_scan_max_issues():
+    B = b"\xFF" * 31 * 50
+    assert len(scan.scan_products("PLUDT.SDA", B, max_issues=10)) == 10
+
+def test_scan_logo_msg():
+    B = bytearray(xe_a207.Logo_msg(["a", "b"]).to_bytes())
+    assert scan.scan_logo_msg("LOGODT.SDA", bytes(B)) == []
+    B[31] = 5
+    issues = scan.scan_logo_msg("LOGODT.SDA", bytes(B[:-1]))
+    assert [(issue.kind, issue.offset) for issue in issues] == [("range", 31), ("partial", 185)]
+
+def test_product_from_bytes_truncated(products):
+    with pytest.raises(AssertionError):
+        xe_a207.Product.from_bytes(products[0].to_bytes()[:30])
@@ -0,0 +1,49 @@
+import pytest
+
+import xe_a207
+from xe_a207 import synthetic
+from xe_a207.search import Match, NameIndex, normalize
+
+@pytest.fixture
+def index():
+    programming = xe_a207.Programming(
+        [xe_a207.Department(1, True, False, True, xe_a207.Taxable(True, False, False, False), 100., 1, 0., "Käse"),
+         xe_a207.Department(2, True, False, True, xe_a207.Taxable(True, False, False, False), 100., 1, 0., "Getränke")],
+        [xe_a207.Product(1, 1, False, True, 2.5, "Cheese"),
+         xe_a207.Product(2, 2, False, True, 1.8, "Coffee Latte"),
+         xe_a207.Product(3, 2, False, True, 1.5, "Espresso"),
+         xe_a207.Product(4, 1, False, True, 3.0, "Bergkäse")],
+        xe_a207.Logo(), xe_a207.Logo_msg([]), [])
+    return NameIndex.from_programming(programming)
+
+def test_normalize():
+    assert normalize("  Bergkäse   ALT ") == "bergkase alt"
+
+def test_search_misspelled(index):
+    assert len(index) == 6
+    assert index.search("coffe late")[0].code == 2
+    assert index.search("expresso")[0].text == "Espresso"
+    assert [(m.kind, m.code) for m in index.search("kase")][:2] == [("dept", 1), ("plu", 4)]
+    assert index.search("chese", kind="plu")[0] == Match(index.search("chese")[0].score, "plu", 1, "Cheese")
+    assert index.search("getranke", kind="plu") == []
+    assert len(set(index.search("kase") + index.search("kase"))) == len(index.search("kase"))
+    assert index.search("zzz") == []
+
+def test_search_incremental_updates(index):
+    index.add_product(xe_a207.Product(3, 2, False, True, 1.5, "Cappuccino"))
+    assert index.search("espresso") == []
+    assert index.search("capucino")[0].code == 3
+    assert index.remove_product(3) and not index.remove_product(3)
+    assert ("plu", 3) not in index
+    assert index.search("capucino") == []
+    assert index.remove_department(2)
+    assert index.search("getranke") == []
+
+def test_search_large_catalog():
+    index = NameIndex()
+    catalog = synthetic.products(20000, edge_ratio=0.)
+    for prod in catalog:
+        index.add_product(prod)
+    index.add_product(xe_a207.Product(999999, 1, False, True, 1.0, "Schokolade"))
+    assert index.search("schokolde", limit=3)[0].code == 999999
+    assert index.search(catalog[1234].text, limit=1)[0].text == catalog[1234].text
@@ -0,0 +1,102 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import xe_a207
+from xe_a207.server import CardImage, make_server
+
+@pytest.fixture
+def card():
+    return CardImage(xe_a207.Programming(
+        [xe_a207.Department(1, False, True, True, xe_a207.Taxable.from_byte(1), 10., 1, 1., "Drinks")],
+        [xe_a207.Product(code, 1, False, False, code / 100., f"P{code}") for code in range(1, 101)],
+        xe_a207.Logo(),
+        xe_a207.Logo_msg(["Thank you"]),
+        [xe_a207.Tax(1, 19.0, 0.)]))
+
+@pytest.fixture
+def url(card):
+    server = make_server(card, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def get(url, headers={}):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def test_card_image_cache(card):
+    B, etag = card.get("PLUDT.SDA")
+    assert B == b"".join(prod.to_bytes() for prod in card.programming.plu)
+    assert card.get("PLUDT.SDA")[0] is B
+    card.set_product(xe_a207.Product(5, 1, True, False, 1., "changed"))
+    assert card.get("PLUDT.SDA")[1] != etag
+    assert len(card.get("PLUDT.SDA")[0]) == len(B)
+    card.remove_product(5)
+    assert len(card.get("PLUDT.SDA")[0]) == len(B) - 31
+
+def test_card_image_matches_write_directory(tmp_path, card):
+    (tmp_path / "PROGRAM").mkdir()
+    card.programming.write_directory(str(tmp_path))
+    for name in ("PLUDT.SDA", "DEPTDT.SDA", "TAXTB.SDA", "LOGODT.SDA"):
+        assert card.get(name)[0] == (tmp_path / "PROGRAM" / name).read_bytes()
+    from xe_a207 import backends
+    calls = []
+    class Recording(backends.PureBackend):
+        name = "recording"
+        def encode_products(self, products):
+            calls.append(len(products))
+            return super().encode_products(products)
+    backends.register(Recording())
+    try:
+        with backends.use("recording"):
+            card.invalidate()
+            card.get("PLUDT.SDA")
+    finally:
+        del backends.BACKENDS["recording"]
+    assert calls == [100]
+
+def test_server_etag(card, url):
+    status, headers, body = get(url + "/PROGRAM/PLUDT.SDA")
+    assert status == 200 and body == card.get("PLUDT.SDA")[0]
+    status, _, body = get(url + "/PROGRAM/PLUDT.SDA", {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+    card.set_product(xe_a207.Product(200, 1, False, False, 2., "new"))
+    status, _, body = get(url + "/PROGRAM/PLUDT.SDA", {"If-None-Match": headers["ETag"]})
+    assert status == 200 and len(body) == 101 * 31
+
+def test_server_if_none_match_any(card, url):
+    status, _, body = get(url + "/PROGRAM/PLUDT.SDA", {"If-None-Match": "*"})
+    assert status == 304 and body == b""
+    assert get(url + "/PROGRAM/UNKNOWN.SDA", {"If-None-Match": "*"})[0] == 404
+
+def test_server_range(card, url):
+    B = card.get("PLUDT.SDA")[0]
+    status, headers, body = get(url + "/PROGRAM/PLUDT.SDA", {"Range": "bytes=31-61"})
+    assert status == 206 and body == B[31:62] and headers["Content-Range"] == f"bytes 31-61/{len(B)}"
+    status, _, body = get(url + "/PROGRAM/PLUDT.SDA", {"Range": "bytes=-31"})
+    assert status == 206 and body == B[-31:]
+    status, _, _ = get(url + "/PROGRAM/PLUDT.SDA", {"Range": f"bytes={len(B)}-"})
+    assert status == 416
+
+def test_server_invalid_range_ignored(card, url):
+    B = card.get("PLUDT.SDA")[0]
+    for requested in ("bytes=61-31", "bytes=-", "items=0-1", "bytes=0-1,5-6"):
+        status, headers, body = get(url + "/PROGRAM/PLUDT.SDA", {"Range": requested})
+        assert status == 200 and body == B and "Content-Range" not in headers
+
+def test_server_json(card, url):
+    status, headers, body = get(url + "/dept.json")
+    assert status == 200 and headers["Content-Type"].startswith("application/json")
+    assert json.loads(body)[0]["text"] == "Drinks"
+    assert json.loads(get(url + "/plu.json")[2])[9]["price"] == 0.1
+    assert get(url + "/PROGRAM/UNKNOWN.SDA")[0] == 404
+    assert get(url + "/index.html")[0] == 404
@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import xe_a207
+from xe_a207 import simulate
+
+@pytest.fixture
+def tables():
+    departments = [
+        xe_a207.Department(1, True, False, True, xe_a207.Taxable(True, False, False, False), 1000., 1, 0., "Food"),
+        xe_a207.Department(2, True, False, True, xe_a207.Taxable(False, True, False, False), 1000., 2, 0., "Drinks"),
+        xe_a207.Department(3, True, False, True, xe_a207.Taxable(False, False, False, False), 1000., 10, 0., "Deposit"),
+    ]
+    products = [
+        xe_a207.Product(10, 1, False, True, 2.14, "Bread"),
+        xe_a207.Product(20, 2, False, True, 1.19, "Water"),
+        xe_a207.Product(30, 3, False, True, 0.25, "Deposit return"),
+        xe_a207.Product(40, 9, False, True, 1.00, "No department"),
+    ]
+    taxes = [xe_a207.Tax(1, 7.0, 0.), xe_a207.Tax(2, 19.0, 0.)]
+    return products, departments, taxes
+
+@pytest.fixture
+def log():
+    return simulate.basket([1, 1, 1, 2, 2, 2, 3], [10, 20, 30, 20, 99, 40, 10], [1, 2, 1, 1, 1, 1, 0.5],
+                           [-1, -1, -1, 238, -1, -1, -1])
+
+def test_simulate_lines_and_receipts(tables, log):
+    result = simulate.simulate(log, *tables)
+    assert result.unknown.tolist() == [4, 5]
+    assert result.lines["total"].tolist() == [214, 238, -25, 238, 107]
+    assert result.receipts["receipt"].tolist() == [1, 2, 3]
+    assert result.receipts["total"].tolist() == [427, 238, 107]
+    assert result.receipts["taxable"][:, :2].tolist() == [[214, 238], [0, 238], [107, 0]]
+    # VAT included: 214 * 7 / 107 = 14, 238 * 19 / 119 = 38, 107 * 7 / 107 = 7
+    assert result.receipts["tax"][:, :2].tolist() == [[14, 38], [0, 38], [7, 0]]
+    assert result.tax.tolist() == [21, 76, 0, 0]
+    assert result.groups[[1, 2, 10]].tolist() == [321, 476, -25]
+    assert result.total == 772
+
+def test_simulate_addon_and_lower_limit(tables, log):
+    products, departments, _ = tables
+    result = simulate.simulate(log, products, departments, [xe_a207.Tax(1, 7.0, 1.5)], mode="addon")
+    # receipt 3 (1.07) is below the lower tax limit, 214 * 7% = 14.98
+    assert result.receipts["tax"][:, 0].tolist() == [15, 0, 0]
+    assert result.taxable[0] == 214
+
+def test_simulate_taxables_override(tables, log):
+    products, departments, taxes = tables
+    result = simulate.simulate(log, products, departments, taxes, taxables={2: xe_a207.Taxable(True, False, False, False)})
+    assert result.taxable.tolist() == [214 + 238 + 238 + 107, 0, 0, 0]
+    assert departments[1].taxable.tax_2
+
+def test_simulate_card_and_csv(tmp_path, tables, log):
+    products, departments, taxes = tables
+    (tmp_path / "PROGRAM").mkdir()
+    xe_a207.Programming(departments, products, xe_a207.Logo(), xe_a207.Logo_msg([]), taxes).write_directory(str(tmp_path))
+    (tmp_path / "basket.csv").write_text("receipt,code,quantity,price\n" +
+                                         "".join(f"{r},{c},{q},{p}\n" for r, c, q, p in log.tolist()))
+    basket = simulate.read_basket_csv(str(tmp_path / "basket.csv"), skiprows=1)
+    assert basket.tolist() == log.tolist()
+    assert simulate.simulate_card(basket, str(tmp_path)).tax.tolist() == simulate.simulate(log, *tables).tax.tolist()
+    changed = simulate.simulate_card(basket, str(tmp_path), taxes=[xe_a207.Tax(1, 0., 0.), xe_a207.Tax(2, 7.0, 0.)])
+    assert changed.tax.tolist() == [0, 16 + 16, 0, 0]     # 238 * 7 / 107 = 15.57 per receipt
+
+def test_simulate_empty_tables(log):
+    result = simulate.simulate(log, [], [], [])
+    assert len(result.unknown) == len(log) and result.total == 0
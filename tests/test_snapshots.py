@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import xe_a207
+from xe_a207.snapshots import SnapshotStore
+
+@pytest.fixture
+def programming():
+    return xe_a207.Programming(
+        [xe_a207.Department(code, False, True, True, xe_a207.Taxable.from_byte(code % 16), 10., 1, 1., f"D{code}") for code in range(1, 20)],
+        [xe_a207.Product(code, 1 + code % 19, False, False, code / 100., f"P{code}") for code in range(1, 5001)],
+        xe_a207.Logo(),
+        xe_a207.Logo_msg(["Thank you", "for your visit"]),
+        [xe_a207.Tax(i, 19.0, 0.) for i in range(1, 5)])
+
+def write_card(directory, programming):
+    os.makedirs(directory / "PROGRAM", exist_ok=True)
+    programming.write_directory(str(directory))
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma"])
+def test_snapshot_roundtrip(tmp_path, programming, compression):
+    write_card(tmp_path / "card", programming)
+    store = SnapshotStore(str(tmp_path / "store"), compression=compression)
+    name = store.save(str(tmp_path / "card"))
+    assert store.snapshots() == [name]
+    store.restore(name, str(tmp_path / "restored"))
+    for file in os.listdir(tmp_path / "card" / "PROGRAM"):
+        assert (tmp_path / "restored" / "PROGRAM" / file).read_bytes() == (tmp_path / "card" / "PROGRAM" / file).read_bytes()
+    restored = store.programming(name)
+    assert restored.plu == programming.plu
+    assert restored.dept == programming.dept
+    assert str(restored.logo_msg) == str(xe_a207.import_logo_msg(str(tmp_path / "card" / "PROGRAM" / "LOGODT.SDA")))
+
+def test_snapshot_deduplication(tmp_path, programming):
+    store = SnapshotStore(str(tmp_path / "store"))
+    write_card(tmp_path / "card", programming)
+    store.save(str(tmp_path / "card"), "before")
+    chunks_before = store.stats()["chunks"]
+    original = list(programming.plu)
+    programming.plu[100] = xe_a207.Product(101, 1, True, False, 9.99, "changed")
+    write_card(tmp_path / "card", programming)
+    store.save(str(tmp_path / "card"), "after")
+    stats = store.stats()
+    assert stats["snapshots"] == 2
+    assert stats["chunks"] == chunks_before + 1
+    assert stats["stored_bytes"] < stats["logical_bytes"] / 2
+    assert store.programming("before").plu[100] != store.programming("after").plu[100]
+    assert store.delete("after") == 1
+    assert store.programming("before").plu == original
+    with pytest.raises(AssertionError):
+        store.save(str(tmp_path / "card"), "before")
+
+def test_snapshot_insertion_stores_few_chunks(tmp_path, programming):
+    store = SnapshotStore(str(tmp_path / "store"))
+    write_card(tmp_path / "card", programming)
+    store.save(str(tmp_path / "card"), "before")
+    chunks_before = store.stats()["chunks"]
+    programming.plu.insert(10, xe_a207.Product(999999, 1, False, False, 1., "inserted"))
+    write_card(tmp_path / "card", programming)
+    store.save(str(tmp_path / "card"), "after")
+    assert store.stats()["chunks"] - chunks_before <= 2
+    assert store.programming("after").plu == programming.plu
+
+def test_snapshot_restore_deletes_stale_files(tmp_path, programming):
+    store = SnapshotStore(str(tmp_path / "store"))
+    write_card(tmp_path / "card", programming)
+    name = store.save(str(tmp_path / "card"))
+    (tmp_path / "card" / "PROGRAM" / "EXTRA.SDA").write_bytes(b"stale")
+    assert store.restore(name, str(tmp_path / "card")) == ["EXTRA.SDA"]
+    assert sorted(os.listdir(tmp_path / "card" / "PROGRAM")) == sorted(store.files(name))
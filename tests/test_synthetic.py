@@ -0,0 +1,57 @@
+import pytest
+
+import xe_a207
+from xe_a207 import scan, synthetic
+
+def test_write_card_is_valid_and_seeded(tmp_path):
+    counts = synthetic.write_card(str(tmp_path / "a"), products=3000, seed=7, edge_ratio=0.2)
+    synthetic.write_card(str(tmp_path / "b"), products=3000, seed=7, edge_ratio=0.2)
+    assert counts == {"PLUDT.SDA": 3000, "DEPTDT.SDA": 99, "TAXTB.SDA": 4, "LOGODT.SDA": 1}
+    for name in counts:
+        assert (tmp_path / "a" / "PROGRAM" / name).read_bytes() == (tmp_path / "b" / "PROGRAM" / name).read_bytes()
+    assert scan.scan_directory(str(tmp_path / "a")) == {name: [] for name in scan.SCANNERS if name in counts}
+    programming = xe_a207.Programming.read_directory(str(tmp_path / "a"))
+    codes = [prod.code for prod in programming.plu]
+    assert codes == sorted(set(codes)) and codes[0] == 1 and codes[-1] == 999999
+    assert max(prod.price for prod in programming.plu) == 99999999.99
+    assert any(len(prod.text) == 16 for prod in programming.plu)
+    assert {dept.taxable.to_byte() for dept in programming.dept} == set(range(16))
+    assert {(dept.sales_type, dept.open, dept.preset) for dept in programming.dept} == {
+        (s, o, p) for s in (False, True) for o in (False, True) for p in (False, True)}
+    assert programming.tax[1].tax_rate < 0 and programming.tax[2].tax_rate == synthetic.MAX_TAX_RATE
+    assert len(programming.logo_msg.rows[0]) == 30
+
+@pytest.mark.parametrize("prices", ["uniform", "retail", "round", lambda rng, maximum: 199])
+def test_price_distributions(prices):
+    B = b"".join(synthetic.product_records(500, prices=prices, edge_ratio=0.))
+    prices = [prod.price for prod in map(xe_a207.Product.from_bytes, (B[i:i + 31] for i in range(0, len(B), 31)))]
+    assert len(prices) == 500 and all(0 <= price <= 99999999.99 for price in prices)
+
+def test_objects():
+    products = synthetic.products(200, seed=2)
+    assert b"".join(prod.to_bytes() for prod in products) == b"".join(synthetic.product_records(200, seed=2))
+    departments = synthetic.departments(150)
+    assert [dept.code for dept in departments] == [i % 99 + 1 for i in range(150)]
+    assert len(set(synthetic.taxables(100))) == 16
+
+def test_verify_card(tmp_path):
+    synthetic.write_card(str(tmp_path), products=5000, seed=3, edge_ratio=0.1)
+    results = synthetic.verify_card(str(tmp_path), chunk_records=1024)
+    assert [result["file"] for result in results] == ["PLUDT.SDA", "DEPTDT.SDA", "TAXTB.SDA", "LOGODT.SDA"]
+    assert all(result["ok"] for result in results), synthetic.report(results)
+    assert results[0]["records"] == 5000 and results[0]["bytes"] == 5000 * 31
+    assert "PLUDT.SDA" in synthetic.report(results)
+
+def test_verify_file_reports_mismatches(tmp_path):
+    synthetic.write_card(str(tmp_path), products=100)
+    file = tmp_path / "PROGRAM" / "PLUDT.SDA"
+    B = bytearray(file.read_bytes())
+    B[42 * 31 + 15 + 3] = 0     # data after the terminating zero of a name is lost on export
+    B[42 * 31 + 15 + 4] = 0x41
+    file.write_bytes(bytes(B))
+    result = synthetic.verify_file(str(file), chunk_records=10)
+    assert not result["ok"] and result["mismatches"] == [42]
+
+def test_run():
+    results = synthetic.run(products=2000, chunk_records=500)
+    assert all(result["ok"] for result in results)
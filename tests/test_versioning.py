@@ -0,0 +1,78 @@
+import pytest
+
+import xe_a207
+from xe_a207.versioning import VersionedTable
+
+@pytest.fixture
+def products():
+    return [xe_a207.Product(code, code % 5 + 1, False, True, code / 4, f"PLU {code}") for code in range(1, 101)]
+
+def test_versioned_table_set_undo_redo(products):
+    table = VersionedTable(xe_a207.Product, products, page_records=8)
+    assert len(table) == 100 and list(table) == products
+    new = xe_a207.Product(50, 1, True, True, 9.99, "Changed")
+    assert table.set(49, new) == 1
+    assert table[49] == new and table.shared_pages(0) == 12
+    assert table.undo() and table[49] == products[49]
+    assert not table.undo()
+    assert table.redo() and table[49] == new
+    assert not table.redo()
+
+def test_versioned_table_edit_after_undo_drops_redo(products):
+    table = VersionedTable(xe_a207.Product, products, page_records=8)
+    table.set(0, xe_a207.Product(1, 1, False, True, 1.0, "A"))
+    table.undo()
+    table.set(1, xe_a207.Product(2, 1, False, True, 1.0, "B"))
+    assert table.versions == 2 and not table.redo()
+    assert table[0] == products[0]
+
+def test_versioned_table_diff(products):
+    table = VersionedTable(xe_a207.Product, products, page_records=8)
+    table.update({3: xe_a207.Product(4, 1, False, True, 1.0, "X"), 90: xe_a207.Product(91, 1, False, True, 1.0, "Y")})
+    table.append(xe_a207.Product(101, 1, False, True, 1.0, "Z"))
+    changes = table.diff(0)
+    assert [index for index, _, _ in changes] == [3, 90, 100]
+    assert changes[2][1] is None and changes[2][2] == table.record(100)
+    assert table.diff(2, 0)[2][2] is None
+    assert table.diff(1, 1) == []
+
+def test_versioned_table_negative_index(products):
+    table = VersionedTable(xe_a207.Product, products, page_records=8)
+    assert table.record(-1) == products[-1].to_bytes() and table[-100] == products[0]
+    table.append(xe_a207.Product(101, 1, False, True, 1.0, "Z"))
+    assert table.record(-1, version=0) == products[-1].to_bytes()
+    table.set(-1, xe_a207.Product(101, 2, False, True, 2.0, "Y"))
+    assert table[100].text == "Y"
+    for index in (101, -102):
+        with pytest.raises(IndexError):
+            table.record(index)
+    with pytest.raises(IndexError):
+        table.record(-101, version=0)
+
+def test_versioned_table_delete(products):
+    table = VersionedTable(xe_a207.Product, products, page_records=8)
+    table.delete(20)
+    assert len(table) == 99 and list(table) == products[:20] + products[21:]
+    assert table.shared_pages(0) == 2
+    with pytest.raises(IndexError):
+        table.delete(99)
+
+def test_versioned_table_export(tmp_path, products):
+    (tmp_path / "PROGRAM").mkdir()
+    xe_a207.Programming([], products, xe_a207.Logo(), xe_a207.Logo_msg([]), []).write_directory(str(tmp_path))
+    file = str(tmp_path / "PROGRAM" / "PLUDT.SDA")
+    table = VersionedTable.from_file(file, xe_a207.Product, page_records=16)
+    assert len(table) == 100
+    table.set(0, xe_a207.Product(1, 1, False, True, 0.5, "First"))
+    table.export(str(tmp_path / "v0.SDA"), version=0)
+    table.export(str(tmp_path / "v1.SDA"))
+    assert (tmp_path / "v0.SDA").read_bytes() == (tmp_path / "PROGRAM" / "PLUDT.SDA").read_bytes()
+    assert xe_a207.import_products(str(tmp_path / "v1.SDA"))[0].text == "First"
+
+def test_versioned_departments():
+    departments = [xe_a207.Department(i, False, False, True, xe_a207.Taxable(True, False, False, False), 0., 1, 1.0, f"D{i}")
+                   for i in range(1, 10)]
+    table = VersionedTable(xe_a207.Department, departments, page_records=4)
+    assert table.record_size == 28 and list(table) == departments
+    with pytest.raises(AssertionError):
+        table.append(xe_a207.Product(1, 1, False, True, 1.0, "PLU"))
@@ -0,0 +1,117 @@
+import os
+import threading
+
+import pytest
+
+import xe_a207
+from xe_a207.watcher import DirectoryWatcher
+
+@pytest.fixture
+def card(tmp_path):
+    (tmp_path / "PROGRAM").mkdir()
+    xe_a207.Programming(
+        [xe_a207.Department(code, False, True, True, xe_a207.Taxable.from_byte(code % 16), 10., 1, 1., f"D{code}") for code in range(1, 20)],
+        [xe_a207.Product(code, 1, False, False, code / 100., f"P{code}") for code in range(1, 1001)],
+        xe_a207.Logo(),
+        xe_a207.Logo_msg(["Thank you"]),
+        [xe_a207.Tax(i, 19.0, 0.) for i in range(1, 5)]).write_directory(str(tmp_path))
+    return tmp_path
+
+def patch(file, offset, B):
+    with open(file, "r+b") as f:
+        f.seek(offset)
+        f.write(B)
+    st = os.stat(file)
+    os.utime(file, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000000))
+
+def test_watcher_without_changes(card):
+    watcher = DirectoryWatcher(str(card))
+    assert watcher.poll() == []
+
+def test_watcher_updates_changed_records(card):
+    watcher = DirectoryWatcher(str(card), block_records=32)
+    events = []
+    watcher.subscribe(events.append)
+    plu = watcher.programming.plu
+    new = xe_a207.Product(501, 2, True, True, 9.99, "Changed")
+    patch(card / "PROGRAM" / "PLUDT.SDA", 500 * 31, new.to_bytes())
+    assert watcher.poll() == [] and events == []
+    changes = watcher.poll()
+    assert len(changes) == 1 and events == changes
+    assert changes[0].file == "PLUDT.SDA" and changes[0].attribute == "plu"
+    assert changes[0].updated == [500] and changes[0].added == [] and changes[0].removed == []
+    assert watcher.programming.plu is plu and plu[500] == new
+    assert watcher.programming.plu == xe_a207.import_products(str(card / "PROGRAM" / "PLUDT.SDA"))
+    assert watcher.poll() == []
+
+def test_watcher_appended_and_truncated_records(card):
+    watcher = DirectoryWatcher(str(card))
+    file = str(card / "PROGRAM" / "PLUDT.SDA")
+    with open(file, "ab") as f:
+        f.write(xe_a207.Product(2000, 1, False, True, 1.0, "New").to_bytes())
+    assert watcher.poll() == []
+    assert watcher.poll()[0].added == [1000]
+    os.truncate(file, 998 * 31)
+    assert watcher.poll() == []
+    change = watcher.poll()[0]
+    assert change.removed == [998, 999, 1000] and change.updated == []
+    assert len(watcher.programming.plu) == 998
+
+def test_watcher_skips_partial_file(card):
+    watcher = DirectoryWatcher(str(card))
+    file = str(card / "PROGRAM" / "PLUDT.SDA")
+    B = xe_a207.Product(2000, 1, False, True, 1.0, "New").to_bytes()
+    with open(file, "ab") as f:
+        f.write(B[:10])
+    assert watcher.poll() == [] and watcher.poll() == []
+    with open(file, "ab") as f:
+        f.write(B[10:])
+    assert watcher.poll() == []
+    assert watcher.poll()[0].added == [1000]
+
+def test_watcher_skips_file_being_rewritten(card):
+    watcher = DirectoryWatcher(str(card))
+    events = []
+    watcher.subscribe(events.append)
+    file = card / "PROGRAM" / "PLUDT.SDA"
+    B = file.read_bytes()
+    new = xe_a207.Product(3, 2, True, True, 9.99, "Changed").to_bytes()
+    patch(file, 0, b"")
+    os.truncate(file, 0)
+    assert watcher.poll() == []
+    patch(file, 0, B[:2 * 31] + new + B[3 * 31:])
+    assert watcher.poll() == []
+    changes = watcher.poll()
+    assert events == changes and len(changes) == 1
+    assert changes[0].updated == [2] and changes[0].removed == [] and changes[0].added == []
+    assert len(watcher.programming.plu) == 1000
+
+def test_watch_retries_invalid_records(card):
+    watcher = DirectoryWatcher(str(card))
+    file = card / "PROGRAM" / "PLUDT.SDA"
+    new = xe_a207.Product(1, 2, True, True, 9.99, "Changed").to_bytes()
+    patch(file, 0, b"\xff" * 31)
+    polls = []
+    class Stop(threading.Event):
+        def wait(self, timeout=None):
+            polls.append(timeout)
+            if len(polls) == 2:
+                patch(file, 0, new)
+            elif len(polls) == 4:
+                self.set()
+            return self.is_set()
+    watcher.watch(interval=0.5, stop=Stop())
+    assert polls == [0.5] * 4
+    assert watcher.programming.plu[0].to_bytes() == new
+
+def test_watcher_taxes_and_logo_msg(card):
+    watcher = DirectoryWatcher(str(card))
+    watcher.unsubscribe(watcher.subscribe(lambda change: pytest.fail("unsubscribed")))
+    patch(card / "PROGRAM" / "TAXTB.SDA", 90, xe_a207.Tax(2, 7.0, 0.).to_bytes())
+    xe_a207.export_logo_msg(str(card / "PROGRAM" / "LOGODT.SDA"), xe_a207.Logo_msg(["Goodbye"]))
+    assert watcher.poll() == []
+    changes = {change.file: change for change in watcher.poll()}
+    assert changes["TAXTB.SDA"].updated == [1]
+    assert watcher.programming.tax[1].tax_rate == 7.0 and watcher.programming.tax[1].number == 2
+    assert changes["LOGODT.SDA"].attribute == "logo_msg"
+    assert watcher.programming.logo_msg.rows[0].strip() == "Goodbye"
@@ -47,6 +47,18 @@ def test_taxable_from_byte_invalid(taxable_invalid_byte):
 def test_taxable_to_byte(taxable_valid_byte):
     assert taxable_valid_byte[0] == taxable_valid_byte[1].to_byte()
 
+## Taxable interning tests
+def test_taxable_shared_instance(taxable_valid_byte):
+    import copy, pickle
+    byte, taxable = taxable_valid_byte
+    assert xe_a207.Taxable.from_byte(byte) is taxable
+    assert copy.deepcopy(taxable) is taxable
+    assert pickle.loads(pickle.dumps(taxable)) is taxable
+
+def test_taxable_immutable(taxable_equal):
+    with pytest.raises(AttributeError):
+        taxable_equal.tax_1 = True
+
 # Department tests
 def test_department_init_valid(dept_valid_code, valid_sales_type, valid_open, valid_preset, valid_taxable, valid_halo, valid_group_no, valid_price, valid_text):
     xe_a207.Department(dept_valid_code, valid_sales_type, valid_open, valid_preset, valid_taxable, valid_halo, valid_group_no, valid_price, valid_text)
@@ -69,8 +81,50 @@ def test_department_to_bytes_valid(dept_valid_bytes):
     dept_in_bytes = dept_valid_bytes[0]
     assert dept_to_bytes == dept_in_bytes
 
+def test_department_flags(valid_sales_type, valid_open, valid_preset, valid_taxable):
+    dept = xe_a207.Department(1, valid_sales_type, valid_open, valid_preset, valid_taxable, 1., 1, 1., "")
+    assert (dept.sales_type, dept.open, dept.preset) == (valid_sales_type, valid_open, valid_preset)
+    assert dept.flags == dept.to_bytes()[1]
+    assert dept.taxable is valid_taxable
+
+def test_department_eq_taxable():
+    dept = xe_a207.Department(1, False, False, False, xe_a207.Taxable.from_byte(1), 1., 1, 1., "")
+    same = xe_a207.Department(1, False, False, False, xe_a207.Taxable.from_byte(1), 1., 1, 1., "")
+    other = xe_a207.Department(1, False, False, False, xe_a207.Taxable.from_byte(2), 1., 1, 1., "")
+    assert dept == same and not dept != same
+    assert dept != other and not dept == other
+
 # TODO Department methods tests
 
+# DepartmentTable tests
+def test_department_table(dept_valid_bytes):
+    B, dept = dept_valid_bytes
+    other = xe_a207.Department(5, False, True, False, xe_a207.Taxable.from_byte(3), 10., 1, 2., "Other")
+    table = xe_a207.DepartmentTable.from_bytes(B + other.to_bytes())
+    assert len(table) == 2
+    assert table[dept.code] == dept and table[5] == other
+    assert table.offset(dept.code) == 0 and table.offset(5) == 28
+    assert dept.code in table and 6 not in table and 100 not in table
+    assert table.get(6) is None
+    with pytest.raises(KeyError):
+        table[6]
+    assert table.to_list() == sorted([dept, other], key=lambda d: d.code)
+    assert table.to_bytes() == b"".join(d.to_bytes() for d in table)
+    assert table == xe_a207.DepartmentTable([other, dept])
+    del table[5]
+    assert 5 not in table and table.offset(5) is None
+
+def test_department_table_join():
+    departments = [xe_a207.Department(code, False, True, False, xe_a207.Taxable.from_byte(0), 1., 1, 1., "") for code in (1, 2)]
+    products = [xe_a207.Product(code, dept_no, False, False, 1., "") for code, dept_no in ((1, 2), (2, 1), (3, 9))]
+    table = xe_a207.DepartmentTable(departments)
+    assert table.join(products) == [(products[0], departments[1]), (products[1], departments[0]), (products[2], None)]
+
+def test_department_table_duplicate():
+    dept = xe_a207.Department(1, False, True, False, xe_a207.Taxable.from_byte(0), 1., 1, 1., "")
+    with pytest.raises(AssertionError):
+        xe_a207.DepartmentTable([dept, dept])
+
 # Product tests
 def test_product_init_valid(prod_valid_code, prod_valid_dept_no, valid_open, valid_preset, valid_price, valid_text):
     xe_a207.Product(prod_valid_code, prod_valid_dept_no, valid_open, valid_preset, valid_price, valid_text)
@@ -79,11 +133,87 @@ def test_product_init_invalid(prod_invalid_code, prod_invalid_dept_no, invalid_o
     with pytest.raises(AssertionError):
         xe_a207.Product(prod_invalid_code, prod_invalid_dept_no, invalid_open, invalid_preset, invalid_price, invalid_text)
 
+def test_product_flags(valid_open, valid_preset):
+    prod = xe_a207.Product(1, 1, valid_open, valid_preset, 1., "")
+    assert (prod.open, prod.preset) == (valid_open, valid_preset)
+    assert prod.flags == prod.to_bytes()[9]
+    assert xe_a207.Product.from_bytes(prod.to_bytes()) == prod
+
 # TODO Product methods tests
 
 # Logo tests
-# TODO all Logo tests, for which more information on how the cash register receives, saves and sends the logo itself
-# TODO Kind of Logo file to be loaded into original PC-Link is clear (BMP 130 (H) x 360 (W) Pixel, less than 35% "Schwarzbereich" vom Gesamtbereich)
+# Kind of Logo file to be loaded into original PC-Link is clear (BMP 130 (H) x 360 (W) Pixel, less than 35% "Schwarzbereich" vom Gesamtbereich)
+def test_logo_init_empty():
+    logo = xe_a207.Logo()
+    assert logo.is_empty()
+    assert logo.black_ratio() == 0.
+    assert xe_a207.Logo.from_bytes(logo.to_bytes()) == logo
+
+def test_logo_init_invalid(invalid_logo_bits):
+    with pytest.raises(AssertionError):
+        xe_a207.Logo(invalid_logo_bits)
+
+def test_logo_from_bytes_too_black(logo_bits_too_black):
+    logo = xe_a207.Logo.from_bytes(logo_bits_too_black)
+    assert logo.black_ratio() == 1.
+    assert logo.to_bytes() == logo_bits_too_black
+
+def test_logo_from_pixels_too_black():
+    np = pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        xe_a207.Logo.from_pixels(np.ones((130, 360), dtype=bool))
+    with pytest.raises(ValueError):
+        xe_a207.Logo.batch_from_pixels(np.zeros((2, 130, 360)))
+
+def test_logo_black_ratio(valid_logo_bits):
+    logo = xe_a207.Logo(valid_logo_bits[0])
+    assert logo.black_ratio() == pytest.approx(valid_logo_bits[1])
+
+def test_logo_pixels(valid_logo_bits):
+    np = pytest.importorskip("numpy")
+    logo = xe_a207.Logo(valid_logo_bits[0])
+    pixels = logo.to_pixels()
+    assert pixels.shape == (130, 360)
+    assert pixels.mean() == pytest.approx(valid_logo_bits[1])
+    assert xe_a207.Logo.from_pixels(pixels) == logo
+    assert xe_a207.Logo.from_pixels(np.where(pixels, 0, 255)) == logo
+    assert xe_a207.Logo.batch_from_pixels(np.stack([pixels, np.zeros_like(pixels)])) == [logo, xe_a207.Logo()]
+
+def test_logo_dither():
+    np = pytest.importorskip("numpy")
+    gray = np.full((130, 360), 0.8 * 255)
+    logo = xe_a207.Logo.from_pixels(gray, dither=True)
+    assert logo.black_ratio() == pytest.approx(3 / 16, abs=0.005)
+    assert xe_a207.Logo.from_pixels(gray).is_empty()
+
+def test_logo_bmp(tmp_path, valid_logo_bits):
+    pytest.importorskip("numpy")
+    logo = xe_a207.Logo(valid_logo_bits[0])
+    logo.to_bmp(str(tmp_path / "logo.bmp"))
+    assert xe_a207.Logo.from_bmp(str(tmp_path / "logo.bmp")) == logo
+
+def test_logo_bmp_24bit(tmp_path):
+    np = pytest.importorskip("numpy")
+    import struct
+    pixels = np.full((130, 360, 3), 255, dtype=np.uint8)
+    pixels[10:20, 100:200] = 0
+    data = pixels[::-1].tobytes()
+    with open(tmp_path / "logo.bmp", "bw") as f:
+        f.write(struct.pack("<2sIHHI", b"BM", 54 + len(data), 0, 0, 54))
+        f.write(struct.pack("<IiiHHIIiiII", 40, 360, 130, 1, 24, 0, len(data), 0, 0, 0, 0))
+        f.write(data)
+    logo = xe_a207.Logo.from_bmp(str(tmp_path / "logo.bmp"))
+    assert logo.black_ratio() == pytest.approx(1000 / (360 * 130))
+    assert logo.to_pixels()[10:20, 100:200].all()
+
+def test_logo_directory(tmp_path, valid_logo_bits):
+    (tmp_path / "PROGRAM").mkdir()
+    programming = xe_a207.Programming([], [], xe_a207.Logo(valid_logo_bits[0]), xe_a207.Logo_msg([]), [])
+    programming.write_directory(str(tmp_path))
+    assert sorted(path.name for path in (tmp_path / "PROGRAM").iterdir()) == ["DEPTDT.SDA", "LOGODT.SDA", "PLUDT.SDA", "TAXTB.SDA"]
+    assert xe_a207.Programming.read_directory(str(tmp_path)).logo.is_empty()
+    programming.write_directory(str(tmp_path), logo_file="LOGO.BIN")
+    assert xe_a207.Programming.read_directory(str(tmp_path), logo_file="LOGO.BIN").logo == programming.logo
 
 # Logo message tests
 def test_logo_msg_init_valid(valid_logo_msg):